@@ -0,0 +1,80 @@
+# Measure direct / FFT / overlap-add convolution crossovers on this machine
+#
+#   python -m benchmarks.conv_crossover [--out benchmarks/conv_crossover.json]
+#
+# Records the fastest method for each (signal length, tap count) pair and the
+# resulting DIRECT_MAX_TAPS / OA_MIN_RATIO values for core.utils.
+import argparse
+import json
+import platform
+import timeit
+import numpy as np
+from core.utils import convolve, DIRECT_MAX_TAPS, OA_MIN_RATIO
+
+SIGNAL_LENGTHS = [10_000, 100_000, 1_000_000]
+TAP_COUNTS = [16, 32, 64, 128, 256, 512, 1024, 4096, 16384]
+METHODS = ['direct', 'fft', 'oa']
+
+
+def time_call(fn, min_time: float = 0.1) -> float:
+    """Best-of-3 time per call, with the repeat count sized to min_time."""
+    n = max(1, int(min_time / max(timeit.timeit(fn, number=1), 1e-6)))
+    return min(timeit.repeat(fn, number=n, repeat=3)) / n
+
+
+def run(dtype=np.float64):
+    rng = np.random.RandomState(0)
+    rows = []
+    for n in SIGNAL_LENGTHS:
+        x = rng.randn(n).astype(dtype)
+        for m in TAP_COUNTS:
+            if m > n:
+                continue
+            h = rng.randn(m).astype(dtype)
+            times = {meth: time_call(lambda: convolve(x, h, method=meth)) for meth in METHODS}
+            best = min(times, key=times.get)
+            rows.append({'n': n, 'm': m, 'times': times, 'best': best})
+            print(f"n={n:>9} m={m:>6}  " + '  '.join(f"{k}={v:.2e}" for k, v in times.items()) + f"  -> {best}")
+    return rows
+
+
+def crossovers(rows):
+    """
+    Largest tap count where direct still wins; above it, the largest n/m ratio
+    where fft still beats overlap-add and the smallest ratio past which
+    overlap-add always wins (OA_MIN_RATIO belongs in between).
+    """
+    direct_max = max([r['m'] for r in rows if r['best'] == 'direct'], default=0)
+    long_rows = [r for r in rows if r['m'] > direct_max]
+    fft_max = max([r['n'] / r['m'] for r in long_rows if r['times']['fft'] <= r['times']['oa']], default=0.0)
+    oa_ratios = [r['n'] / r['m'] for r in long_rows if r['n'] / r['m'] > fft_max]
+    return {
+        'direct_max_taps': direct_max,
+        'fft_max_ratio': fft_max or None,
+        'oa_min_ratio': min(oa_ratios) if oa_ratios else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure convolution method crossovers')
+    parser.add_argument('--out', default='benchmarks/conv_crossover.json', help='JSON output path')
+    parser.add_argument('--float32', action='store_true', help='benchmark float32 instead of float64')
+    args = parser.parse_args()
+    rows = run(np.float32 if args.float32 else np.float64)
+    result = {
+        'machine': platform.platform(),
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'dtype': 'float32' if args.float32 else 'float64',
+        'current': {'direct_max_taps': DIRECT_MAX_TAPS, 'oa_min_ratio': OA_MIN_RATIO},
+        'measured': crossovers(rows),
+        'results': rows,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"measured crossovers: {result['measured']} (current: {result['current']})")
+    print(f"wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
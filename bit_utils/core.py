@@ -1,62 +1,87 @@
 import numpy as np
 from typing import Sequence
+from .lfsr import lfsr_init, lfsr_bits, lfsr_jump
+from .pattern import PatternFile, is_pattern_file, write_pattern
+from core.utils import correlate as _correlate
 
-def prbs(order: int, n_bits: int, seed: int = None) -> np.ndarray:
+def prbs(order: int, n_bits: int, seed: int = None, start: int = 0) -> np.ndarray:
     """
     Generate PRBS sequence using LFSR.
     Args:
         order: LFSR order (number of bits in register)
         n_bits: Number of bits to generate
         seed: Initial value for the shift register (if None, random)
+        start: Bit offset into the sequence; prbs(o, n, s, start=k) equals
+            prbs(o, k + n, s)[k:] without generating the first k bits
     Returns:
         Numpy array of bits (0/1)
     """
-    taps = {
-        7: [7, 6],
-        9: [9, 5],
-        15: [15, 14],
-        23: [23, 18],
-        31: [31, 28],
-    }
+    return prbs_bits(order, n_bits, seed=seed, start=start).astype(int)
+
+def prbs_state_at(order: int, seed: int, offset: int) -> int:
+    """
+    Jump the PRBS register to an arbitrary bit offset in O(log offset).
+    The returned value uses the same encoding as seed, so for seeds that fit in
+    `order` bits prbs(order, n, seed=prbs_state_at(order, seed, k)) continues the
+    sequence at bit k.
+    Args:
+        order: LFSR order
+        seed: Initial value for the shift register
+        offset: Bit offset into the sequence (>= 0)
+    Returns:
+        Register value at the given offset
+    """
+    state, taps = lfsr_init(order, seed)
+    state = lfsr_jump(state, taps, offset)
+    return int(sum(int(b) << i for i, b in enumerate(state)))
+
+def prbs_bits(order: int, n_bits: int, seed: int = None, packed: bool = False, start: int = 0) -> np.ndarray:
+    """
+    Generate PRBS sequence with the word-parallel LFSR engine (bit_utils.lfsr).
+    Output is bit-identical to prbs() but returned as uint8, or packed 8 bits per
+    byte (np.packbits order, MSB first) to keep long sequences compact.
+    Args:
+        order: LFSR order (number of bits in register)
+        n_bits: Number of bits to generate
+        seed: Initial value for the shift register (if None, random)
+        packed: If True, return packed bytes instead of one uint8 per bit
+        start: Bit offset into the sequence (jump-ahead, see prbs_state_at)
+    Returns:
+        uint8 array of bits (0/1), or packed bytes of length ceil(n_bits / 8)
+    """
     if seed is None:
         max_seed = min(2**order, 2**31 - 1)
         seed = np.random.randint(1, max_seed)
-    reg = [int(x) for x in bin(seed)[2:].zfill(order)]
-    seq = []
-    for _ in range(n_bits):
-        out = reg[-1]
-        seq.append(out)
-        feedback = 0
-        for t in taps.get(order, [order, order-1]):
-            feedback ^= reg[-t]
-        reg = [feedback] + reg[:-1]
-    return np.array(seq)
+    state, taps = lfsr_init(order, seed)
+    if start:
+        state = lfsr_jump(state, taps, start)
+    return lfsr_bits(state, taps, n_bits, packed=packed)
 
 def random_bits(n_bits: int, seed: int = None) -> np.ndarray:
     """
     Generate true random bits.
     Args:
         n_bits: Number of bits to generate
-        seed: Optional seed for reproducibility
+        seed: Optional seed for reproducibility (uses a private RandomState,
+            the global np.random state is left untouched)
     Returns:
         Numpy array of bits (0/1)
     """
-    if seed is not None:
-        np.random.seed(seed)
-    return np.random.randint(0, 2, size=n_bits)
+    rng = np.random.RandomState(seed) if seed is not None else np.random
+    return rng.randint(0, 2, size=n_bits)
 
 def correlate(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     """
-    Compute cross-correlation of two bit sequences.
+    Compute cross-correlation of two bit sequences (FFT-based for long inputs).
     Args:
         a: First bit sequence (array)
         b: Second bit sequence (array)
     Returns:
         Cross-correlation array
     """
-    return np.correlate(a, b, mode='full')
+    return _correlate(a, b, mode='full')
 
-def gold_code(order: int, n_bits: int, seed1: int = None, seed2: int = None) -> np.ndarray:
+def gold_code(order: int, n_bits: int, seed1: int = None, seed2: int = None, start: int = 0) -> np.ndarray:
     """
     Generate Gold code sequence by XORing two LFSRs (PRBS).
     Args:
@@ -64,11 +89,12 @@ def gold_code(order: int, n_bits: int, seed1: int = None, seed2: int = None) ->
         n_bits: Number of bits
         seed1: Seed for first LFSR
         seed2: Seed for second LFSR
+        start: Bit offset into the sequence (both LFSRs jump ahead)
     Returns:
         Gold code sequence
     """
-    seq1 = prbs(order, n_bits, seed=seed1)
-    seq2 = prbs(order, n_bits, seed=seed2)
+    seq1 = prbs(order, n_bits, seed=seed1, start=start)
+    seq2 = prbs(order, n_bits, seed=seed2, start=start)
     return np.bitwise_xor(seq1, seq2)
 
 def gray_code(n_bits: int) -> np.ndarray:
@@ -106,30 +132,39 @@ def alternating(n_bits: int, start: int = 0) -> np.ndarray:
     """
     return np.array([(i + start) % 2 for i in range(n_bits)])
 
-def from_file(filepath: str) -> np.ndarray:
+def from_file(filepath: str, binary_path: str = None) -> np.ndarray:
     """
     Load bit sequence from a file (expects 0/1 per line or as a string).
+    Packed binary pattern files (bit_utils.pattern) are detected by their header
+    and read through np.memmap.
     Args:
         filepath: Path to file
+        binary_path: If given, also save the bits to this path in the packed
+            binary format, so later runs can memory-map it instead
     Returns:
         Bit sequence as numpy array
     """
-    with open(filepath, 'r') as f:
-        content = f.read().replace('\n', '').replace(' ', '')
-    return np.array([int(c) for c in content if c in '01'])
+    if is_pattern_file(filepath):
+        bits = PatternFile(filepath).bits().astype(int)
+    else:
+        with open(filepath, 'r') as f:
+            content = f.read().replace('\n', '').replace(' ', '')
+        bits = np.array([int(c) for c in content if c in '01'])
+    if binary_path is not None:
+        write_pattern(binary_path, bits)
+    return bits
 
 def scramble(bits: np.ndarray, seed: int = None) -> np.ndarray:
     """
     Scramble a bit sequence using a random XOR mask.
     Args:
         bits: Input bit sequence
-        seed: Optional seed
+        seed: Optional seed (private RandomState, global state untouched)
     Returns:
         Scrambled bit sequence
     """
-    if seed is not None:
-        np.random.seed(seed)
-    mask = np.random.randint(0, 2, size=len(bits))
+    rng = np.random.RandomState(seed) if seed is not None else np.random
+    mask = rng.randint(0, 2, size=len(bits))
     return np.bitwise_xor(bits, mask)
 
 def invert(bits: np.ndarray) -> np.ndarray:
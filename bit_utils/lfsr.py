@@ -0,0 +1,166 @@
+# Word-parallel LFSR engine for PRBS generation (GF(2) step matrices)
+import numpy as np
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+# Feedback taps per PRBS order, indexed from the output end of the register
+# (tap t reads reg[-t]); orders not listed fall back to [order, order-1].
+PRBS_TAPS = {
+    7: [7, 6],
+    9: [9, 5],
+    15: [15, 14],
+    23: [23, 18],
+    31: [31, 28],
+}
+
+# Bits generated per chunk; bounds the transient unpacked buffer when packing.
+CHUNK_BITS = 1 << 24
+
+
+def prbs_taps(order: int) -> Tuple[int, ...]:
+    """
+    Return the feedback taps used for a PRBS order.
+    Args:
+        order: LFSR order
+    Returns:
+        Tuple of tap positions (1-based, counted from the register output)
+    """
+    return tuple(PRBS_TAPS.get(order, [order, order - 1]))
+
+
+def lfsr_init(order: int, seed: int) -> Tuple[np.ndarray, Tuple[int, ...]]:
+    """
+    Build the initial LFSR state for a seed, matching bit_utils.core.prbs.
+    The register holds max(order, seed.bit_length()) bits and the first output
+    bits of the sequence are the register contents, LSB first.
+    Args:
+        order: LFSR order
+        seed: Initial value for the shift register
+    Returns:
+        (state, taps): state as uint8 array (state[i] is output bit i) and taps
+    """
+    seed = int(seed)
+    length = max(int(order), seed.bit_length())
+    state = np.array([(seed >> i) & 1 for i in range(length)], dtype=np.uint8)
+    return state, prbs_taps(order)
+
+
+@lru_cache(maxsize=None)
+def _step_matrix(length: int, taps: Tuple[int, ...]) -> np.ndarray:
+    """One-bit GF(2) transition matrix T with state[n+1] = T @ state[n]."""
+    t = np.zeros((length, length), dtype=np.uint8)
+    t[np.arange(length - 1), np.arange(1, length)] = 1
+    for tap in taps:
+        t[length - 1, (tap - 1) % length] ^= 1
+    return t
+
+
+def gf2_matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matrix product over GF(2) for 0/1 uint8 matrices."""
+    return ((a.astype(np.int64) @ b.astype(np.int64)) & 1).astype(np.uint8)
+
+
+def gf2_matpow(m: np.ndarray, k: int) -> np.ndarray:
+    """Raise a GF(2) matrix to a non-negative integer power by repeated squaring."""
+    result = np.eye(m.shape[0], dtype=np.uint8)
+    base = m
+    k = int(k)
+    while k > 0:
+        if k & 1:
+            result = gf2_matmul(base, result)
+        k >>= 1
+        if k:
+            base = gf2_matmul(base, base)
+    return result
+
+
+def lfsr_jump(state: np.ndarray, taps: Sequence[int], offset: int) -> np.ndarray:
+    """
+    Advance an LFSR state by offset bits in O(log offset) GF(2) matrix products.
+    Args:
+        state: Register contents as uint8 array (state[i] is output bit i)
+        taps: Feedback taps
+        offset: Number of bits to skip (>= 0)
+    Returns:
+        State after offset steps, as uint8 array
+    """
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    state = np.asarray(state, dtype=np.uint8)
+    if offset == 0:
+        return state.copy()
+    jump = gf2_matpow(_step_matrix(len(state), tuple(taps)), offset)
+    return gf2_matmul(jump, state[:, np.newaxis])[:, 0]
+
+
+def _lane_states(state: np.ndarray, jump: np.ndarray, n_lanes: int) -> np.ndarray:
+    """
+    States at offsets 0, B, 2B, ... for n_lanes lanes, where jump = T^B.
+    Doubles the number of known lanes per step (log2(n_lanes) GF(2) products).
+    """
+    states = state[np.newaxis, :]
+    power = jump
+    while states.shape[0] < n_lanes:
+        states = np.concatenate([states, gf2_matmul(states, power.T)])
+        power = gf2_matmul(power, power)
+    return states[:n_lanes]
+
+
+def lfsr_block(state: np.ndarray, taps: Sequence[int], n_bits: int) -> np.ndarray:
+    """
+    Generate n_bits of the LFSR sequence starting from state, many bits per step.
+    The sequence is split into lanes of B bits; the start state of every lane is
+    obtained with the GF(2) jump matrix T^B and all lanes are then advanced
+    together, so each NumPy step produces one bit for every lane.
+    Args:
+        state: Register contents as uint8 array (state[i] is output bit i)
+        taps: Feedback taps (1-based, counted from the register output)
+        n_bits: Number of bits to generate
+    Returns:
+        uint8 array of n_bits bits (0/1)
+    """
+    length = len(state)
+    if n_bits <= length:
+        return np.array(state[:n_bits], dtype=np.uint8)
+    lane_bits = max(length, int(np.ceil(np.sqrt(n_bits))))
+    n_lanes = -(-n_bits // lane_bits)
+    jump = gf2_matpow(_step_matrix(length, tuple(taps)), lane_bits)
+    lanes = np.empty((lane_bits, n_lanes), dtype=np.uint8)
+    lanes[:length] = _lane_states(np.asarray(state, dtype=np.uint8), jump, n_lanes).T
+    offsets = [(tap - 1) % length for tap in taps]
+    for j in range(lane_bits - length):
+        row = lanes[j + length]
+        np.copyto(row, lanes[j + offsets[0]])
+        for off in offsets[1:]:
+            np.bitwise_xor(row, lanes[j + off], out=row)
+    return lanes.T.reshape(-1)[:n_bits]
+
+
+def lfsr_bits(state: np.ndarray, taps: Sequence[int], n_bits: int, packed: bool = False) -> np.ndarray:
+    """
+    Generate LFSR output in chunks of CHUNK_BITS, optionally packed.
+    Args:
+        state: Register contents as uint8 array (state[i] is output bit i)
+        taps: Feedback taps
+        n_bits: Number of bits to generate
+        packed: If True, return np.packbits-style uint8 words (MSB first)
+    Returns:
+        uint8 array of bits, or packed bytes if packed is True
+    """
+    length = len(state)
+    chunk = max(CHUNK_BITS - CHUNK_BITS % 8, 8)
+    if n_bits <= chunk:
+        bits = lfsr_block(state, taps, n_bits)
+        return np.packbits(bits) if packed else bits
+    out = np.empty(-(-n_bits // 8) if packed else n_bits, dtype=np.uint8)
+    pos = 0
+    while pos < n_bits:
+        m = min(chunk, n_bits - pos)
+        blk = lfsr_block(state, taps, m + length)
+        state = blk[m:m + length]
+        if packed:
+            out[pos // 8:pos // 8 + -(-m // 8)] = np.packbits(blk[:m])
+        else:
+            out[pos:pos + m] = blk[:m]
+        pos += m
+    return out
@@ -0,0 +1,182 @@
+# Packed binary bit-pattern files: writer and np.memmap-backed reader
+import struct
+import numpy as np
+from typing import Iterator, Optional, Sequence
+
+# Header layout (16 bytes, little-endian):
+#   magic (4s) | version (B) | bit order (B, 0='big', 1='little') | reserved (2x) | n_bits (Q)
+PATTERN_MAGIC = b'BITP'
+PATTERN_VERSION = 1
+HEADER_FORMAT = '<4sBB2xQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+_BITORDERS = ('big', 'little')
+
+
+def is_pattern_file(filepath: str) -> bool:
+    """
+    Check whether a file starts with the packed pattern header.
+    Args:
+        filepath: Path to file
+    Returns:
+        True for packed binary pattern files, False otherwise (e.g. text patterns)
+    """
+    with open(filepath, 'rb') as f:
+        return f.read(len(PATTERN_MAGIC)) == PATTERN_MAGIC
+
+
+class PatternWriter:
+    """
+    Incremental writer for packed pattern files.
+    Blocks of any length can be appended; partial bytes are carried over to the
+    next write and the bit count is patched into the header on close().
+    """
+
+    def __init__(self, filepath: str, bitorder: str = 'big') -> None:
+        """
+        Args:
+            filepath: Output path
+            bitorder: 'big' (np.packbits default, MSB first) or 'little'
+        """
+        if bitorder not in _BITORDERS:
+            raise ValueError("bitorder must be 'big' or 'little'")
+        self.filepath = filepath
+        self.bitorder = bitorder
+        self.n_bits = 0
+        self._pending = np.zeros(0, dtype=np.uint8)
+        self._f = open(filepath, 'wb')
+        self._write_header()
+
+    def _write_header(self) -> None:
+        self._f.seek(0)
+        self._f.write(struct.pack(HEADER_FORMAT, PATTERN_MAGIC, PATTERN_VERSION,
+                                  _BITORDERS.index(self.bitorder), self.n_bits))
+
+    def write(self, bits: Sequence[int]) -> None:
+        """
+        Append bits (0/1) to the file.
+        Args:
+            bits: Bit block
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        self.n_bits += len(bits)
+        if len(self._pending):
+            bits = np.concatenate([self._pending, bits])
+        n_full = len(bits) - len(bits) % 8
+        if n_full:
+            self._f.write(np.packbits(bits[:n_full], bitorder=self.bitorder).tobytes())
+        self._pending = bits[n_full:].copy()
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        if len(self._pending):
+            self._f.write(np.packbits(self._pending, bitorder=self.bitorder).tobytes())
+            self._pending = np.zeros(0, dtype=np.uint8)
+        self._write_header()
+        self._f.close()
+
+    def __enter__(self) -> 'PatternWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_pattern(filepath: str, bits: Sequence[int], bitorder: str = 'big') -> None:
+    """
+    Write a bit sequence to a packed pattern file.
+    Args:
+        filepath: Output path
+        bits: Bit sequence (0/1)
+        bitorder: 'big' (MSB first) or 'little'
+    """
+    with PatternWriter(filepath, bitorder=bitorder) as w:
+        w.write(bits)
+
+
+class PatternFile:
+    """
+    Memory-mapped reader for packed pattern files.
+    packed() returns zero-copy views of the mapped bytes; bits() unpacks only the
+    requested range, so arbitrarily large captures can be sliced cheaply.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        """
+        Args:
+            filepath: Path to a file written by PatternWriter/write_pattern
+        """
+        with open(filepath, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{filepath}: truncated pattern header")
+        magic, version, order, n_bits = struct.unpack(HEADER_FORMAT, header)
+        if magic != PATTERN_MAGIC:
+            raise ValueError(f"{filepath}: not a packed pattern file")
+        if version != PATTERN_VERSION:
+            raise ValueError(f"{filepath}: unsupported pattern version {version}")
+        self.filepath = filepath
+        self.n_bits = int(n_bits)
+        self.bitorder = _BITORDERS[order]
+        n_bytes = -(-self.n_bits // 8)
+        if n_bytes:
+            self.data = np.memmap(filepath, dtype=np.uint8, mode='r', offset=HEADER_SIZE, shape=(n_bytes,))
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self.n_bits
+
+    def packed(self, start_byte: int = 0, stop_byte: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy view of the packed bytes [start_byte, stop_byte).
+        """
+        return self.data[start_byte:stop_byte]
+
+    def bits(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Unpack bits [start, stop) as a uint8 array.
+        Args:
+            start: First bit index
+            stop: One past the last bit index (default: end of pattern)
+        Returns:
+            uint8 array of bits (0/1)
+        """
+        stop = self.n_bits if stop is None else min(int(stop), self.n_bits)
+        start = max(int(start), 0)
+        if stop <= start:
+            return np.zeros(0, dtype=np.uint8)
+        b0 = start // 8
+        b1 = -(-stop // 8)
+        bits = np.unpackbits(self.data[b0:b1], bitorder=self.bitorder)
+        return bits[start - 8 * b0:stop - 8 * b0]
+
+    def blocks(self, block_bits: int = 1 << 20) -> Iterator[np.ndarray]:
+        """
+        Iterate over the pattern in unpacked blocks of block_bits.
+        """
+        for start in range(0, self.n_bits, block_bits):
+            yield self.bits(start, start + block_bits)
+
+
+def convert_text_pattern(src: str, dst: str, bitorder: str = 'big', block_bits: int = 1 << 20) -> int:
+    """
+    Convert a text bit-pattern file (as read by from_file) to the packed format,
+    streaming so the text file is never held in memory.
+    Args:
+        src: Text pattern path
+        dst: Output packed pattern path
+        bitorder: 'big' (MSB first) or 'little'
+        block_bits: Bits converted per step
+    Returns:
+        Number of bits written
+    """
+    from .source import FileSource
+    reader = FileSource(src, loop=False)
+    with PatternWriter(dst, bitorder=bitorder) as w:
+        while True:
+            blk = reader.next_block(block_bits)
+            if len(blk) == 0:
+                break
+            w.write(blk)
+        return w.n_bits
@@ -0,0 +1,296 @@
+# Streaming, resumable bit sources (BitSource protocol) for the bit_utils generators
+import numpy as np
+from typing import Any, Dict, Optional, Protocol, Sequence, runtime_checkable
+from .lfsr import lfsr_init, lfsr_jump, lfsr_block
+from .pattern import PatternFile, is_pattern_file
+
+
+@runtime_checkable
+class BitSource(Protocol):
+    """
+    Streaming bit generator.
+    next_block(n) returns the next n bits as a uint8 array; get_state() returns a
+    picklable dict that set_state() restores, so long runs can be checkpointed and
+    resumed with constant memory.
+    """
+
+    def next_block(self, n: int) -> np.ndarray:
+        ...
+
+    def get_state(self) -> Dict[str, Any]:
+        ...
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        ...
+
+
+class PrbsSource:
+    """
+    Streaming PRBS source, bit-identical to bit_utils.core.prbs.
+    """
+
+    def __init__(self, order: int, seed: Optional[int] = None, start: int = 0) -> None:
+        """
+        Args:
+            order: LFSR order
+            seed: Initial value for the shift register (if None, random)
+            start: Bit offset into the sequence to start from
+        """
+        if seed is None:
+            max_seed = min(2**order, 2**31 - 1)
+            seed = np.random.randint(1, max_seed)
+        self.order = int(order)
+        self.seed = int(seed)
+        self.set_state({'position': int(start)})
+
+    def next_block(self, n: int) -> np.ndarray:
+        length = len(self._reg)
+        blk = lfsr_block(self._reg, self._taps, n + length)
+        self._reg = blk[n:n + length]
+        self.position += n
+        return blk[:n]
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'order': self.order, 'seed': self.seed, 'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.order = int(state.get('order', self.order))
+        self.seed = int(state.get('seed', self.seed))
+        self.position = int(state['position'])
+        reg, self._taps = lfsr_init(self.order, self.seed)
+        self._reg = lfsr_jump(reg, self._taps, self.position)
+
+
+class GoldSource:
+    """
+    Streaming Gold code source (XOR of two PRBS sources), matches gold_code().
+    """
+
+    def __init__(self, order: int, seed1: Optional[int] = None, seed2: Optional[int] = None, start: int = 0) -> None:
+        self.prbs1 = PrbsSource(order, seed1, start)
+        self.prbs2 = PrbsSource(order, seed2, start)
+
+    @property
+    def position(self) -> int:
+        return self.prbs1.position
+
+    def next_block(self, n: int) -> np.ndarray:
+        return np.bitwise_xor(self.prbs1.next_block(n), self.prbs2.next_block(n))
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'prbs1': self.prbs1.get_state(), 'prbs2': self.prbs2.get_state()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.prbs1.set_state(state['prbs1'])
+        self.prbs2.set_state(state['prbs2'])
+
+
+class RandomSource:
+    """
+    Streaming random bits from a private RandomState (global np.random is untouched).
+    With a seed the stream matches random_bits(n, seed) for any block split.
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        self.rng = np.random.RandomState(seed)
+        self.position = 0
+
+    def next_block(self, n: int) -> np.ndarray:
+        self.position += n
+        return self.rng.randint(0, 2, size=n).astype(np.uint8)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'rng': self.rng.get_state(), 'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.rng.set_state(state['rng'])
+        self.position = int(state['position'])
+
+
+class RepeatSource:
+    """
+    Streaming repetition of a fixed bit pattern, matches repeat().
+    """
+
+    def __init__(self, pattern: Sequence[int]) -> None:
+        self.pattern = np.asarray(pattern, dtype=np.uint8)
+        if len(self.pattern) == 0:
+            raise ValueError("pattern must not be empty")
+        self.position = 0
+
+    def next_block(self, n: int) -> np.ndarray:
+        idx = (self.position + np.arange(n)) % len(self.pattern)
+        self.position += n
+        return self.pattern[idx]
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.position = int(state['position'])
+
+
+class AlternatingSource:
+    """
+    Streaming 0/1 alternating pattern, matches alternating().
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        self.start = int(start)
+        self.position = 0
+
+    def next_block(self, n: int) -> np.ndarray:
+        out = ((self.position + self.start + np.arange(n)) % 2).astype(np.uint8)
+        self.position += n
+        return out
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'start': self.start, 'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.start = int(state.get('start', self.start))
+        self.position = int(state['position'])
+
+
+class FileSource:
+    """
+    Streaming reader for text bit-pattern files (same format as from_file()).
+    Reads only as many bytes as needed per block; the file offset is part of the
+    state, so no file handle is kept open between calls.
+    """
+
+    def __init__(self, filepath: str, loop: bool = True, read_size: int = 1 << 20) -> None:
+        """
+        Args:
+            filepath: Path to file
+            loop: If True, restart at the beginning of the file at EOF; otherwise
+                next_block() returns fewer bits once the file is exhausted
+            read_size: Minimum number of bytes read from the file per call
+        """
+        self.filepath = filepath
+        self.loop = loop
+        self.read_size = int(read_size)
+        self.offset = 0
+        self.position = 0
+
+    def next_block(self, n: int) -> np.ndarray:
+        out = []
+        need = n
+        wrapped = False
+        with open(self.filepath, 'rb') as f:
+            while need > 0:
+                f.seek(self.offset)
+                raw = np.frombuffer(f.read(max(need, self.read_size)), dtype=np.uint8)
+                if raw.size == 0:
+                    # An EOF right after a wrap means the file holds no bits at all
+                    if not self.loop or wrapped:
+                        break
+                    self.offset = 0
+                    wrapped = True
+                    continue
+                idx = np.flatnonzero((raw == ord('0')) | (raw == ord('1')))
+                if idx.size:
+                    wrapped = False
+                if idx.size >= need:
+                    idx = idx[:need]
+                    self.offset += int(idx[-1]) + 1
+                else:
+                    self.offset += raw.size
+                out.append(raw[idx] - ord('0'))
+                need -= idx.size
+        bits = np.concatenate(out).astype(np.uint8) if out else np.zeros(0, dtype=np.uint8)
+        self.position += len(bits)
+        return bits
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'filepath': self.filepath, 'offset': self.offset, 'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.filepath = state.get('filepath', self.filepath)
+        self.offset = int(state['offset'])
+        self.position = int(state['position'])
+
+
+class PatternSource:
+    """
+    Streaming reader for packed binary pattern files (bit_utils.pattern).
+    Blocks are unpacked from the memory-mapped file; the bit position is the state.
+    """
+
+    def __init__(self, filepath: str, loop: bool = True) -> None:
+        """
+        Args:
+            filepath: Path to a packed pattern file
+            loop: If True, wrap around at the end of the pattern; otherwise
+                next_block() returns fewer bits once the pattern is exhausted
+        """
+        self.filepath = filepath
+        self.loop = loop
+        self.pattern = PatternFile(filepath)
+        self.position = 0
+
+    def next_block(self, n: int) -> np.ndarray:
+        total = len(self.pattern)
+        if total == 0:
+            return np.zeros(0, dtype=np.uint8)
+        if not self.loop:
+            out = self.pattern.bits(self.position, self.position + n)
+            self.position += len(out)
+            return out
+        out = []
+        need = n
+        while need > 0:
+            start = self.position % total
+            blk = self.pattern.bits(start, start + need)
+            out.append(blk)
+            need -= len(blk)
+            self.position += len(blk)
+        return np.concatenate(out)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'filepath': self.filepath, 'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        if state.get('filepath', self.filepath) != self.filepath:
+            self.filepath = state['filepath']
+            self.pattern = PatternFile(self.filepath)
+        self.position = int(state['position'])
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # np.memmap handles are reopened on unpickle rather than serialized
+        return {'filepath': self.filepath, 'loop': self.loop, 'position': self.position}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state['filepath'], loop=state['loop'])
+        self.position = state['position']
+
+
+def make_bit_source(mode: str = 'random', seed: Optional[int] = None, prbs_order: int = 7, **kwargs: Any) -> BitSource:
+    """
+    Build a BitSource for a Tx bit mode.
+    Args:
+        mode: 'random', 'prbs', 'gold', 'alternating', 'repeat' or 'file'
+        seed: Optional seed (PRBS register seed or RNG seed)
+        prbs_order: PRBS order (used for 'prbs' and 'gold')
+        kwargs: Extra arguments: pattern ('repeat'), filepath ('file'),
+            seed2 ('gold'), start ('prbs', 'gold', 'alternating')
+    Returns:
+        BitSource instance
+    """
+    mode = mode.lower()
+    if mode == 'random':
+        return RandomSource(seed)
+    if mode == 'prbs':
+        return PrbsSource(prbs_order, seed, start=kwargs.get('start', 0))
+    if mode == 'gold':
+        return GoldSource(prbs_order, seed, kwargs.get('seed2'), start=kwargs.get('start', 0))
+    if mode == 'alternating':
+        return AlternatingSource(kwargs.get('start', 0))
+    if mode == 'repeat':
+        return RepeatSource(kwargs['pattern'])
+    if mode == 'file':
+        filepath = kwargs['filepath']
+        if is_pattern_file(filepath):
+            return PatternSource(filepath, loop=kwargs.get('loop', True))
+        return FileSource(filepath, loop=kwargs.get('loop', True))
+    raise ValueError(f"Unknown bit source mode: {mode}")
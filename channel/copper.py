@@ -0,0 +1,159 @@
+import numpy as np
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+from config.schema import ChannelCfg
+
+# Physical constants
+C0 = 299792458.0               # speed of light (m/s)
+RHO_CU_20C = 1.724e-8          # copper resistivity at 20 C (ohm*m)
+TCR_CU = 0.00393               # copper temperature coefficient of resistance (1/C)
+M_PER_IN = 0.0254
+NP_TO_DB = 20 / np.log(10)
+
+# Reference conductor for alpha_db_per_in_ghz: 28 AWG at 20 C
+REF_GAUGE = 28
+REF_TEMPERATURE = 20.0
+
+# Differential impedance used for the DC conductor loss (ohm)
+Z_DIFF = 100.0
+
+# Relative permittivity of the dielectric per cable profile
+PROFILE_ER = {
+	'sfp+': 2.1,       # FEP/PTFE twinax
+	'qsfp': 2.1,
+	'twinax': 2.1,
+	'foam': 1.5,       # foamed polyethylene
+	'pcb': 4.3,        # FR4
+	'fr4': 4.3,
+	'megtron6': 3.4,
+}
+DEFAULT_ER = 2.1
+
+# Default impulse response length (taps at the simulation rate)
+DEFAULT_N_TAPS = 4096
+
+def awg_diameter_m(gauge: float) -> float:
+	"""
+	Bare conductor diameter of an AWG wire.
+	Args:
+		gauge: American Wire Gauge number.
+	Returns:
+		Diameter in meters.
+	"""
+	return 0.127e-3 * 92 ** ((36 - gauge) / 39)
+
+def copper_loss_db(f_hz: np.ndarray, cfg: ChannelCfg) -> np.ndarray:
+	"""
+	Insertion loss of a copper pair in dB (positive numbers).
+	Terms:
+		- fixed_loss_db, flat.
+		- DC conductor loss from the wire resistance, 2 * R_dc / (2 * Z_DIFF).
+		- Skin effect (skin_effect=True): alpha_db_per_in_ghz dB/inch at f_ref_ghz
+		  for 28 AWG at 20 C, scaled by sqrt(f / f_ref), by the inverse diameter
+		  ratio (gauge) and by sqrt(rho(T) / rho(20 C)).
+		- Dielectric: 8.686 * pi * f * sqrt(er) * tan(delta) / c per meter, with er
+		  taken from the profile.
+	Args:
+		f_hz: Frequencies (Hz).
+		cfg: ChannelCfg dataclass instance.
+	Returns:
+		Loss in dB at each frequency.
+	"""
+	f = np.abs(np.asarray(f_hz, dtype=float))
+	alpha = cfg.alpha_db_per_in_ghz if cfg.alpha_db_per_in_ghz is not None else 0.5
+	length_in = cfg.length_in if cfg.length_in is not None else 20.0
+	f_ref = (cfg.f_ref_ghz if cfg.f_ref_ghz is not None else 10.0) * 1e9
+	gauge = cfg.gauge if cfg.gauge is not None else REF_GAUGE
+	temperature = cfg.temperature if cfg.temperature is not None else REF_TEMPERATURE
+	tan_d = cfg.dielectric_loss if cfg.dielectric_loss is not None else 0.0
+	fixed_loss_db = cfg.fixed_loss_db if cfg.fixed_loss_db is not None else 0.0
+	er = PROFILE_ER.get(str(cfg.profile).lower(), DEFAULT_ER) if cfg.profile is not None else DEFAULT_ER
+
+	d = awg_diameter_m(gauge)
+	rho_scale = 1 + TCR_CU * (temperature - REF_TEMPERATURE)
+	# DC: two conductors in series against the differential impedance
+	r_dc = RHO_CU_20C * rho_scale / (np.pi * d ** 2 / 4)  # ohm/m per conductor
+	loss = np.full(f.shape, fixed_loss_db + NP_TO_DB * r_dc / Z_DIFF * M_PER_IN * length_in)
+	if cfg.skin_effect is None or cfg.skin_effect:
+		scale = (awg_diameter_m(REF_GAUGE) / d) * np.sqrt(rho_scale)
+		loss += alpha * length_in * scale * np.sqrt(f / f_ref)
+	loss += NP_TO_DB * np.pi * f * np.sqrt(er) * tan_d / C0 * M_PER_IN * length_in
+	return loss
+
+def minimum_phase_response(mag: np.ndarray, n_fft: int) -> np.ndarray:
+	"""
+	Causal (minimum-phase) impulse response for a magnitude response.
+	Uses the folded real cepstrum of log|H|.
+	Args:
+		mag: |H| on the rfft grid of n_fft points.
+		n_fft: FFT length.
+	Returns:
+		Real impulse response of length n_fft.
+	"""
+	log_mag = np.log(np.maximum(mag, 1e-300))
+	cep = np.fft.irfft(log_mag, n_fft)
+	fold = np.zeros(n_fft)
+	fold[0] = cep[0]
+	fold[1:(n_fft + 1) // 2] = 2 * cep[1:(n_fft + 1) // 2]
+	if n_fft % 2 == 0:
+		fold[n_fft // 2] = cep[n_fft // 2]
+	return np.fft.irfft(np.exp(np.fft.rfft(fold)), n_fft)
+
+def _cfg_key(cfg: ChannelCfg) -> Tuple:
+	return (cfg.fixed_loss_db, cfg.alpha_db_per_in_ghz, cfg.length_in, cfg.f_ref_ghz, cfg.gauge,
+		cfg.temperature, cfg.skin_effect, cfg.dielectric_loss, cfg.profile)
+
+@lru_cache(maxsize=64)
+def _impulse_response(key: Tuple, sample_rate: float, n_taps: int) -> np.ndarray:
+	fields = ('fixed_loss_db', 'alpha_db_per_in_ghz', 'length_in', 'f_ref_ghz', 'gauge',
+		'temperature', 'skin_effect', 'dielectric_loss', 'profile')
+	cfg = ChannelCfg(type='copper_fd', **dict(zip(fields, key)))
+	# oversized FFT keeps cepstral aliasing out of the kept taps
+	n_fft = 4 * n_taps
+	f = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+	mag = 10 ** (-copper_loss_db(f, cfg) / 20)
+	h = minimum_phase_response(mag, n_fft)[:n_taps]
+	h.setflags(write=False)
+	return h
+
+def copper_impulse_response(cfg: ChannelCfg, sample_rate: float, n_taps: Optional[int] = None) -> np.ndarray:
+	"""
+	Causal impulse response of the physical copper model at sample_rate.
+	Responses are memoized per (loss fields, sample_rate, n_taps), so sweeps
+	over Tx or Rx settings build the channel only once.
+	Args:
+		cfg: ChannelCfg dataclass instance.
+		sample_rate: Simulation sample rate (Sa/s).
+		n_taps: Impulse response length (default DEFAULT_N_TAPS).
+	Returns:
+		Impulse response (read-only array).
+	"""
+	n_taps = int(n_taps) if n_taps is not None else DEFAULT_N_TAPS
+	return _impulse_response(_cfg_key(cfg), float(sample_rate), n_taps)
+
+def copper_fd_channel(waveform: Sequence[float], cfg: ChannelCfg, sample_rate: float, n_taps: Optional[int] = None) -> np.ndarray:
+	"""
+	Physical copper channel: frequency-domain loss model applied by FFT
+	convolution with its cached causal impulse response, then delay and AWGN
+	as in copper_channel.
+	Args:
+		waveform: Input waveform samples.
+		cfg: ChannelCfg dataclass instance.
+		sample_rate: Sample rate of waveform (Sa/s).
+		n_taps: Impulse response length (default DEFAULT_N_TAPS).
+	Returns:
+		Output waveform (same length as input).
+	"""
+	from scipy.signal import fftconvolve
+	x = np.asarray(waveform, dtype=float)
+	h = copper_impulse_response(cfg, sample_rate, n_taps)
+	out = fftconvolve(x, h)[:len(x)]
+	awgn_sigma = cfg.awgn_sigma if cfg.awgn_sigma is not None else 0.0
+	delay = int(cfg.delay) if cfg.delay is not None else 0
+	# Delay
+	if delay > 0:
+		out = np.concatenate([np.zeros(delay), out[:-delay]])
+	# AWGN
+	if awgn_sigma > 0:
+		out += np.random.normal(0, awgn_sigma, size=out.shape)
+	return out
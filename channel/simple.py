@@ -1,8 +1,9 @@
 
 
 import numpy as np
-from typing import Sequence
+from typing import Any, Dict, Sequence, Tuple
 from config.schema import ChannelCfg
+from core.utils import convolve
 
 def simple_channel(waveform: Sequence[float], cfg: ChannelCfg) -> np.ndarray:
 	"""
@@ -19,7 +20,7 @@ def simple_channel(waveform: Sequence[float], cfg: ChannelCfg) -> np.ndarray:
 	fixed_loss_db = cfg.fixed_loss_db if cfg.fixed_loss_db is not None else 0.0
 	gain = 10 ** (-fixed_loss_db / 20)
 	# FIR ISI
-	out = np.convolve(waveform, isi_taps, mode='same')
+	out = convolve(waveform, isi_taps, mode='same')
 	# Gain
 	out *= gain
 	# Delay
@@ -30,43 +31,92 @@ def simple_channel(waveform: Sequence[float], cfg: ChannelCfg) -> np.ndarray:
 		out += np.random.normal(0, awgn_sigma, size=out.shape)
 	return out
 
-def copper_channel(waveform: Sequence[float], cfg: ChannelCfg) -> np.ndarray:
+def _copper_params(cfg: ChannelCfg) -> Tuple[float, float, int, float]:
 	"""
-	Copper channel: frequency-dependent loss profile using ChannelCfg.
-	Args:
-		waveform: Input waveform samples.
-		cfg: ChannelCfg dataclass instance.
+	Copper channel parameters from ChannelCfg.
 	Returns:
-		Output waveform after copper channel effects.
+		(gain, norm_cutoff, delay, awgn_sigma)
 	"""
-	# Calculate frequency-dependent loss
 	alpha = cfg.alpha_db_per_in_ghz if cfg.alpha_db_per_in_ghz is not None else 0.5
 	length = cfg.length_in if cfg.length_in is not None else 20.0
 	f_ref = cfg.f_ref_ghz if cfg.f_ref_ghz is not None else 10.0
 	fixed_loss_db = cfg.fixed_loss_db if cfg.fixed_loss_db is not None else 0.0
 	awgn_sigma = cfg.awgn_sigma if cfg.awgn_sigma is not None else 0.0
 	delay = int(cfg.delay) if cfg.delay is not None else 0
-
-	# Apply fixed loss
 	gain = 10 ** (-fixed_loss_db / 20)
-	out = np.array(waveform) * gain
-
-	# Apply frequency-dependent loss (simple lowpass filter)
 	# For demo: use a single-pole IIR filter to mimic copper roll-off
 	# Compute cutoff frequency based on alpha, length, and f_ref
 	cutoff = f_ref / (1 + alpha * length)
 	# Normalize cutoff to Nyquist (assume sps=1 for demo)
 	norm_cutoff = min(0.5, cutoff / (2 * f_ref))
-	# Simple IIR lowpass
-	b = [norm_cutoff]
-	a = [1, norm_cutoff - 1]
-	for i in range(1, len(out)):
-		out[i] = b[0] * out[i] + a[1] * out[i-1]
+	return gain, norm_cutoff, delay, awgn_sigma
 
-	# Delay
-	if delay > 0:
-		out = np.concatenate([np.zeros(delay), out[:-delay]])
-	# AWGN
-	if awgn_sigma > 0:
-		out += np.random.normal(0, awgn_sigma, size=out.shape)
-	return out
+class CopperChannel:
+	"""
+	Stateful copper channel for block-by-block processing.
+	The single-pole IIR runs through scipy.signal.lfilter with its state (zi)
+	carried between blocks, along with the delay line, so concatenated
+	process() outputs equal copper_channel() on the whole waveform (AWGN is
+	drawn per block, so with noise only the statistics match).
+	"""
+	def __init__(self, cfg: ChannelCfg) -> None:
+		"""
+		Args:
+			cfg: ChannelCfg dataclass instance.
+		"""
+		self.gain, self.norm_cutoff, self.delay, self.awgn_sigma = _copper_params(cfg)
+		# out[i] = nc * x[i] + (nc - 1) * out[i-1]
+		self.b = np.array([self.norm_cutoff])
+		self.a = np.array([1.0, 1.0 - self.norm_cutoff])
+		self.reset()
+
+	def reset(self) -> None:
+		"""Clear the filter state and delay line."""
+		self.zi = None  # None until the first sample (passed through unfiltered)
+		self.delay_line = np.zeros(self.delay)
+
+	def get_state(self) -> Dict[str, Any]:
+		return {'zi': None if self.zi is None else self.zi.copy(), 'delay_line': self.delay_line.copy()}
+
+	def set_state(self, state: Dict[str, Any]) -> None:
+		self.zi = None if state['zi'] is None else np.array(state['zi'], dtype=float)
+		self.delay_line = np.array(state['delay_line'], dtype=float)
+
+	def process(self, block: Sequence[float]) -> np.ndarray:
+		"""
+		Filter one block of waveform samples.
+		Args:
+			block: Input waveform samples.
+		Returns:
+			Output samples (same length as block).
+		"""
+		from scipy.signal import lfilter
+		out = np.array(block, dtype=float) * self.gain
+		if len(out) == 0:
+			return out
+		if self.zi is None:
+			# First sample of the stream seeds the recursion as-is
+			self.zi = np.array([(self.norm_cutoff - 1) * out[0]])
+			out[1:], self.zi = lfilter(self.b, self.a, out[1:], zi=self.zi)
+		else:
+			out, self.zi = lfilter(self.b, self.a, out, zi=self.zi)
+		# Delay
+		if self.delay > 0:
+			out = np.concatenate([self.delay_line, out])
+			self.delay_line = out[-self.delay:].copy()
+			out = out[:-self.delay]
+		# AWGN
+		if self.awgn_sigma > 0:
+			out += np.random.normal(0, self.awgn_sigma, size=out.shape)
+		return out
+
+def copper_channel(waveform: Sequence[float], cfg: ChannelCfg) -> np.ndarray:
+	"""
+	Copper channel: frequency-dependent loss profile using ChannelCfg.
+	Args:
+		waveform: Input waveform samples.
+		cfg: ChannelCfg dataclass instance.
+	Returns:
+		Output waveform after copper channel effects.
+	"""
+	return CopperChannel(cfg).process(waveform)
@@ -1 +1,284 @@
-# (later) S-parameter/FD channel via fast convolution
+# S-parameter/FD channel via fast convolution
+import hashlib
+import os
+import re
+import numpy as np
+from typing import Optional, Sequence, Tuple
+from config.schema import ChannelCfg
+from core.utils import OverlapSaveConvolver, next_pow2
+
+_FREQ_UNITS = {'hz': 1.0, 'khz': 1e3, 'mhz': 1e6, 'ghz': 1e9}
+
+# Default cache location for parsed networks and impulse responses
+CACHE_ENV = 'SERDES_SIM_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'serdes_sim', 'sparam')
+
+# Fraction of the kept impulse response tapered to zero at its end
+GATE_TAPER = 0.05
+
+def read_touchstone(filepath: str) -> Tuple[np.ndarray, np.ndarray, float]:
+	"""
+	Read a Touchstone v1 S-parameter file (.s1p, .s2p, .s4p, ...).
+	Args:
+		filepath: Path to file; the port count is taken from the .sNp suffix.
+	Returns:
+		(freqs, s, z0): frequencies (Hz), S-matrices of shape (n_freqs, n, n)
+		with s[k, i, j] = S(i+1)(j+1), and the reference impedance.
+	"""
+	m = re.search(r'\.s(\d+)p$', filepath, re.IGNORECASE)
+	if m is None:
+		raise ValueError(f"{filepath}: cannot infer port count, expected a .sNp file")
+	n_ports = int(m.group(1))
+	unit, fmt, z0 = 1e9, 'ma', 50.0
+	per_freq = 1 + 2 * n_ports * n_ports
+	rows = []
+	pending = []
+	with open(filepath, 'r') as f:
+		for line in f:
+			line = line.split('!', 1)[0].strip()
+			if not line:
+				continue
+			if line.startswith('#'):
+				opts = line[1:].lower().split()
+				for i, tok in enumerate(opts):
+					if tok in _FREQ_UNITS:
+						unit = _FREQ_UNITS[tok]
+					elif tok in ('ma', 'db', 'ri'):
+						fmt = tok
+					elif tok in ('y', 'z', 'h', 'g'):
+						raise ValueError(f"{filepath}: only S-parameters are supported, got {tok.upper()}")
+					elif tok == 'r' and i + 1 < len(opts):
+						z0 = float(opts[i + 1])
+				continue
+			if line.startswith('['):
+				raise ValueError(f"{filepath}: Touchstone 2.0 keywords are not supported")
+			values = [float(v) for v in line.split()]
+			if n_ports == 2 and not pending and rows and values[0] <= rows[-1][0]:
+				break  # noise parameters follow the network data and restart the frequency axis
+			pending.extend(values)
+			while len(pending) >= per_freq:
+				rows.append(pending[:per_freq])
+				pending = pending[per_freq:]
+	if not rows:
+		raise ValueError(f"{filepath}: no network data")
+	data = np.array(rows)
+	freqs = data[:, 0] * unit
+	a, b = data[:, 1::2], data[:, 2::2]
+	if fmt == 'ri':
+		values = a + 1j * b
+	elif fmt == 'ma':
+		values = a * np.exp(1j * np.deg2rad(b))
+	else:
+		values = 10 ** (a / 20) * np.exp(1j * np.deg2rad(b))
+	s = values.reshape(-1, n_ports, n_ports)
+	if n_ports == 2:
+		# v1 2-port data is ordered S11 S21 S12 S22
+		s = s.transpose(0, 2, 1)
+	return freqs, s, z0
+
+def sdd21(s: np.ndarray, inputs: Tuple[int, int] = (1, 2), outputs: Tuple[int, int] = (3, 4)) -> np.ndarray:
+	"""
+	Differential-mode insertion loss from a single-ended S-matrix.
+	SDD21 = 0.5 * (S[p2,p1] - S[p2,n1] - S[n2,p1] + S[n2,n1]) for input pair
+	(p1, n1) and output pair (p2, n2), 1-based port numbers. A 2-port network
+	is taken to be differential already and S21 is returned.
+	Args:
+		s: S-matrices, shape (n_freqs, n, n).
+		inputs: (positive, negative) input ports.
+		outputs: (positive, negative) output ports.
+	Returns:
+		Complex SDD21 per frequency.
+	"""
+	if s.shape[1] == 2:
+		return s[:, 1, 0]
+	if s.shape[1] < 4:
+		raise ValueError("differential SDD21 needs a network with at least 4 ports")
+	p1, n1 = inputs[0] - 1, inputs[1] - 1
+	p2, n2 = outputs[0] - 1, outputs[1] - 1
+	return 0.5 * (s[:, p2, p1] - s[:, p2, n1] - s[:, n2, p1] + s[:, n2, n1])
+
+def resample_response(freqs: np.ndarray, h: np.ndarray, sample_rate: float, n_fft: int) -> np.ndarray:
+	"""
+	Interpolate a measured transfer function onto the rfft grid of n_fft points.
+	Magnitude and unwrapped phase are interpolated linearly. Below the first
+	point the magnitude is held and the phase is taken linearly to 0 at DC;
+	above the last point the phase continues with the final group delay and
+	the magnitude is tapered to zero at Nyquist with a raised cosine.
+	Args:
+		freqs: Measured frequencies (Hz), ascending.
+		h: Complex response at freqs.
+		sample_rate: Simulation sample rate (Sa/s).
+		n_fft: FFT length of the target grid.
+	Returns:
+		Complex response on np.fft.rfftfreq(n_fft, 1 / sample_rate).
+	"""
+	grid = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+	mag = np.abs(h)
+	phase = np.unwrap(np.angle(h))
+	# remove the 2*pi ambiguity of the first point using the low-frequency delay
+	k = max(min(len(freqs) // 20, 50), 2) if len(freqs) > 2 else len(freqs)
+	if k >= 2 and freqs[k - 1] > freqs[0]:
+		slope = (phase[k - 1] - phase[0]) / (freqs[k - 1] - freqs[0])
+		intercept = phase[0] - slope * freqs[0]
+		phase = phase - 2 * np.pi * np.round(intercept / (2 * np.pi))
+	f_lo = np.concatenate([[0.0], freqs]) if freqs[0] > 0 else freqs
+	ph_lo = np.concatenate([[0.0], phase]) if freqs[0] > 0 else phase - phase[0]
+	mag_lo = np.concatenate([[mag[0]], mag]) if freqs[0] > 0 else mag
+	out_mag = np.interp(grid, f_lo, mag_lo)
+	out_phase = np.interp(grid, f_lo, ph_lo)
+	above = grid > freqs[-1]
+	if np.any(above):
+		tail = max(len(freqs) // 10, 2)
+		if len(freqs) >= 2:
+			delay_slope = (phase[-1] - phase[-tail]) / (freqs[-1] - freqs[-tail])
+		else:
+			delay_slope = 0.0
+		out_phase[above] = phase[-1] + delay_slope * (grid[above] - freqs[-1])
+		nyq = sample_rate / 2
+		x = (grid[above] - freqs[-1]) / max(nyq - freqs[-1], 1e-30)
+		out_mag[above] = mag[-1] * 0.5 * (1 + np.cos(np.pi * np.clip(x, 0, 1)))
+	return out_mag * np.exp(1j * out_phase)
+
+def impulse_response(freqs: np.ndarray, h: np.ndarray, sample_rate: float, n_taps: int) -> np.ndarray:
+	"""
+	Causal, passive impulse response from a measured transfer function.
+	The response is resampled onto a grid fine enough for n_taps, transformed,
+	time-gated to [0, n_taps) with a short end taper (anything that wrapped
+	around to negative time is discarded), and scaled so that |H| <= 1.
+	Args:
+		freqs, h: Measured frequencies (Hz) and complex response.
+		sample_rate: Simulation sample rate (Sa/s).
+		n_taps: Impulse response length.
+	Returns:
+		Impulse response of length n_taps.
+	"""
+	n_fft = next_pow2(2 * n_taps)
+	hf = resample_response(freqs, h, sample_rate, n_fft)
+	ir = np.fft.irfft(hf, n_fft)[:n_taps]
+	n_taper = max(int(n_taps * GATE_TAPER), 1)
+	ir[-n_taper:] *= 0.5 * (1 + np.cos(np.pi * np.arange(1, n_taper + 1) / n_taper))
+	peak = np.max(np.abs(np.fft.rfft(ir, n_fft)))
+	if peak > 1:
+		ir /= peak
+	return ir
+
+def _file_hash(filepath: str) -> str:
+	sha = hashlib.sha256()
+	with open(filepath, 'rb') as f:
+		for chunk in iter(lambda: f.read(1 << 20), b''):
+			sha.update(chunk)
+	return sha.hexdigest()
+
+def _cache_dir(cache_dir: Optional[str]) -> str:
+	path = cache_dir or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_DIR
+	os.makedirs(path, exist_ok=True)
+	return path
+
+def load_network(filepath: str, cache_dir: Optional[str] = None, use_cache: bool = True) -> Tuple[np.ndarray, np.ndarray, float]:
+	"""
+	read_touchstone() with an on-disk cache keyed by the file's SHA-256.
+	Args:
+		filepath: Touchstone file.
+		cache_dir: Cache directory (default: $SERDES_SIM_CACHE or ~/.cache/serdes_sim/sparam).
+		use_cache: If False, always parse the file.
+	Returns:
+		(freqs, s, z0) as read_touchstone().
+	"""
+	if not use_cache:
+		return read_touchstone(filepath)
+	path = os.path.join(_cache_dir(cache_dir), _file_hash(filepath) + '.net.npz')
+	if os.path.exists(path):
+		with np.load(path) as d:
+			return d['freqs'], d['s'], float(d['z0'])
+	freqs, s, z0 = read_touchstone(filepath)
+	np.savez(path, freqs=freqs, s=s, z0=z0)
+	return freqs, s, z0
+
+def default_n_taps(freqs: np.ndarray, sample_rate: float) -> int:
+	"""Impulse length covering the time span resolved by the file, 1 / min frequency step."""
+	df = np.min(np.diff(freqs)) if len(freqs) > 1 else freqs[0]
+	return int(np.ceil(sample_rate / df))
+
+def sparam_impulse_response(
+	filepath: str,
+	sample_rate: float,
+	n_taps: Optional[int] = None,
+	inputs: Tuple[int, int] = (1, 2),
+	outputs: Tuple[int, int] = (3, 4),
+	cache_dir: Optional[str] = None,
+	use_cache: bool = True,
+) -> np.ndarray:
+	"""
+	SDD21 impulse response of a Touchstone file at sample_rate, cached on disk
+	keyed by file hash, sample rate, length and port mapping.
+	Args:
+		filepath: Touchstone file (.s4p, or .s2p taken as differential).
+		sample_rate: Simulation sample rate (Sa/s).
+		n_taps: Impulse response length (default: default_n_taps()).
+		inputs, outputs: Differential port pairs, see sdd21().
+		cache_dir: Cache directory (see load_network()).
+		use_cache: If False, bypass the disk cache.
+	Returns:
+		Impulse response.
+	"""
+	path = None
+	if use_cache:
+		key = hashlib.sha256(repr((float(sample_rate), n_taps, tuple(inputs), tuple(outputs))).encode()).hexdigest()[:16]
+		path = os.path.join(_cache_dir(cache_dir), f"{_file_hash(filepath)}_{key}.ir.npz")
+		if os.path.exists(path):
+			with np.load(path) as d:
+				return d['h']
+	freqs, s, _ = load_network(filepath, cache_dir, use_cache)
+	n_taps = int(n_taps) if n_taps is not None else default_n_taps(freqs, sample_rate)
+	h = impulse_response(freqs, sdd21(s, inputs, outputs), sample_rate, n_taps)
+	if path is not None:
+		np.savez(path, h=h)
+	return h
+
+class SparamChannel:
+	"""
+	Streaming S-parameter channel: SDD21 impulse response applied with an
+	overlap-save convolver whose state is carried across process() calls.
+	"""
+	def __init__(self, cfg: ChannelCfg, sample_rate: float, n_taps: Optional[int] = None, **kwargs) -> None:
+		"""
+		Args:
+			cfg: ChannelCfg with sparam_file set.
+			sample_rate: Simulation sample rate (Sa/s).
+			n_taps: Impulse response length (default: default_n_taps()).
+			kwargs: Passed to sparam_impulse_response (inputs, outputs, cache_dir, use_cache).
+		"""
+		if not getattr(cfg, 'sparam_file', None):
+			raise ValueError("ChannelCfg.sparam_file must be set for an S-parameter channel")
+		self.h = sparam_impulse_response(cfg.sparam_file, sample_rate, n_taps, **kwargs)
+		self.convolver = OverlapSaveConvolver(self.h)
+		fixed_loss_db = cfg.fixed_loss_db if cfg.fixed_loss_db is not None else 0.0
+		self.gain = 10 ** (-fixed_loss_db / 20)
+		self.awgn_sigma = cfg.awgn_sigma if cfg.awgn_sigma is not None else 0.0
+
+	def process(self, block: Sequence[float]) -> np.ndarray:
+		"""
+		Filter one block of waveform samples.
+		Args:
+			block: Input waveform samples.
+		Returns:
+			Output samples (same length as block).
+		"""
+		out = self.convolver.process(block) * self.gain
+		# AWGN
+		if self.awgn_sigma > 0:
+			out += np.random.normal(0, self.awgn_sigma, size=out.shape)
+		return out
+
+def sparam_channel(waveform: Sequence[float], cfg: ChannelCfg, sample_rate: float, n_taps: Optional[int] = None, **kwargs) -> np.ndarray:
+	"""
+	S-parameter channel applied to a whole waveform (see SparamChannel).
+	Args:
+		waveform: Input waveform samples.
+		cfg: ChannelCfg with sparam_file set.
+		sample_rate: Sample rate of waveform (Sa/s).
+		n_taps: Impulse response length.
+	Returns:
+		Output waveform (same length as input).
+	"""
+	return SparamChannel(cfg, sample_rate, n_taps, **kwargs).process(waveform)
@@ -0,0 +1,138 @@
+# Crosstalk (NEXT/FEXT) aggressors: coupling responses, batched lane convolution, PDFs
+import numpy as np
+from typing import Optional, Sequence, Tuple
+from config.schema import AggressorCfg
+from core.utils import next_pow2
+from metrics.stateye import isi_pmf
+from .copper import minimum_phase_response
+
+# Coupling magnitude slope vs frequency: NEXT rises 15 dB/dec, FEXT 20 dB/dec
+COUPLING_SLOPE = {'next': 0.75, 'fext': 1.0}
+
+# Coupling floor relative to the f_ref magnitude (keeps the cepstrum finite at DC)
+COUPLING_FLOOR = 1e-6
+
+DEFAULT_COUPLING_TAPS = 1024
+
+def coupling_impulse_response(
+	agg: AggressorCfg,
+	sample_rate: float,
+	n_taps: Optional[int] = None,
+	thru: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+	"""
+	Causal coupling impulse response from an aggressor Tx to the victim Rx.
+	Uses agg.impulse_response when given; otherwise a minimum-phase power-law
+	model |H| = 10^(coupling_db/20) * (min(f, f_sat) / f_ref)^slope, with the
+	slope from COUPLING_SLOPE. FEXT travels with the victim signal, so its
+	magnitude is also shaped by the thru channel when one is given.
+	Args:
+		agg: AggressorCfg dataclass instance.
+		sample_rate: Simulation sample rate (Sa/s).
+		n_taps: Response length (default DEFAULT_COUPLING_TAPS, or len(thru)).
+		thru: Victim channel impulse response at sample_rate (FEXT only).
+	Returns:
+		Impulse response.
+	"""
+	if agg.impulse_response is not None:
+		return np.asarray(agg.impulse_response, dtype=float)
+	kind = agg.kind.lower()
+	if kind not in COUPLING_SLOPE:
+		raise ValueError("aggressor kind must be 'next' or 'fext'")
+	if n_taps is None:
+		n_taps = len(thru) if (thru is not None and kind == 'fext') else DEFAULT_COUPLING_TAPS
+	n_taps = int(n_taps)
+	n_fft = 4 * next_pow2(n_taps)
+	f = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+	f_ref = agg.f_ref_ghz * 1e9
+	f_sat = (agg.f_sat_ghz if agg.f_sat_ghz is not None else 2 * agg.f_ref_ghz) * 1e9
+	a_ref = 10 ** (agg.coupling_db / 20)
+	mag = a_ref * (np.minimum(f, f_sat) / f_ref) ** COUPLING_SLOPE[kind]
+	if thru is not None and kind == 'fext':
+		mag = mag * np.abs(np.fft.rfft(np.asarray(thru, dtype=float), n_fft))
+	mag = np.maximum(mag, COUPLING_FLOOR * a_ref)
+	return minimum_phase_response(mag, n_fft)[:n_taps]
+
+def convolve_lanes(x: np.ndarray, h: Sequence[Sequence[float]]) -> np.ndarray:
+	"""
+	Convolve every lane with its own impulse response in one batched rfft.
+	Args:
+		x: Lane waveforms, shape (n_lanes, n), or one waveform (n,) shared by all lanes.
+		h: Impulse responses, one per lane (zero-padded to a common length).
+	Returns:
+		Causal outputs truncated to the input length, shape (n_lanes, n).
+	"""
+	x = np.asarray(x, dtype=float)
+	responses = [np.asarray(r, dtype=float) for r in h]
+	h2 = np.zeros((len(responses), max(len(r) for r in responses)))
+	for i, r in enumerate(responses):
+		h2[i, :len(r)] = r
+	n = x.shape[-1]
+	n_fft = next_pow2(n + h2.shape[1] - 1)
+	X = np.fft.rfft(x, n_fft, axis=-1)
+	return np.fft.irfft(np.atleast_2d(X) * np.fft.rfft(h2, n_fft, axis=1), n_fft, axis=1)[:, :n]
+
+def crosstalk_waveform(aggressors: np.ndarray, responses: Sequence[Sequence[float]]) -> np.ndarray:
+	"""
+	Summed crosstalk at the victim Rx.
+	Args:
+		aggressors: Aggressor Tx waveforms, shape (n_aggressors, n); the mean
+			(common mode) of each lane is removed before coupling.
+		responses: Coupling impulse responses, one per aggressor.
+	Returns:
+		Crosstalk waveform (n,).
+	"""
+	aggressors = np.atleast_2d(np.asarray(aggressors, dtype=float))
+	if len(aggressors) != len(responses):
+		raise ValueError("need one coupling response per aggressor")
+	ac = aggressors - aggressors.mean(axis=1, keepdims=True)
+	return convolve_lanes(ac, responses).sum(axis=0)
+
+def xtalk_cursors(responses: Sequence[Sequence[float]], sps: int, phase: str = 'worst') -> np.ndarray:
+	"""
+	Symbol-spaced crosstalk cursors per aggressor for statistical analysis.
+	Aggressors are not synchronous with the victim sampler, so each aggressor
+	is sampled at its worst phase (largest RMS) or at every phase ('all').
+	Args:
+		responses: Coupling impulse responses at sps samples per UI.
+		sps: Samples per UI.
+		phase: 'worst' or 'all'.
+	Returns:
+		Cursors, shape (n_aggressors, n_ui) for 'worst' or
+		(n_aggressors, sps, n_ui) for 'all', for a unit aggressor symbol.
+	"""
+	n = max(len(r) for r in responses) + sps
+	n_ui = -(-n // sps)
+	pulse = np.zeros(n_ui * sps)
+	pulse[:sps] = 1.0
+	p = convolve_lanes(pulse, responses).reshape(len(responses), n_ui, sps).transpose(0, 2, 1)
+	if phase == 'all':
+		return p
+	if phase != 'worst':
+		raise ValueError("phase must be 'worst' or 'all'")
+	worst = np.argmax(np.sum(p ** 2, axis=2), axis=1)
+	return p[np.arange(len(responses)), worst]
+
+def xtalk_pdf(
+	cursors: np.ndarray,
+	levels: Sequence[float] = (-1.0, 1.0),
+	noise_sigma: float = 0.0,
+	n_bins: int = 1024,
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Crosstalk amplitude distribution from aggressor cursors (independent data).
+	Args:
+		cursors: Crosstalk cursors (see xtalk_cursors()), any shape.
+		levels: Aggressor symbol levels.
+		noise_sigma: Extra Gaussian noise sigma (V).
+		n_bins: Number of voltage bins.
+	Returns:
+		(voltages, mass): voltage grid and probability mass per bin.
+	"""
+	c = np.asarray(cursors, dtype=float).ravel()
+	c = c[c != 0]
+	levels = np.asarray(levels, dtype=float)
+	span = np.max(np.abs(levels)) * np.sum(np.abs(c)) + 8 * noise_sigma
+	dv = 2.2 * max(span, 1e-12) / n_bins
+	voltages = (np.arange(n_bins) - n_bins // 2) * dv
+	return voltages, isi_pmf(c[None, :], levels, noise_sigma, dv, n_bins)[0]
@@ -1 +1,121 @@
 # CLI commands: quickstart/eye/sweep (argparse or Typer)
+#
+#   serdes-sim jtol configs/preset_25g_nrz.yaml --cdr-type bbpd --points 8
+import argparse
+import dataclasses
+import json
+from types import SimpleNamespace
+import numpy as np
+import yaml
+from config.schema import AggressorCfg, ChannelCfg, RxCfg
+from link.link import Link
+from metrics.jtol import jtol_mask, jtol_min_symbols, jtol_sweep
+
+
+def _namespace(value):
+    """Nested dicts as attribute namespaces (the cfg.tx.* layout Tx expects)."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    return value
+
+
+def _known(cls, values):
+    """Keep only the dataclass fields of cls (presets carry extra keys)."""
+    names = {f.name for f in dataclasses.fields(cls)}
+    return {k: v for k, v in (values or {}).items() if k in names}
+
+
+def load_link(path: str):
+    """Link and the 'sim' section from a YAML config (top-level or under 'link')."""
+    with open(path, 'r') as f:
+        cfg = yaml.safe_load(f)
+    link_cfg = cfg.get('link') or cfg
+    ch = ChannelCfg(**_known(ChannelCfg, link_cfg.get('channel')))
+    if ch.aggressors:
+        ch.aggressors = [AggressorCfg(**a) if isinstance(a, dict) else a for a in ch.aggressors]
+    rx = RxCfg(**_known(RxCfg, link_cfg.get('rx')))
+    tx = SimpleNamespace(tx=_namespace(link_cfg.get('tx') or {}))
+    return Link(tx, ch, rx), link_cfg.get('sim') or {}
+
+
+def cmd_jtol(args):
+    link, sim = load_link(args.config)
+    if args.cdr_type:
+        link.rx.cfg.cdr_type = args.cdr_type
+    _, _, _, symbol_rate = link.tx._modulation()
+    sps = args.sps
+    if sps is None:
+        sps = int(round(float(sim['sim_sample_rate']) / symbol_rate)) if 'sim_sample_rate' in sim else 8
+    if args.freqs:
+        freqs = np.array(args.freqs, dtype=float)
+    else:
+        freqs = np.logspace(np.log10(args.f_start), np.log10(args.f_stop), args.points)
+    n_symbols = args.n_symbols
+    if n_symbols is None:
+        n_symbols = max(1 << 15, jtol_min_symbols(freqs.min(), symbol_rate, args.settle))
+    result = jtol_sweep(
+        link,
+        freqs,
+        n_symbols=n_symbols,
+        sps=sps,
+        ber_limit=args.ber,
+        amp_range=(args.amp_min, args.amp_max),
+        settle_symbols=args.settle,
+        bit_mode=args.bit_mode,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    mask = jtol_mask(freqs, symbol_rate)
+    margin = result.margin_db(mask)
+    print(f"{'freq (Hz)':>12} {'JTOL (UIpp)':>12} {'mask (UIpp)':>12} {'margin (dB)':>12} {'BER':>10} {'trials':>7} {'time (s)':>9}")
+    for i, f in enumerate(freqs):
+        print(f"{f:12.4g} {result.amplitudes[i]:12.4f} {mask[i]:12.4f} {margin[i]:12.2f} "
+              f"{result.ber[i]:10.2e} {result.trials[i]:7d} {result.seconds[i]:9.2f}")
+    print(f"total {result.total_seconds:.2f} s")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({
+                'config': args.config,
+                'cdr_type': link.rx.cfg.cdr_type,
+                'symbol_rate': symbol_rate,
+                'ber_limit': args.ber,
+                'freqs': freqs.tolist(),
+                'amplitudes': result.amplitudes.tolist(),
+                'mask': mask.tolist(),
+                'ber': result.ber.tolist(),
+                'trials': result.trials.tolist(),
+                'seconds': result.seconds.tolist(),
+                'total_seconds': result.total_seconds,
+            }, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='serdes-sim', description='SerDes link simulation')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('jtol', help='jitter tolerance sweep (SJ amplitude bisection per frequency)')
+    p.add_argument('config', help='YAML link config')
+    p.add_argument('--freqs', type=float, nargs='+', help='SJ frequencies (Hz); overrides --f-start/--f-stop/--points')
+    p.add_argument('--f-start', type=float, default=1e5, help='first SJ frequency (Hz)')
+    p.add_argument('--f-stop', type=float, default=1e8, help='last SJ frequency (Hz)')
+    p.add_argument('--points', type=int, default=7, help='log-spaced frequency points')
+    p.add_argument('--n-symbols', type=int, default=None,
+                   help='symbols per run (default: 2^15, or a quarter period of the lowest SJ frequency after --settle)')
+    p.add_argument('--sps', type=int, default=None, help='samples per symbol (default: sim.sim_sample_rate / symbol rate, or 8)')
+    p.add_argument('--ber', type=float, default=1e-4, help='BER limit')
+    p.add_argument('--amp-min', type=float, default=0.01, help='smallest SJ amplitude (UIpp)')
+    p.add_argument('--amp-max', type=float, default=20.0, help='largest SJ amplitude (UIpp)')
+    p.add_argument('--settle', type=int, default=4096, help='symbols skipped for CDR lock')
+    p.add_argument('--cdr-type', default=None, help='override rx.cdr_type (e.g. bbpd, hogge, mm)')
+    p.add_argument('--bit-mode', choices=['random', 'prbs'], default='random', help='victim data pattern')
+    p.add_argument('--seed', type=int, default=None, help='bit seed')
+    p.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    p.add_argument('--out', default=None, help='JSON output path')
+    p.set_defaults(func=cmd_jtol)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
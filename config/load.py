@@ -1,5 +1,5 @@
 import yaml
-from .schema import MainCfg, LinkCfg, TxCfg, ChannelCfg, RxCfg, SimCfg
+from .schema import MainCfg, LinkCfg, TxCfg, ChannelCfg, RxCfg, SimCfg, AggressorCfg
 
 def load_main_cfg(path: str) -> MainCfg:
     with open(path, 'r') as f:
@@ -20,6 +20,8 @@ def load_main_cfg(path: str) -> MainCfg:
 
     tx = TxCfg(**(link_cfg.get('tx') or {}))
     channel = ChannelCfg(**(link_cfg.get('channel') or {}))
+    if channel.aggressors:
+        channel.aggressors = [AggressorCfg(**a) if isinstance(a, dict) else a for a in channel.aggressors]
     rx = RxCfg(**(link_cfg.get('rx') or {}))
     sim = SimCfg(**(link_cfg.get('sim') or {}))
     link = LinkCfg(tx=tx, channel=channel, rx=rx, sim=sim)
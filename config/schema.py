@@ -4,16 +4,25 @@ from typing import Any, List, Optional
 @dataclass
 class TxCfg:
     data_rate: float  # Gbps
-    modulation: str   # 'NRZ' or 'PAM4'
+    modulation: str   # 'NRZ', 'PAM4', or 'PAM3'/'PAM6'/'PAM8'
     ffe_taps: Optional[List[float]] = None
     jitter: Optional[dict] = None
     swing: Optional[float] = None
     vcm: Optional[float] = None
     symbol_duration: Optional[float] = None  # Symbol duration in seconds
 
+@dataclass
+class AggressorCfg:
+    kind: str = 'fext'                # 'next' or 'fext' coupling (channel.xtalk)
+    coupling_db: float = -40.0        # Coupling magnitude at f_ref_ghz (dB)
+    f_ref_ghz: float = 10.0           # reference frequency
+    f_sat_ghz: Optional[float] = None # coupling flattens above this (default 2 * f_ref_ghz)
+    seed: Optional[int] = None        # aggressor bit seed (independent of the victim)
+    impulse_response: Optional[List[float]] = None  # measured coupling response at the sim rate
+
 @dataclass
 class ChannelCfg:
-    type: str         # 'simple', 'sparam', or 'copper'
+    type: str         # 'simple', 'sparam', 'copper' or 'copper_fd' (physical model, channel.copper)
     fixed_loss_db: float    # Fixed dB loss
     isi_taps: Optional[List[float]] = None
     awgn_sigma: Optional[float] = None
@@ -27,6 +36,10 @@ class ChannelCfg:
     skin_effect: Optional[bool] = True
     dielectric_loss: Optional[float] = 0.0005   # loss tangent
     profile: Optional[str] = None               # cable type/profile
+    # S-parameter channel
+    sparam_file: Optional[str] = None           # Touchstone file (.s4p/.s2p), differential SDD21
+    # Crosstalk aggressors (NEXT/FEXT)
+    aggressors: Optional[List[AggressorCfg]] = None
 
 @dataclass
 class RxCfg:
@@ -34,6 +47,7 @@ class RxCfg:
     dfe_taps: Optional[List[float]] = None
     slicer_type: str = 'NRZ'
     cdr_type: str = 'ideal'  # Possible values: 'ideal', 'bbpd', 'hogge', 'bangbang', 'pi', 'pll', 'oversampled', 'baudrate', 'phase_interpolator'
+    cdr_params: Optional[dict] = None  # rx.cdr.CdrEngine arguments (kp, ki, block_symbols, latency, interp, ...)
 
 @dataclass
 class SimCfg:
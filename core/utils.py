@@ -1 +1,237 @@
 # Common helpers (PRBS taps table, conv utils, dB↔lin, etc.)
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+
+# Convolution method crossovers: direct convolution while the shorter operand
+# has at most DIRECT_MAX_TAPS samples, overlap-add once the longer one is
+# OA_MIN_RATIO times longer, else one FFT. benchmarks/conv_crossover.py
+# measures them (last run in benchmarks/conv_crossover.json): direct wins up
+# to 256 taps; fft and overlap-add stay within ~40% of each other for ratios
+# of roughly 25 to 200, where the winner changes between runs, and
+# OA_MIN_RATIO sits in that band.
+DIRECT_MAX_TAPS = 256
+OA_MIN_RATIO = 50
+
+
+def next_pow2(n: int) -> int:
+    """Smallest power of two >= n."""
+    return 1 << max(int(n) - 1, 0).bit_length()
+
+
+def choose_conv_method(n: int, m: int) -> str:
+    """
+    Pick 'direct', 'fft' or 'oa' (overlap-add) for convolving lengths n and m.
+    """
+    short, long = min(n, m), max(n, m)
+    if short <= DIRECT_MAX_TAPS:
+        return 'direct'
+    if long >= OA_MIN_RATIO * short:
+        return 'oa'
+    return 'fft'
+
+
+def convolve(x: Sequence[float], h: Sequence[float], mode: str = 'full', method: str = 'auto') -> np.ndarray:
+    """
+    Linear convolution with automatic direct/FFT/overlap-add selection.
+    Modes follow np.convolve: 'full', 'same' (length max(N, M), aligned as
+    np.convolve) and 'valid'. float32 inputs stay float32; integer inputs give
+    integer output (FFT results are rounded).
+    Args:
+        x, h: Input sequences.
+        mode: 'full', 'same' or 'valid'.
+        method: 'auto', 'direct', 'fft' or 'oa'.
+    Returns:
+        Convolution result.
+    """
+    x = np.asarray(x)
+    h = np.asarray(h)
+    if mode not in ('full', 'same', 'valid'):
+        raise ValueError("mode must be 'full', 'same' or 'valid'")
+    if method == 'auto':
+        method = choose_conv_method(len(x), len(h))
+    if method == 'direct':
+        return np.convolve(x, h, mode=mode)
+    if method not in ('fft', 'oa'):
+        raise ValueError("method must be 'auto', 'direct', 'fft' or 'oa'")
+    from scipy.signal import fftconvolve, oaconvolve
+    out = (fftconvolve if method == 'fft' else oaconvolve)(x, h, mode='full')
+    n, m = len(x), len(h)
+    if mode == 'same':
+        start = (min(n, m) - 1) // 2
+        out = out[start:start + max(n, m)]
+    elif mode == 'valid':
+        out = out[min(n, m) - 1:max(n, m)]
+    dtype = np.result_type(x, h)
+    if np.issubdtype(dtype, np.integer) or dtype == np.bool_:
+        return np.rint(out).astype(np.result_type(dtype, np.int8))
+    return out
+
+
+def correlate(a: Sequence[float], v: Sequence[float], mode: str = 'full', method: str = 'auto') -> np.ndarray:
+    """
+    Cross-correlation with the same method selection as convolve(); matches
+    np.correlate(a, v, mode) for real inputs ('same'/'valid' need len(a) >= len(v)).
+    """
+    v = np.asarray(v)
+    return convolve(a, np.conj(v[::-1]), mode=mode, method=method)
+
+
+class OverlapSaveConvolver:
+    """
+    Streaming causal FIR filter using overlap-save FFT convolution.
+    The last len(h) - 1 input samples are carried between process() calls, so
+    concatenated outputs equal np.convolve(x, h)[:len(x)] for the whole stream
+    regardless of block sizes. All frames of a block are transformed in one
+    batched rfft.
+    """
+
+    def __init__(self, h: Sequence[float], n_fft: Optional[int] = None) -> None:
+        """
+        Args:
+            h: Impulse response (FIR taps).
+            n_fft: FFT length (default: next power of two >= 4 * len(h)).
+        """
+        self.h = np.asarray(h, dtype=float)
+        if self.h.ndim != 1 or len(self.h) == 0:
+            raise ValueError("h must be a non-empty 1-D array")
+        n_taps = len(self.h)
+        self.n_fft = int(n_fft) if n_fft is not None else max(next_pow2(4 * n_taps), 64)
+        if self.n_fft < n_taps:
+            raise ValueError("n_fft must be >= len(h)")
+        self.step = self.n_fft - n_taps + 1  # new outputs per frame
+        self.H = np.fft.rfft(self.h, self.n_fft)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the input history (zero initial state)."""
+        self.history = np.zeros(len(self.h) - 1)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'history': self.history.copy()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.history = np.array(state['history'], dtype=float)
+
+    def process(self, block: Sequence[float]) -> np.ndarray:
+        """
+        Filter one block.
+        Args:
+            block: Input samples.
+        Returns:
+            Output samples (same length as block).
+        """
+        x = np.asarray(block, dtype=float)
+        n = len(x)
+        if n == 0:
+            return np.zeros(0)
+        n_hist = len(self.history)
+        buf = np.concatenate([self.history, x])
+        n_frames = -(-n // self.step)
+        # zero-pad the last frame; outputs are causal so the padding is never used
+        padded = np.zeros((n_frames - 1) * self.step + self.n_fft)
+        padded[:len(buf)] = buf
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.step]
+        y = np.fft.irfft(np.fft.rfft(frames, axis=1) * self.H, self.n_fft, axis=1)
+        out = y[:, n_hist:].reshape(-1)[:n]
+        if n_hist:
+            self.history = buf[-n_hist:].copy()
+        return out
+
+    def flush(self) -> np.ndarray:
+        """
+        Return the convolution tail (len(h) - 1 samples) and reset the state.
+        """
+        out = self.process(np.zeros(len(self.h) - 1))
+        self.reset()
+        return out
+
+
+class FirFilter:
+    """
+    Streaming FIR filter with carried state.
+    mode='full' is causal: process() returns one output per input sample and
+    flush() the len(taps) - 1 sample tail. mode='same' delays the output by the
+    np.convolve 'same' offset, so process() outputs plus flush() equal
+    convolve(x, taps, mode='same') for a stream of at least len(taps) samples.
+    Short filters run direct on the block plus history, long filters use
+    OverlapSaveConvolver; float32 streams stay float32.
+    """
+
+    def __init__(self, taps: Sequence[float], mode: str = 'full', method: str = 'auto', dtype=None) -> None:
+        """
+        Args:
+            taps: FIR taps.
+            mode: 'full' (causal) or 'same'.
+            method: 'auto', 'direct' or 'fft' (overlap-save).
+            dtype: Output dtype (default float64, or float32 for float32 taps).
+        """
+        if mode not in ('full', 'same'):
+            raise ValueError("mode must be 'full' or 'same'")
+        self.dtype = np.dtype(dtype) if dtype is not None else np.result_type(np.asarray(taps).dtype, np.float32)
+        self.taps = np.asarray(taps, dtype=self.dtype)
+        if method == 'auto':
+            method = 'direct' if len(self.taps) <= DIRECT_MAX_TAPS else 'fft'
+        if method not in ('direct', 'fft'):
+            raise ValueError("method must be 'auto', 'direct' or 'fft'")
+        self.method = method
+        self.mode = mode
+        self.offset = (len(self.taps) - 1) // 2 if mode == 'same' else 0
+        self._ols = OverlapSaveConvolver(self.taps) if method == 'fft' else None
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the filter state."""
+        self.history = np.zeros(len(self.taps) - 1, dtype=self.dtype)
+        self._skip = self.offset  # leading outputs dropped for mode='same'
+        if self._ols is not None:
+            self._ols.reset()
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'history': self.history.copy(), 'skip': self._skip}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.history = np.array(state['history'], dtype=self.dtype)
+        self._skip = int(state['skip'])
+        if self._ols is not None:
+            self._ols.set_state({'history': self.history})
+
+    def _causal(self, x: np.ndarray) -> np.ndarray:
+        if self._ols is not None:
+            out = self._ols.process(x).astype(self.dtype, copy=False)
+        else:
+            out = np.convolve(np.concatenate([self.history, x]), self.taps, mode='valid')
+        n_hist = len(self.history)
+        if n_hist:
+            self.history = np.concatenate([self.history, x])[-n_hist:]
+        return out
+
+    def process(self, block: Sequence[float]) -> np.ndarray:
+        """
+        Filter one block.
+        Args:
+            block: Input samples.
+        Returns:
+            Output samples (len(block) for mode='full'; fewer at the start of
+            the stream for mode='same').
+        """
+        x = np.asarray(block, dtype=self.dtype)
+        if len(x) == 0:
+            return np.zeros(0, dtype=self.dtype)
+        out = self._causal(x)
+        if self._skip:
+            drop = min(self._skip, len(out))
+            self._skip -= drop
+            out = out[drop:]
+        return out
+
+    def flush(self) -> np.ndarray:
+        """
+        Return the outputs still pending at the end of the stream and reset.
+        """
+        n_tail = len(self.taps) - 1 if self.mode == 'full' else self.offset
+        out = self.process(np.zeros(n_tail, dtype=self.dtype))
+        if self.mode == 'full':
+            out = out[:n_tail]
+        self.reset()
+        return out
@@ -1,26 +1,96 @@
-
-
-from typing import Any
+import numpy as np
+from typing import Any, List, Optional, Tuple
 from tx.tx import Tx
 from rx.rx import Rx
 from channel.simple import simple_channel, copper_channel
+from channel.copper import copper_fd_channel, copper_impulse_response
+from channel.sparam import sparam_channel, sparam_impulse_response
+from channel.xtalk import coupling_impulse_response, crosstalk_waveform
 from config.schema import TxCfg, RxCfg, ChannelCfg
 
 class Link:
 	"""
 	End-to-end link: Tx → channel → Rx. Configurable via dataclasses.
-	Supports 'simple' and 'copper' channel types.
+	Supports 'simple', 'copper', 'copper_fd' and 'sparam' channel types, plus
+	NEXT/FEXT crosstalk from the aggressors in ch_cfg.aggressors.
 	"""
 	def __init__(self, tx_cfg: TxCfg, ch_cfg: ChannelCfg, rx_cfg: RxCfg) -> None:
 		"""
 		Args:
-			tx_cfg: TxCfg dataclass instance.
+			tx_cfg: Tx configuration (cfg.tx.*, see tx.tx.Tx).
 			ch_cfg: ChannelCfg dataclass instance.
 			rx_cfg: RxCfg dataclass instance.
 		"""
 		self.tx = Tx(tx_cfg)
 		self.rx = Rx(rx_cfg)
 		self.ch_cfg = ch_cfg
+		# independent Tx instance per aggressor lane
+		self.aggressors = list(getattr(ch_cfg, 'aggressors', None) or [])
+		self.aggressor_tx = [Tx(tx_cfg) for _ in self.aggressors]
+
+	def channel(self, waveform: np.ndarray, sample_rate: float) -> np.ndarray:
+		"""
+		Victim lane channel.
+		"""
+		if self.ch_cfg.type == 'copper':
+			return copper_channel(waveform, self.ch_cfg)
+		if self.ch_cfg.type == 'copper_fd':
+			return copper_fd_channel(waveform, self.ch_cfg, sample_rate)
+		if self.ch_cfg.type == 'sparam':
+			return sparam_channel(waveform, self.ch_cfg, sample_rate)
+		return simple_channel(waveform, self.ch_cfg)
+
+	def thru_response(self, sample_rate: float) -> Optional[np.ndarray]:
+		"""
+		Victim impulse response for FEXT shaping (None for the IIR/FIR models).
+		"""
+		if self.ch_cfg.type == 'copper_fd':
+			return copper_impulse_response(self.ch_cfg, sample_rate)
+		if self.ch_cfg.type == 'sparam':
+			return sparam_impulse_response(self.ch_cfg.sparam_file, sample_rate)
+		return None
+
+	def coupling_responses(self, sample_rate: float) -> List[np.ndarray]:
+		"""
+		Coupling impulse response per aggressor.
+		"""
+		thru = self.thru_response(sample_rate)
+		return [coupling_impulse_response(agg, sample_rate, thru=thru) for agg in self.aggressors]
+
+	def crosstalk(self, n_bits: int, n_samples: int, sample_rate: float, bit_mode: str = 'random') -> np.ndarray:
+		"""
+		Summed crosstalk of all aggressors at the victim Rx. Aggressor lanes are
+		convolved with their coupling responses in one batched FFT.
+		"""
+		lanes = np.zeros((len(self.aggressors), n_samples))
+		for i, (agg, tx) in enumerate(zip(self.aggressors, self.aggressor_tx)):
+			seed = agg.seed if agg.seed is not None else i + 1
+			tx.generate_bits(n_bits, mode=bit_mode, seed=seed)
+			waveform, _ = tx.run(sim_sample_rate=sample_rate, keep_debug=False)
+			lanes[i, :min(len(waveform), n_samples)] = waveform[:n_samples]
+		return crosstalk_waveform(lanes, self.coupling_responses(sample_rate))
+
+	def received(self, n_bits: int, sps: int = 8, bit_mode: str = 'random', seed: Optional[int] = None) -> Tuple[np.ndarray, float, float]:
+		"""
+		Generate Tx bits and the victim waveform at the Rx input (channel plus
+		aggressor crosstalk, stored in self.xtalk).
+		Args:
+			n_bits: Number of Tx bits.
+			sps: Simulation samples per symbol.
+			bit_mode: 'random' or 'prbs'.
+			seed: Optional victim bit seed.
+		Returns:
+			(waveform, sample_rate, symbol_rate)
+		"""
+		self.tx.generate_bits(n_bits, mode=bit_mode, seed=seed)
+		_, _, _, symbol_rate = self.tx._modulation()
+		sample_rate = sps * symbol_rate
+		waveform, _ = self.tx.run(sim_sample_rate=sample_rate)
+		ch_waveform = self.channel(waveform, sample_rate)
+		if self.aggressors:
+			self.xtalk = self.crosstalk(n_bits, len(ch_waveform), sample_rate, bit_mode)
+			ch_waveform = ch_waveform + self.xtalk
+		return ch_waveform, sample_rate, symbol_rate
 
 	def run(self) -> Any:
 		"""
@@ -28,19 +98,11 @@ class Link:
 		Returns:
 			Rx output bits or symbols.
 		"""
-		# 0. Generate bits for Tx
+		# 1. Tx waveform through the channel, plus aggressor crosstalk
 		n_symbols = getattr(self.ch_cfg, 'n_symbols', 10000)
 		bit_mode = getattr(self.tx.cfg, 'bit_mode', 'random')
 		sps = getattr(self.ch_cfg, 'sps', 8)
-		self.tx.generate_bits(n_symbols, mode=bit_mode)
-
-		# 1. Generate Tx waveform
-		waveform, _ = self.tx.run(sps=sps)
-		# 2. Pass through channel
-		if self.ch_cfg.type == 'copper':
-			ch_waveform = copper_channel(waveform, self.ch_cfg)
-		else:
-			ch_waveform = simple_channel(waveform, self.ch_cfg)
-		# 3. Run Rx
-		rx_out = self.rx.run(ch_waveform, sps=sps)
+		ch_waveform, sample_rate, symbol_rate = self.received(n_symbols, sps, bit_mode)
+		# 2. Run Rx (DC-balanced data: slice around the received common mode)
+		rx_out = self.rx.run(ch_waveform, sample_rate, symbol_rate, threshold=float(np.mean(ch_waveform)))
 		return rx_out
@@ -1,6 +1,6 @@
 
 import numpy as np
-from typing import Sequence, Optional
+from typing import Sequence, Optional, Tuple
 
 def empirical_ber(rx_bits: Sequence[int], tx_bits: Sequence[int]) -> float:
 	"""
@@ -26,3 +26,299 @@ def q_factor_ber(q: float) -> float:
 	"""
 	from scipy.special import erfc
 	return 0.5 * erfc(q / np.sqrt(2))
+
+# Byte popcount table (fallback for NumPy < 2.0 without np.bitwise_count)
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def pack_words(bits: Sequence[int]) -> np.ndarray:
+	"""
+	Pack a bit sequence into uint64 words (np.packbits order, zero padded).
+	Args:
+		bits: Bits (0/1).
+	Returns:
+		uint64 array of length ceil(len(bits) / 64).
+	"""
+	packed = np.packbits(np.asarray(bits, dtype=np.uint8))
+	pad = (-len(packed)) % 8
+	if pad:
+		packed = np.concatenate([packed, np.zeros(pad, dtype=np.uint8)])
+	return packed.view(np.uint64)
+
+def popcount(words: np.ndarray) -> int:
+	"""
+	Total number of set bits in an integer array.
+	Args:
+		words: Unsigned integer array (e.g. uint8 or uint64 words).
+	Returns:
+		Number of 1 bits.
+	"""
+	words = np.ascontiguousarray(words)
+	if hasattr(np, 'bitwise_count'):
+		return int(np.bitwise_count(words).sum(dtype=np.int64))
+	return int(_POPCOUNT8[words.view(np.uint8)].sum(dtype=np.int64))
+
+def packed_errors(rx_words: np.ndarray, tx_words: np.ndarray, n_bits: Optional[int] = None) -> int:
+	"""
+	Count bit errors between two packed sequences with XOR and popcount.
+	Args:
+		rx_words: Packed received bits (uint8 from np.packbits, or uint64 words).
+		tx_words: Packed transmitted bits, same packing as rx_words.
+		n_bits: Number of valid bits; padding bits beyond it are ignored.
+	Returns:
+		Number of differing bits.
+	"""
+	diff = np.bitwise_xor(np.asarray(rx_words), np.asarray(tx_words))
+	if n_bits is not None:
+		diff = diff.view(np.uint8).copy()
+		n_bytes = -(-n_bits // 8)
+		diff = diff[:n_bytes]
+		if n_bits % 8:
+			diff[-1] &= np.uint8((0xFF << (8 - n_bits % 8)) & 0xFF)
+	return popcount(diff)
+
+def find_lag(rx_bits: Sequence[int], tx_bits: Sequence[int], max_lag: Optional[int] = None) -> Tuple[int, bool]:
+	"""
+	Find the Tx/Rx bit offset by FFT cross-correlation.
+	Args:
+		rx_bits: Received bit prefix (0/1).
+		tx_bits: Transmitted bit prefix (0/1).
+		max_lag: Largest |lag| searched (default: half the shorter prefix).
+	Returns:
+		(lag, inverted): rx_bits[n + lag] lines up with tx_bits[n]; inverted is
+		True when the best match is the complemented sequence.
+	"""
+	from scipy.signal import fftconvolve
+	rx = 2.0 * np.asarray(rx_bits, dtype=float) - 1.0
+	tx = 2.0 * np.asarray(tx_bits, dtype=float) - 1.0
+	if max_lag is None:
+		max_lag = min(len(rx), len(tx)) // 2
+	corr = fftconvolve(rx, tx[::-1], mode='full')
+	lags = np.arange(-(len(tx) - 1), len(rx))
+	keep = np.abs(lags) <= max_lag
+	lags = lags[keep]
+	corr = corr[keep]
+	# normalize by the overlap length so short overlaps at large |lag| do not win
+	overlap = np.minimum(len(rx) - np.maximum(lags, 0), len(tx) + np.minimum(lags, 0))
+	score = corr / np.maximum(overlap, 1)
+	best = int(np.argmax(np.abs(score)))
+	return int(lags[best]), bool(score[best] < 0)
+
+class BerCounter:
+	"""
+	Streaming BER counter on packed words with automatic Tx/Rx alignment.
+	The lag is found once by FFT cross-correlation on the first align_bits bits;
+	afterwards blocks of any size are compared with XOR/popcount and only the
+	not-yet-matched tail of either stream is buffered.
+	"""
+	def __init__(self, align_bits: int = 4096, max_lag: Optional[int] = None, lag: Optional[int] = None, correct_polarity: bool = True) -> None:
+		"""
+		Args:
+			align_bits: Prefix length used for alignment.
+			max_lag: Largest |lag| searched (default: align_bits // 2).
+			lag: Known lag (skips the search), rx_bits[n + lag] ~ tx_bits[n].
+			correct_polarity: Compare against the complemented Rx stream if the
+				correlation peak is negative.
+		"""
+		self.align_bits = int(align_bits)
+		self.max_lag = max_lag
+		self.lag = lag
+		self.inverted = False
+		self.correct_polarity = correct_polarity
+		self.bits = 0
+		self.errors = 0
+		self._rx = np.zeros(0, dtype=np.uint8)
+		self._tx = np.zeros(0, dtype=np.uint8)
+		self._skip_rx = max(lag, 0) if lag is not None else 0
+		self._skip_tx = max(-lag, 0) if lag is not None else 0
+
+	@property
+	def ber(self) -> float:
+		return self.errors / self.bits if self.bits else 0.0
+
+	def _align(self) -> None:
+		self.lag, self.inverted = find_lag(self._rx[:self.align_bits], self._tx[:self.align_bits], self.max_lag)
+		if not self.correct_polarity:
+			self.inverted = False
+		self._skip_rx = max(self.lag, 0)
+		self._skip_tx = max(-self.lag, 0)
+
+	def update(self, rx_block: Sequence[int], tx_block: Sequence[int] = ()) -> int:
+		"""
+		Add a block of Rx bits and the matching (or any amount of) Tx bits.
+		Args:
+			rx_block: Received bits (0/1).
+			tx_block: Transmitted bits (0/1).
+		Returns:
+			Number of errors counted in this update.
+		"""
+		self._rx = np.concatenate([self._rx, np.asarray(rx_block, dtype=np.uint8)])
+		self._tx = np.concatenate([self._tx, np.asarray(tx_block, dtype=np.uint8)])
+		if self.lag is None:
+			if min(len(self._rx), len(self._tx)) < self.align_bits:
+				return 0
+			self._align()
+		for name, skip in (('_rx', '_skip_rx'), ('_tx', '_skip_tx')):
+			buf = getattr(self, name)
+			n_skip = min(getattr(self, skip), len(buf))
+			setattr(self, name, buf[n_skip:])
+			setattr(self, skip, getattr(self, skip) - n_skip)
+		n = min(len(self._rx), len(self._tx))
+		if n == 0:
+			return 0
+		rx_words = pack_words(self._rx[:n])
+		if self.inverted:
+			rx_words = np.invert(rx_words)
+		errors = packed_errors(rx_words, pack_words(self._tx[:n]), n)
+		self._rx = self._rx[n:]
+		self._tx = self._tx[n:]
+		self.bits += n
+		self.errors += errors
+		return errors
+
+class PrbsChecker:
+	"""
+	Self-synchronizing PRBS checker (no stored Tx bits).
+	Like a hardware checker it seeds a local LFSR from the received stream once
+	verify_bits consecutive bits satisfy the PRBS recurrence, then free-runs the
+	LFSR and compares block by block. If a window's error ratio exceeds
+	loss_threshold, lock is dropped and the checker re-acquires.
+	"""
+	def __init__(self, order: int, window: int = 1024, loss_threshold: float = 0.2, verify_bits: int = 64, register_bits: Optional[int] = None) -> None:
+		"""
+		Args:
+			order: PRBS order as used by bit_utils.core.prbs.
+			window: Window length (bits) for lock-loss detection.
+			loss_threshold: Error ratio per window that declares loss of lock.
+			verify_bits: Consecutive error-free recurrence checks required to lock.
+			register_bits: Register length if the Tx seed is wider than order
+				(seed.bit_length()); defaults to order.
+		"""
+		from bit_utils.lfsr import prbs_taps
+		self.order = int(order)
+		self.length = int(register_bits) if register_bits else self.order
+		self.taps = prbs_taps(self.order)
+		self.window = int(window)
+		self.loss_threshold = float(loss_threshold)
+		self.verify_bits = int(verify_bits)
+		self.locked = False
+		self.bits = 0
+		self.errors = 0
+		self.position = 0
+		self.lock_events = []
+		self.loss_events = []
+		self._reg = None
+		self._pending = np.zeros(0, dtype=np.uint8)
+		self._win_bits = 0
+		self._win_errors = 0
+		self._resume = 0
+
+	@property
+	def ber(self) -> float:
+		return self.errors / self.bits if self.bits else 0.0
+
+	def _acquire(self, data: np.ndarray) -> Optional[int]:
+		"""Start of the first register state preceded by L + verify_bits valid predictions."""
+		L = self.length
+		run = L + self.verify_bits
+		if len(data) < 2 * L + run:
+			return None
+		pred = np.zeros(len(data) - L, dtype=np.uint8)
+		for t in self.taps:
+			off = (t - 1) % L
+			pred ^= data[off:off + len(pred)]
+		bad = (data[L:] != pred).astype(np.int64)
+		cs = np.concatenate([[0], np.cumsum(bad)])
+		# bad[k] checks data[k + L] against bits k..k+L-1; a run of zeros of length
+		# L + verify_bits over k in [r, r + run) validates the register at r + run
+		runs = cs[run:] - cs[:-run]
+		hits = np.flatnonzero(runs == 0)
+		hits = hits[hits + run + L <= len(data)]
+		# all-zero data fits every recurrence (a dead link): lock only on a nonzero register
+		ones = np.concatenate([[0], np.cumsum(data, dtype=np.int64)])
+		hits = hits[ones[hits + run + L] > ones[hits + run]]
+		if not hits.size:
+			return None
+		return int(hits[0]) + run
+
+	def _check(self, seg: np.ndarray) -> Tuple[int, int, Optional[int]]:
+		"""
+		Compare seg with the local LFSR.
+		Returns (bits, errors, loss) where loss is None or the start of the failing
+		window relative to seg (negative if it began in an earlier block); the
+		failing window's end is left in self._resume.
+		"""
+		from bit_utils.lfsr import lfsr_block
+		L = self.length
+		expected = lfsr_block(self._reg, self.taps, len(seg) + L)
+		err = (seg != expected[:len(seg)]).astype(np.int64)
+		cs = np.concatenate([[0], np.cumsum(err)])
+		# window ends relative to seg, continuing the window carried from earlier blocks
+		first_end = self.window - self._win_bits
+		ends = np.arange(first_end, len(seg) + 1, self.window)
+		if ends.size:
+			starts = np.concatenate([[0], ends[:-1]])
+			win_err = cs[ends] - cs[starts]
+			win_err[0] += self._win_errors
+			bad = np.flatnonzero(win_err > self.loss_threshold * self.window)
+			if bad.size:
+				j = int(bad[0])
+				# drop the failing window (and any part of it counted earlier)
+				stop = int(starts[j])
+				loss = stop
+				if j == 0:
+					self.bits -= self._win_bits
+					self.errors -= self._win_errors
+					loss -= self._win_bits
+				self._win_bits = 0
+				self._win_errors = 0
+				self._resume = int(ends[j])
+				return stop, int(cs[stop]), loss
+			tail = len(seg) - int(ends[-1])
+			self._win_bits = tail
+			self._win_errors = int(cs[-1] - cs[ends[-1]])
+		else:
+			self._win_bits += len(seg)
+			self._win_errors += int(cs[-1])
+		self._reg = expected[len(seg):len(seg) + L]
+		return len(seg), int(cs[-1]), None
+
+	def process(self, rx_block: Sequence[int]) -> int:
+		"""
+		Check a block of received bits.
+		Args:
+			rx_block: Received bits (0/1).
+		Returns:
+			Number of errors counted in this block.
+		"""
+		from bit_utils.lfsr import lfsr_block
+		block = np.asarray(rx_block, dtype=np.uint8)
+		data = np.concatenate([self._pending, block]) if len(self._pending) else block
+		base = self.position - len(self._pending)
+		self._pending = np.zeros(0, dtype=np.uint8)
+		errors_before = self.errors
+		i = 0
+		while i < len(data):
+			if not self.locked:
+				m = self._acquire(data[i:])
+				if m is None:
+					keep = 2 * self.length + self.verify_bits - 1
+					self._pending = data[max(i, len(data) - keep):].copy()
+					break
+				start = i + m
+				# the seed bits themselves are not counted; start checking after them
+				self._reg = lfsr_block(data[start:start + self.length], self.taps, 2 * self.length)[self.length:]
+				self.locked = True
+				self.lock_events.append(base + start)
+				i = start + self.length
+				continue
+			n, errs, loss = self._check(data[i:])
+			self.bits += n
+			self.errors += errs
+			if loss is None:
+				break
+			self.locked = False
+			self.loss_events.append(base + i + loss)
+			# re-acquire after the failing window rather than on the clean bits before the burst
+			i += self._resume
+		self.position += len(block)
+		return self.errors - errors_before
@@ -0,0 +1,193 @@
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Union
+from .stateye import pulse_response, isi_pmf
+
+# Default search grids (802.3-style ranges)
+FFE_PRE_GRID = np.round(np.arange(-0.15, 0.001, 0.05), 6)
+FFE_POST_GRID = np.round(np.arange(-0.25, 0.001, 0.05), 6)
+CTLE_GDC_GRID = np.arange(-12.0, 0.5, 1.0)
+
+@dataclass
+class ComResult:
+	"""
+	COM figure of merit and the settings that achieve it.
+	com_db: Channel operating margin, 20*log10(signal / noise-and-interference).
+	fom_db: Gaussian figure of merit used for the search.
+	ffe_taps: Tx FFE taps [c(-1), c(0), c(1)], summing to 1 (TxCfg.ffe_taps,
+		unchanged by tx.ffe.normalize_taps).
+	ctle_gdc_db: CTLE DC gain in dB (peaking = -ctle_gdc_db), None without CTLE.
+	dfe_taps: DFE taps normalized to the main cursor (RxCfg.dfe_taps, see rx.dfe.DfeEngine).
+	sampling_phase: Sampling phase in UI relative to the pulse peak.
+	signal: Available signal amplitude (half the level spacing times the main cursor).
+	noise: Noise-plus-interference amplitude at the target detector error ratio.
+	"""
+	com_db: float
+	fom_db: float
+	ffe_taps: List[float]
+	ctle_gdc_db: Optional[float]
+	dfe_taps: List[float]
+	sampling_phase: float
+	signal: float
+	noise: float
+
+def ctle_response(f: np.ndarray, symbol_rate: float, gdc_db: Sequence[float]) -> np.ndarray:
+	"""
+	802.3-style CTLE family:
+	H(f) = (10^(gdc/20) + j f/f_z) / ((1 + j f/f_p1) (1 + j f/f_p2)),
+	with f_z = f_p1 = symbol_rate / 4 and f_p2 = symbol_rate.
+	Args:
+		f: Frequencies (Hz).
+		symbol_rate: Symbol rate (Bd).
+		gdc_db: DC gains in dB, one response per value.
+	Returns:
+		Complex responses, shape (len(gdc_db), len(f)).
+	"""
+	f_z = f_p1 = symbol_rate / 4
+	f_p2 = symbol_rate
+	g = 10 ** (np.asarray(gdc_db, dtype=float)[:, None] / 20)
+	jf = 1j * np.asarray(f)[None, :]
+	return (g + jf / f_z) / ((1 + jf / f_p1) * (1 + jf / f_p2))
+
+def ffe_grid(pre: Sequence[float], post: Sequence[float]) -> np.ndarray:
+	"""
+	All 3-tap FFE settings [c(-1), 1 - c(-1) - c(1), c(1)] of a pre/post grid.
+	The taps sum to 1, the DC-gain normalization tx.ffe.normalize_taps applies,
+	so the Tx transmits exactly the swing that COM scores.
+	Returns:
+		Tap matrix, shape (len(pre) * len(post), 3).
+	"""
+	c_pre, c_post = np.meshgrid(np.asarray(pre, dtype=float), np.asarray(post, dtype=float), indexing='ij')
+	c_pre, c_post = c_pre.ravel(), c_post.ravel()
+	return np.stack([c_pre, 1 - c_pre - c_post, c_post], axis=1)
+
+def _shifted(x: np.ndarray) -> np.ndarray:
+	"""Cursor stacks x[k+1], x[k], x[k-1] on a new axis -2 (zero filled)."""
+	s = np.zeros(x.shape[:-1] + (3,) + x.shape[-1:])
+	s[..., 0, :-1] = x[..., 1:]
+	s[..., 1, :] = x
+	s[..., 2, 1:] = x[..., :-1]
+	return s
+
+def com(
+	channel: Union[Sequence[float], Callable[[np.ndarray], np.ndarray]],
+	sps: int,
+	symbol_rate: float,
+	levels: Sequence[float] = (-1.0, 1.0),
+	ffe_pre: Sequence[float] = FFE_PRE_GRID,
+	ffe_post: Sequence[float] = FFE_POST_GRID,
+	ctle_gdc_db: Optional[Sequence[float]] = CTLE_GDC_GRID,
+	n_dfe: int = 1,
+	dfe_max: float = 1.0,
+	noise_sigma: float = 0.0,
+	rj: float = 0.0,
+	dj: float = 0.0,
+	target_der: float = 1e-4,
+	n_ui: int = 128,
+	n_bins: int = 2048,
+) -> ComResult:
+	"""
+	COM-style channel figure of merit with Tx FFE, CTLE and DFE optimization.
+	The pulse response is filtered by the whole CTLE family in the frequency
+	domain; the Tx FFE grid is then applied to the symbol-spaced cursors of
+	every CTLE setting and sampling phase as one matrix product. Zero-forcing
+	DFE taps (clipped to dfe_max times the main cursor) cancel the first
+	n_dfe post-cursors. The setting with the best Gaussian FOM
+	A_s^2 / (sigma_ISI^2 + sigma_jitter^2 + sigma_noise^2) is kept and COM is
+	computed from the full residual ISI and noise distribution at target_der.
+	Args:
+		channel: Channel impulse response at sps * symbol_rate, or a noise-free
+			waveform function.
+		sps: Samples per UI.
+		symbol_rate: Symbol rate (Bd).
+		levels: Symbol levels (normalized to a peak of 1).
+		ffe_pre, ffe_post: Tx FFE pre- and post-cursor grids.
+		ctle_gdc_db: CTLE DC gain grid in dB; None disables the CTLE.
+		n_dfe: Number of DFE taps.
+		dfe_max: Tap limit relative to the main cursor.
+		noise_sigma: Rx input noise sigma per sample (V), shaped by the CTLE.
+		rj: Random jitter sigma (UI).
+		dj: Dual-Dirac deterministic jitter amplitude (UI).
+		target_der: Detector error ratio for COM.
+		n_ui: Pulse response length in UI.
+		n_bins: Voltage bins for the COM distribution.
+	Returns:
+		ComResult
+	"""
+	lv = np.asarray(levels, dtype=float)
+	lv = np.sort(lv / np.max(np.abs(lv)))
+	var_a = np.mean(lv ** 2)
+	half_spacing = (lv[1] - lv[0]) / 2
+
+	# pulse response through every CTLE setting (frequency domain batch)
+	p0 = pulse_response(sps, channel=channel, n_ui=n_ui)
+	n_fft = 2 * len(p0)
+	if ctle_gdc_db is None:
+		gdc = [None]
+		pulses = p0[None, :]
+		noise_gain = np.ones(1)
+	else:
+		gdc = list(np.asarray(ctle_gdc_db, dtype=float))
+		f = np.fft.rfftfreq(n_fft, 1 / (sps * symbol_rate))
+		hc = ctle_response(f, symbol_rate, gdc)
+		pulses = np.fft.irfft(np.fft.rfft(p0, n_fft)[None, :] * hc, n_fft)[:, :len(p0)]
+		noise_gain = np.sum(np.fft.irfft(hc, n_fft) ** 2, axis=1)
+
+	# symbol-spaced cursors and slopes at every sampling phase
+	box = np.ones(sps) / sps
+	peaks = np.array([np.argmax(np.abs(np.convolve(p, box, mode='same'))) for p in pulses])
+	offsets = np.arange(-(sps // 2), sps - sps // 2)
+	k = np.arange(-(n_ui // 2), n_ui // 2 + 1)
+	idx = peaks[:, None, None] + offsets[None, :, None] + k[None, None, :] * sps
+	padded = np.pad(pulses, ((0, 0), (1, 1)))
+	rows = np.arange(len(pulses))[:, None, None]
+	inside = (idx >= 0) & (idx < pulses.shape[1])
+	ic = np.clip(idx, -1, pulses.shape[1]) + 1
+	x = np.where(inside, padded[rows, ic], 0.0)                                  # (ctle, phase, k)
+	dx = np.where(inside, (padded[rows, np.clip(ic + 1, 0, padded.shape[1] - 1)]
+		- padded[rows, np.clip(ic - 1, 0, padded.shape[1] - 1)]) * sps / 2, 0.0)  # per UI
+
+	# Tx FFE grid as a single matmul over the shifted cursor stacks
+	taps = ffe_grid(ffe_pre, ffe_post)
+	y = np.einsum('tj,cpjk->cptk', taps, _shifted(x))                            # (ctle, phase, ffe, k)
+	dy = np.einsum('tj,cpjk->cptk', taps, _shifted(dx))
+	k0 = int(np.flatnonzero(k == 0)[0])
+	h0 = y[..., k0]
+	resid = y.copy()
+	if n_dfe > 0:
+		post = y[..., k0 + 1:k0 + 1 + n_dfe]
+		lim = dfe_max * np.abs(h0)[..., None]
+		resid[..., k0 + 1:k0 + 1 + n_dfe] = post - np.clip(post, -lim, lim)
+	resid[..., k0] = 0.0
+	sig = h0 * half_spacing
+	var_isi = var_a * np.sum(resid ** 2, axis=-1)
+	var_jit = var_a * (rj ** 2 + dj ** 2) * np.sum(dy ** 2, axis=-1)
+	var_noise = (noise_sigma ** 2 * noise_gain)[:, None, None]
+	fom = 10 * np.log10(np.maximum(sig, 0) ** 2 / (var_isi + var_jit + var_noise + 1e-30) + 1e-30)
+	c, p, t = np.unravel_index(int(np.argmax(fom)), fom.shape)
+
+	# COM of the best setting from the residual ISI and noise distribution
+	noise = float(np.sqrt(var_jit[c, p, t] + var_noise[c, 0, 0]))
+	isi = resid[c, p, t]
+	isi = isi[isi != 0]
+	span = np.sum(np.abs(isi)) + 8 * noise
+	dv = 2.2 * max(span, 1e-12) / n_bins
+	mass = isi_pmf(isi[None, :] if len(isi) else np.zeros((1, 1)), lv, noise, dv, n_bins)[0]
+	voltages = (np.arange(n_bins) - n_bins // 2) * dv
+	cdf = np.cumsum(mass)
+	a_ni = float(-np.interp(target_der, cdf, voltages))
+	signal = float(sig[c, p, t])
+	h0_best = h0[c, p, t]
+	dfe = y[c, p, t, k0 + 1:k0 + 1 + n_dfe] if n_dfe > 0 else np.zeros(0)
+	dfe = np.clip(dfe, -dfe_max * abs(h0_best), dfe_max * abs(h0_best)) / h0_best
+	return ComResult(
+		com_db=float(20 * np.log10(signal / a_ni)) if a_ni > 0 else float('inf'),
+		fom_db=float(fom[c, p, t]),
+		ffe_taps=[float(v) for v in taps[t]],
+		ctle_gdc_db=None if gdc[c] is None else float(gdc[c]),
+		dfe_taps=[float(v) for v in dfe],
+		sampling_phase=float(offsets[p] / sps),
+		signal=signal,
+		noise=a_ni,
+	)
@@ -0,0 +1,224 @@
+# Jitter tolerance (JTOL): SJ amplitude bisection per frequency, points in a process pool
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+from rx.cdr import interpolate
+from rx.rx import Rx
+from tx.jitter import add_sj
+from .ber import find_lag, packed_errors
+
+# Sinusoidal jitter mask (UIpp): HF_AMP above the corner, rising 20 dB/dec
+# below it up to LF_AMP (IEEE 802.3 stressed receiver SJ template, corner
+# at 4 MHz for 10.3125 GBd, i.e. symbol_rate / 2578)
+MASK_HF_AMP = 0.05
+MASK_LF_AMP = 5.0
+MASK_CORNER_RATIO = 2578.0
+
+# Read-only data shared by all points, set once per worker process
+_SHARED: Dict[str, Any] = {}
+
+@dataclass
+class JtolResult:
+	"""
+	Output of jtol_sweep().
+	freqs: SJ frequencies (Hz).
+	amplitudes: Largest SJ amplitude per frequency that meets the BER limit
+		(UIpp); amp_max if the limit is met everywhere, 0 if not even at amp_min.
+	ber: Measured BER at that amplitude.
+	trials: Link runs per frequency (bisection steps).
+	seconds: Wall time per frequency point.
+	total_seconds: Wall time of the sweep, including the shared setup.
+	"""
+	freqs: np.ndarray
+	amplitudes: np.ndarray
+	ber: np.ndarray
+	trials: np.ndarray
+	seconds: np.ndarray
+	total_seconds: float
+
+	def margin_db(self, mask: Sequence[float]) -> np.ndarray:
+		"""
+		Margin over a JTOL mask per frequency, 20*log10(amplitude / mask).
+		"""
+		with np.errstate(divide='ignore'):
+			return 20 * np.log10(self.amplitudes / np.asarray(mask, dtype=float))
+
+def jtol_mask(
+	freqs: Sequence[float],
+	symbol_rate: float,
+	hf_amp: float = MASK_HF_AMP,
+	lf_amp: float = MASK_LF_AMP,
+	corner_ratio: float = MASK_CORNER_RATIO,
+) -> np.ndarray:
+	"""
+	Required SJ amplitude per frequency.
+	Args:
+		freqs: SJ frequencies (Hz).
+		symbol_rate: Symbol rate (baud); the corner is symbol_rate / corner_ratio.
+		hf_amp: Amplitude above the corner (UIpp).
+		lf_amp: Low-frequency amplitude cap (UIpp).
+		corner_ratio: Symbol rate to corner frequency ratio.
+	Returns:
+		Mask amplitudes (UIpp).
+	"""
+	f = np.asarray(freqs, dtype=float)
+	corner = symbol_rate / corner_ratio
+	return np.minimum(hf_amp * np.maximum(corner / f, 1.0), lf_amp)
+
+def jtol_min_symbols(freq: float, symbol_rate: float, settle_symbols: int = 4096) -> int:
+	"""
+	Shortest run for SJ at freq: the SJ phase starts at 0, so the compared
+	window after settle_symbols must last a quarter period to reach the peak.
+	Args:
+		freq: Lowest SJ frequency (Hz).
+		symbol_rate: Symbol rate (baud).
+		settle_symbols: Symbols skipped for CDR lock.
+	Returns:
+		Minimum n_symbols.
+	"""
+	return int(settle_symbols + np.ceil(symbol_rate / (4 * float(freq))))
+
+def _init_worker(shared: Dict[str, Any]) -> None:
+	"""Pool initializer: keep the shared arrays (read-only) and build the Rx once."""
+	for value in shared.values():
+		if isinstance(value, np.ndarray):
+			value.flags.writeable = False
+	_SHARED.clear()
+	_SHARED.update(shared)
+	_SHARED['time'] = np.arange(len(shared['waveform'])) / shared['sample_rate']
+	_SHARED['rx'] = Rx(shared['rx_cfg'])
+
+def _sj_errors(freq: float, amp_ui: float) -> Tuple[int, int]:
+	"""Bit errors and compared bits with amp_ui UIpp of SJ at freq."""
+	s = _SHARED
+	# Tx edges at t + a*sin(2*pi*f*t) (tx.jitter.add_sj): the received waveform
+	# is sampled at the inverse warp, accurate while the SJ is slow compared
+	# to the channel memory
+	amp = amp_ui / 2 / s['symbol_rate']
+	positions = add_sj(s['time'], freq, -amp) * s['sample_rate']
+	waveform = interpolate(s['waveform'], positions, s['interp'])
+	rx_bits = s['rx'].run(waveform, s['sample_rate'], s['symbol_rate'], threshold=s['threshold'])
+	tx_bits = s['tx_bits']
+	start, n_align = s['settle_bits'], s['align_bits']
+	lag, _ = find_lag(rx_bits[start:start + n_align], tx_bits[start:start + n_align])
+	n = min(len(tx_bits), len(rx_bits) - lag) - start
+	if n <= 0:
+		return 0, 0
+	rx_cmp = rx_bits[start + lag:start + lag + n]
+	tx_cmp = tx_bits[start:start + n]
+	return packed_errors(np.packbits(rx_cmp), np.packbits(tx_cmp), n), n
+
+def _passes(errors: int, n_bits: int) -> bool:
+	return n_bits > 0 and errors <= _SHARED['ber_limit'] * n_bits
+
+def _jtol_point(freq: float) -> Tuple[float, float, int, float]:
+	"""
+	Bisect the SJ amplitude (geometric midpoints) to the BER limit at freq.
+	Returns (amplitude, ber, trials, seconds).
+	"""
+	t0 = time.perf_counter()
+	lo, hi = _SHARED['amp_min'], _SHARED['amp_max']
+	errors, n_bits = _sj_errors(freq, hi)
+	trials = 1
+	if _passes(errors, n_bits):
+		return hi, errors / n_bits, trials, time.perf_counter() - t0
+	errors, n_bits = _sj_errors(freq, lo)
+	trials += 1
+	if not _passes(errors, n_bits):
+		return 0.0, errors / max(n_bits, 1), trials, time.perf_counter() - t0
+	ber = errors / n_bits
+	while hi / lo > 1 + _SHARED['rel_tol']:
+		mid = np.sqrt(lo * hi)
+		errors, n_bits = _sj_errors(freq, mid)
+		trials += 1
+		if _passes(errors, n_bits):
+			lo, ber = mid, errors / n_bits
+		else:
+			hi = mid
+	return float(lo), ber, trials, time.perf_counter() - t0
+
+def jtol_sweep(
+	link: Any,
+	freqs: Sequence[float],
+	n_symbols: int = 1 << 15,
+	sps: int = 8,
+	ber_limit: float = 1e-4,
+	amp_range: Tuple[float, float] = (0.01, 20.0),
+	rel_tol: float = 0.05,
+	settle_symbols: int = 4096,
+	bit_mode: str = 'random',
+	seed: Optional[int] = None,
+	interp: str = 'cubic',
+	workers: Optional[int] = None,
+) -> JtolResult:
+	"""
+	Jitter tolerance curve of a link's Rx (CTLE, CDR per RxCfg.cdr_type and
+	cdr_params, DFE, slicer). The Tx pattern and the received waveform
+	(channel and crosstalk) are computed once; each frequency point then
+	applies SJ to the Tx timing by resampling the received waveform and
+	bisects the amplitude to the BER limit. Frequency points run in a process
+	pool whose initializer receives the shared arrays once per worker.
+	Args:
+		link: link.link.Link instance.
+		freqs: SJ frequencies (Hz).
+		n_symbols: Symbols per run; at least jtol_min_symbols() of the lowest
+			frequency, so the SJ reaches its peak in the compared window.
+		sps: Simulation samples per symbol.
+		ber_limit: Largest BER that counts as a pass.
+		amp_range: (amp_min, amp_max) bisection bracket (UIpp).
+		rel_tol: Stop when amp_hi / amp_lo <= 1 + rel_tol.
+		settle_symbols: Symbols skipped for CDR lock before counting errors.
+		bit_mode: 'random' or 'prbs'.
+		seed: Bit seed.
+		interp: SJ resampling interpolator, 'linear' or 'cubic'.
+		workers: Worker processes (default os.cpu_count(); 1 runs in-process).
+	Returns:
+		JtolResult
+	"""
+	t0 = time.perf_counter()
+	amp_min, amp_max = float(amp_range[0]), float(amp_range[1])
+	if not 0 < amp_min < amp_max:
+		raise ValueError("amp_range must satisfy 0 < amp_min < amp_max")
+	freqs = np.asarray(freqs, dtype=float)
+	_, k, m, symbol_rate = link.tx._modulation()
+	bits_per_symbol = k / m
+	n_min = jtol_min_symbols(freqs.min(), symbol_rate, settle_symbols) if len(freqs) else 0
+	if n_symbols < n_min:
+		raise ValueError(f"n_symbols must be at least {n_min} to reach the SJ peak at {freqs.min():.4g} Hz after settle_symbols")
+	waveform, sample_rate, symbol_rate = link.received(int(n_symbols * bits_per_symbol), sps, bit_mode, seed)
+	shared = {
+		'waveform': np.array(waveform, dtype=float),
+		'tx_bits': np.array(link.tx.bits, dtype=np.uint8),
+		'rx_cfg': link.rx.cfg,
+		'sample_rate': float(sample_rate),
+		'symbol_rate': float(symbol_rate),
+		'threshold': float(np.mean(waveform)),
+		'settle_bits': int(settle_symbols * bits_per_symbol),
+		'align_bits': 4096,
+		'ber_limit': float(ber_limit),
+		'amp_min': amp_min,
+		'amp_max': amp_max,
+		'rel_tol': float(rel_tol),
+		'interp': interp,
+	}
+	if shared['settle_bits'] + shared['align_bits'] > len(shared['tx_bits']):
+		raise ValueError("n_symbols too short for settle_symbols plus the alignment window")
+	workers = min(workers or os.cpu_count() or 1, len(freqs))
+	if workers <= 1:
+		_init_worker(shared)
+		points = [_jtol_point(f) for f in freqs]
+	else:
+		with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+			points = list(pool.map(_jtol_point, freqs))
+	amplitudes, ber, trials, seconds = (np.array(col) for col in zip(*points)) if points else (np.zeros(0),) * 4
+	return JtolResult(
+		freqs=freqs,
+		amplitudes=amplitudes.astype(float),
+		ber=ber.astype(float),
+		trials=trials.astype(int),
+		seconds=seconds.astype(float),
+		total_seconds=time.perf_counter() - t0,
+	)
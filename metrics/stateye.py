@@ -0,0 +1,284 @@
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+from core.types import Results
+from core.utils import convolve
+from tx.ffe import apply_ffe, normalize_taps
+from rx.ctle import ctle_fir
+
+@dataclass
+class StatEyeResult:
+	"""
+	Statistical eye of a linear link.
+	phases: Nominal sampling phases in UI, relative to the main cursor peak.
+	voltages: Voltage grid (decision thresholds).
+	density: Probability mass of the sampled signal per (phase, voltage bin).
+	ber: BER per eye, phase and threshold, shape (n_eyes, n_phases, n_bins).
+	levels: Symbol levels.
+	main_cursor: Main cursor amplitude per phase.
+	"""
+	phases: np.ndarray
+	voltages: np.ndarray
+	density: np.ndarray
+	ber: np.ndarray
+	levels: np.ndarray
+	main_cursor: np.ndarray
+
+def pulse_response(
+	sps: int,
+	tx_taps: Optional[Sequence[float]] = None,
+	channel: Union[None, Sequence[float], Callable[[np.ndarray], np.ndarray]] = None,
+	ctle_taps: Optional[Sequence[float]] = None,
+	n_ui: int = 64,
+	n_pre: int = 8,
+) -> np.ndarray:
+	"""
+	Single-symbol pulse response of Tx FFE + channel + CTLE.
+	Args:
+		sps: Samples per UI of the simulation.
+		tx_taps: Symbol-rate FFE taps (normalized as in Tx.run).
+		channel: Channel impulse response at the simulation rate, or a noise-free
+			waveform function (e.g. lambda w: copper_channel(w, cfg)).
+		ctle_taps: CTLE FIR taps (applied as rx.ctle.ctle_fir).
+		n_ui: Length of the response in UI.
+		n_pre: UI before the pulse (room for FFE pre-cursors).
+	Returns:
+		Pulse response samples (n_ui * sps) for a unit symbol.
+	"""
+	symbols = np.zeros(n_ui)
+	symbols[n_pre] = 1.0
+	if tx_taps is not None:
+		symbols = apply_ffe(symbols, normalize_taps(tx_taps))
+	pulse = np.repeat(symbols, sps)
+	if callable(channel):
+		pulse = np.asarray(channel(pulse), dtype=float)
+	elif channel is not None:
+		pulse = convolve(pulse, np.asarray(channel, dtype=float))[:len(pulse)]
+	if ctle_taps is not None:
+		pulse = ctle_fir(pulse, ctle_taps)
+	return pulse
+
+def jitter_kernel(sps: int, rj: float = 0.0, dj: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Sampling-phase distribution for RJ plus dual-Dirac DJ on the 1/sps grid.
+	Args:
+		sps: Samples per UI.
+		rj: Random jitter sigma (UI).
+		dj: Deterministic jitter, dual-Dirac peak-to-peak (UI).
+	Returns:
+		(offsets, weights): integer sample offsets and their probabilities.
+	"""
+	half = int(np.ceil((dj / 2 + 7 * rj) * sps)) + 1
+	offsets = np.arange(-half, half + 1)
+	t = offsets / sps
+	if rj > 0:
+		w = np.exp(-0.5 * ((t - dj / 2) / rj) ** 2) + np.exp(-0.5 * ((t + dj / 2) / rj) ** 2)
+	else:
+		# Dirac components split linearly between neighbouring samples
+		w = np.zeros(len(offsets))
+		for d in (-dj / 2, dj / 2):
+			pos = d * sps + half
+			lo = int(np.floor(pos))
+			w[lo] += 1 - (pos - lo)
+			if pos > lo:
+				w[lo + 1] += pos - lo
+	return offsets, w / w.sum()
+
+def _cursors(pulse: np.ndarray, sps: int, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Main cursor and ISI cursors (n_offsets, n_isi) at sample offsets from the
+	peak of the UI-averaged pulse (the centre of a flat-topped pulse).
+	"""
+	peak = int(np.argmax(np.abs(convolve(pulse, np.ones(sps) / sps, mode='same'))))
+	k_pre = peak // sps + 1
+	k_post = (len(pulse) - peak) // sps + 1
+	k = np.arange(-k_pre, k_post + 1)
+	idx = peak + offsets[:, None] + k[None, :] * sps
+	valid = (idx >= 0) & (idx < len(pulse))
+	samples = np.where(valid, pulse[np.clip(idx, 0, len(pulse) - 1)], 0.0)
+	main = samples[:, k == 0][:, 0]
+	return main, samples[:, k != 0]
+
+def isi_pmf(isi: np.ndarray, levels: np.ndarray, noise_sigma: float, dv: float, n_bins: int) -> np.ndarray:
+	"""
+	Probability mass of ISI plus Gaussian noise on the voltage grid
+	(np.arange(n_bins) - n_bins // 2) * dv, one row per set of cursors.
+	Each cursor takes every level with equal probability; the distributions are
+	combined as a product of characteristic functions.
+	Args:
+		isi: ISI cursors, shape (n_rows, n_cursors).
+		levels: Symbol levels.
+		noise_sigma: Gaussian noise sigma (V).
+		dv: Voltage bin width.
+		n_bins: Number of bins.
+	Returns:
+		Probability mass, shape (n_rows, n_bins).
+	"""
+	isi = np.atleast_2d(isi)
+	omega = 2 * np.pi * np.fft.fftfreq(n_bins, dv)
+	phi = np.ones((isi.shape[0], n_bins), dtype=complex)
+	for c in isi.T:
+		phi *= np.mean(np.exp(-1j * omega[None, None, :] * levels[:, None, None] * c[None, :, None]), axis=0)
+	# a floor of one bin of smoothing keeps the discrete ISI spectrum from ringing
+	sigma = max(noise_sigma, dv)
+	phi *= np.exp(-0.5 * (sigma * omega) ** 2)[None, :]
+	# the grid starts at -n_bins // 2 * dv: shift the inverse transform accordingly
+	sign = np.exp(-2j * np.pi * np.fft.fftfreq(n_bins) * (n_bins // 2))
+	mass = np.clip(np.fft.ifft(phi * sign[None, :], axis=1).real, 0, None)
+	return mass / mass.sum(axis=1, keepdims=True)
+
+def stat_eye(
+	pulse: Sequence[float],
+	sps: int,
+	levels: Sequence[float] = (-1.0, 1.0),
+	noise_sigma: float = 0.0,
+	rj: float = 0.0,
+	dj: float = 0.0,
+	n_bins: int = 1024,
+	xtalk: Optional[np.ndarray] = None,
+) -> StatEyeResult:
+	"""
+	Statistical eye from a pulse response.
+	The ISI distribution at every sampling phase is the convolution of the
+	per-cursor distributions (each cursor takes every level with equal
+	probability), evaluated as a product of characteristic functions on the
+	voltage grid; Gaussian noise is folded in the same way. RJ and dual-Dirac
+	DJ are then mixed over the sampling phase. Crosstalk cursors are added
+	as further independent cursors at every phase.
+	Args:
+		pulse: Pulse response for a unit symbol (see pulse_response()).
+		sps: Samples per UI of the pulse response.
+		levels: Symbol levels (e.g. (-1, 1) or (-3, -1, 1, 3)).
+		noise_sigma: Gaussian noise sigma at the sampler (V).
+		rj: Random jitter sigma (UI).
+		dj: Dual-Dirac deterministic jitter, peak-to-peak (UI).
+		n_bins: Number of voltage bins.
+		xtalk: Aggressor cursors (see channel.xtalk.xtalk_cursors()), any shape.
+	Returns:
+		StatEyeResult
+	"""
+	pulse = np.asarray(pulse, dtype=float)
+	levels = np.sort(np.asarray(levels, dtype=float))
+	if len(levels) < 2:
+		raise ValueError("need at least two symbol levels")
+	j_off, j_w = jitter_kernel(sps, rj, dj)
+	nominal = np.arange(-(sps // 2), sps - sps // 2)
+	ext = np.arange(nominal[0] + j_off[0], nominal[-1] + j_off[-1] + 1)
+	main, isi = _cursors(pulse, sps, ext)
+	if xtalk is not None:
+		x = np.ravel(np.asarray(xtalk, dtype=float))
+		isi = np.concatenate([isi, np.tile(x[x != 0], (len(isi), 1))], axis=1)
+	a_max = np.max(np.abs(levels))
+	span = a_max * (np.max(np.sum(np.abs(isi), axis=1) + np.abs(main))) + 8 * noise_sigma
+	dv = 2.2 * span / n_bins
+	voltages = (np.arange(n_bins) - n_bins // 2) * dv
+	mass = isi_pmf(isi, levels, noise_sigma, dv, n_bins)
+	cdf = np.cumsum(mass, axis=1) - mass / 2  # P(ISI + noise < v)
+	# conditional error probabilities for each eye, then jitter mixing over phase
+	n_eyes = len(levels) - 1
+	ber_ext = np.empty((n_eyes, len(ext), n_bins))
+	density_ext = np.zeros((len(ext), n_bins))
+	for p in range(len(ext)):
+		below = [np.interp(voltages - a * main[p], voltages, cdf[p], left=0.0, right=1.0) for a in levels]
+		for i in range(n_eyes):
+			ber_ext[i, p] = 0.5 * (below[i + 1] + (1 - below[i]))
+		for a in levels:
+			density_ext[p] += np.interp(voltages - a * main[p], voltages, mass[p], left=0.0, right=0.0)
+	density_ext /= len(levels)
+	rows = nominal[:, None] + j_off[None, :] - ext[0]
+	ber = np.einsum('epjv,j->epv', ber_ext[:, rows], j_w)
+	density = np.einsum('pjv,j->pv', density_ext[rows], j_w)
+	return StatEyeResult(
+		phases=nominal / sps,
+		voltages=voltages,
+		density=density,
+		ber=ber,
+		levels=levels,
+		main_cursor=main[nominal - ext[0]],
+	)
+
+def ber_contour(result: StatEyeResult, ber_target: float = 1e-12, eye: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	BER contour of one eye: the open threshold interval at every phase.
+	Args:
+		result: StatEyeResult.
+		ber_target: Target BER.
+		eye: Eye index (0 = lowest).
+	Returns:
+		(phases, v_low, v_high); NaN where the eye is closed.
+	"""
+	ber = result.ber[eye]
+	v = result.voltages
+	v_low = np.full(len(result.phases), np.nan)
+	v_high = np.full(len(result.phases), np.nan)
+	for p in range(len(result.phases)):
+		best = int(np.argmin(ber[p]))
+		if ber[p, best] > ber_target:
+			continue
+		open_ = ber[p] <= ber_target
+		lo = best
+		while lo > 0 and open_[lo - 1]:
+			lo -= 1
+		hi = best
+		while hi < len(v) - 1 and open_[hi + 1]:
+			hi += 1
+		v_low[p], v_high[p] = v[lo], v[hi]
+	return result.phases, v_low, v_high
+
+def bathtub(result: StatEyeResult, eye: int = 0, axis: str = 'time') -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Bathtub curve of one eye.
+	Args:
+		result: StatEyeResult.
+		eye: Eye index (0 = lowest).
+		axis: 'time' (BER at the best threshold vs phase) or 'voltage'
+			(BER vs threshold at the best phase).
+	Returns:
+		(x, ber): phases in UI or voltages, and BER.
+	"""
+	ber = result.ber[eye]
+	if axis == 'time':
+		return result.phases, ber.min(axis=1)
+	if axis == 'voltage':
+		return result.voltages, ber[int(np.argmin(ber.min(axis=1)))]
+	raise ValueError("axis must be 'time' or 'voltage'")
+
+def eye_opening(result: StatEyeResult, ber_target: float = 1e-12, eye: Optional[int] = None) -> Tuple[float, float]:
+	"""
+	Eye height and width at a target BER, as (height, width) like
+	metrics.eye.eye_height_width.
+	Args:
+		result: StatEyeResult.
+		ber_target: Target BER.
+		eye: Eye index; None returns the smallest eye.
+	Returns:
+		(height, width): height in volts at the best phase, width in UI.
+	"""
+	if eye is None:
+		return min((eye_opening(result, ber_target, i) for i in range(result.ber.shape[0])), key=lambda hw: (hw[0], hw[1]))
+	phases, v_low, v_high = ber_contour(result, ber_target, eye)
+	heights = np.nan_to_num(v_high - v_low, nan=0.0)
+	if not np.any(heights > 0):
+		return 0.0, 0.0
+	best = int(np.argmax(heights))
+	lo = best
+	while lo > 0 and heights[lo - 1] > 0:
+		lo -= 1
+	hi = best
+	while hi < len(heights) - 1 and heights[hi + 1] > 0:
+		hi += 1
+	step = phases[1] - phases[0] if len(phases) > 1 else 1.0
+	return float(heights[best]), float((hi - lo + 1) * step)
+
+def eye_openings(result: StatEyeResult, ber_target: float = 1e-12) -> List[Tuple[float, float]]:
+	"""(height, width) of every eye, lowest first (e.g. the three PAM4 eyes)."""
+	return [eye_opening(result, ber_target, i) for i in range(result.ber.shape[0])]
+
+def to_results(result: StatEyeResult, ber_target: float = 1e-12) -> Results:
+	"""
+	Summarize a statistical eye as core.types.Results (smallest eye; ber is the
+	lowest BER reachable at the best phase and threshold).
+	"""
+	height, width = eye_opening(result, ber_target)
+	return Results(eye_height=height, eye_width=width, ber=float(result.ber.min(axis=(1, 2)).max()))
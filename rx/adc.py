@@ -1,5 +1,13 @@
 import numpy as np
-from typing import Tuple, Optional, Sequence, Union
+from typing import Any, Dict, Tuple, Optional, Sequence, Union
+from tx.synth import rate_ratio
+
+# Largest denominator of the input-samples-per-ADC-sample ratio in stream mode
+# (exact for rational rate ratios; approximates ppm offsets to ~1e-14)
+STREAM_MAX_DENOMINATOR = 1 << 24
+
+# Sampling-clock RJ sigmas covered by the input history kept between blocks
+JITTER_GUARD_SIGMAS = 6.0
 
 
 class ADC:
@@ -9,7 +17,11 @@ class ADC:
     - Input can be (Vp, Vn) pair, 2xN array, or 1D array (treated as single-ended about v_cm).
     - Quantization is performed on the differential waveform (Vp - Vn).
     - By default process() returns the quantized differential voltage array and the ADC sample rate.
-      If return_codes=True it returns the integer codes instead.
+      If return_codes=True it returns the integer codes (uint8/uint16) instead.
+    - start_stream()/stream()/flush() sample consecutive input blocks of any
+      length with a rational phase accumulator and return codes, for
+      captures of any length; sampling-clock jitter and frequency offset are
+      supported there.
     """
 
     def __init__(
@@ -31,6 +43,32 @@ class ADC:
         self.levels = 2 ** self.resolution_bits
         self.v_diff_min = -self.v_swing / 2.0
         self.v_diff_max = +self.v_swing / 2.0
+        self._stream: Optional[Dict[str, Any]] = None
+
+    @property
+    def code_dtype(self) -> type:
+        """Smallest unsigned integer type holding every ADC code."""
+        if self.resolution_bits <= 8:
+            return np.uint8
+        if self.resolution_bits <= 16:
+            return np.uint16
+        return np.uint32
+
+    @property
+    def level_table(self) -> np.ndarray:
+        """Differential voltage of every code; level_table[codes] equals the quantized waveform."""
+        codes = np.arange(self.levels, dtype=float)
+        return (codes / (self.levels - 1)) * (self.v_diff_max - self.v_diff_min) + self.v_diff_min
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Differential voltages of ADC codes."""
+        return self.level_table[np.asarray(codes)]
+
+    def quantize(self, vdiff: np.ndarray) -> np.ndarray:
+        """Clip and quantize differential voltages to codes (code_dtype)."""
+        vdiff_clipped = np.clip(vdiff, self.v_diff_min, self.v_diff_max)
+        codes = np.round((vdiff_clipped - self.v_diff_min) / (self.v_diff_max - self.v_diff_min) * (self.levels - 1))
+        return np.clip(codes, 0, self.levels - 1).astype(self.code_dtype)
 
     def _unpack_input(
         self, waveform: Union[Sequence[float], np.ndarray, Tuple[np.ndarray, np.ndarray]]
@@ -93,7 +131,7 @@ class ADC:
         t_end = t_in[-1] if len(t_in) > 0 else 0.0
         if t_end <= 0.0:
             if return_codes:
-                return np.array([], dtype=int), adc_fs
+                return np.array([], dtype=self.code_dtype), adc_fs
             return np.array([], dtype=float), adc_fs
 
         n_adc = int(np.floor(t_end * adc_fs)) + 1
@@ -108,12 +146,136 @@ class ADC:
             vdiff_adc = vdiff_adc + np.random.normal(0.0, self.thermal_noise_stddev, size=vdiff_adc.shape)
 
         # clip & quantize differential
-        vdiff_clipped = np.clip(vdiff_adc, self.v_diff_min, self.v_diff_max)
-        codes = np.round((vdiff_clipped - self.v_diff_min) / (self.v_diff_max - self.v_diff_min) * (self.levels - 1))
-        codes = np.clip(codes, 0, self.levels - 1).astype(int)
-        vdiff_q = (codes / (self.levels - 1)) * (self.v_diff_max - self.v_diff_min) + self.v_diff_min
+        codes = self.quantize(vdiff_adc)
 
         if return_codes:
             return codes, adc_fs
 
-        return vdiff_q, adc_fs
\ No newline at end of file
+        return self.decode(codes), adc_fs
+
+    def start_stream(
+        self,
+        sim_sample_rate: float,
+        symbol_rate: float,
+        ppm: float = 0.0,
+        rj_rms: float = 0.0,
+        sj_amp: float = 0.0,
+        sj_freq: float = 0.0,
+        seed: Optional[int] = None,
+        add_noise: bool = True,
+    ) -> None:
+        """
+        Start a blockwise capture. The ADC clock position is an exact rational
+        phase accumulator in input samples, so blocks of any size give the same
+        codes as one call, and no time axes are built.
+
+        Args:
+            sim_sample_rate: Input sample rate (Sa/s).
+            symbol_rate: Symbol rate (baud); the ADC runs at sps * symbol_rate.
+            ppm: ADC clock frequency offset (parts per million).
+            rj_rms: Sampling-clock random jitter (s RMS).
+            sj_amp: Sampling-clock sinusoidal jitter amplitude (s).
+            sj_freq: Sinusoidal jitter frequency (Hz).
+            seed: Seed for the jitter and thermal noise generators.
+            add_noise: Add thermal noise (thermal_noise_stddev).
+        """
+        if sim_sample_rate <= 0 or symbol_rate <= 0:
+            raise ValueError("sim_sample_rate and symbol_rate must be > 0")
+        adc_fs = float(self.sps) * float(symbol_rate)
+        # input samples per ADC sample = num / den
+        num, den = rate_ratio(sim_sample_rate, adc_fs * (1.0 + ppm * 1e-6), STREAM_MAX_DENOMINATOR)
+        jitter_rng, noise_rng = (np.random.Generator(np.random.PCG64(s)) for s in np.random.SeedSequence(seed).spawn(2))
+        self._stream = {
+            "sim_sample_rate": float(sim_sample_rate),
+            "adc_fs": adc_fs,
+            "num": num,
+            "den": den,
+            "rj": float(rj_rms) * float(sim_sample_rate),   # in input samples
+            "sj": float(sj_amp) * float(sim_sample_rate),
+            "sj_freq": float(sj_freq),
+            "guard": int(np.ceil(JITTER_GUARD_SIGMAS * abs(rj_rms) * sim_sample_rate + abs(sj_amp) * sim_sample_rate)) + 1,
+            "add_noise": bool(add_noise),
+            "jitter_rng": jitter_rng,
+            "noise_rng": noise_rng,
+            "buf": np.zeros(0),   # differential input not yet consumed
+            "buf_start": 0,       # global index of buf[0]
+            "acc": 0,             # next ADC sample position relative to buf[0], times den
+            "n_out": 0,           # ADC samples produced so far
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        """Snapshot of the stream (phase, buffered input, generator states) for checkpointing."""
+        if self._stream is None:
+            raise RuntimeError("Stream not started. Call start_stream() first.")
+        state = dict(self._stream)
+        state["buf"] = self._stream["buf"].copy()
+        state["jitter_rng"] = self._stream["jitter_rng"].bit_generator.state
+        state["noise_rng"] = self._stream["noise_rng"].bit_generator.state
+        return state
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Resume a stream from get_state()."""
+        self._stream = dict(state)
+        self._stream["buf"] = np.asarray(state["buf"], dtype=float).copy()
+        for name in ("jitter_rng", "noise_rng"):
+            rng = np.random.Generator(np.random.PCG64())
+            rng.bit_generator.state = state[name]
+            self._stream[name] = rng
+
+    def _stream_step(self, final: bool) -> np.ndarray:
+        st = self._stream
+        buf, num, den, acc = st["buf"], st["num"], st["den"], st["acc"]
+        n_in = len(buf)
+        # last usable input position: keep the guard for jitter until the input ends
+        limit = n_in - 1 if final else n_in - 2 - st["guard"]
+        if n_in == 0 or limit * den < acc:
+            return np.zeros(0, dtype=self.code_dtype)
+        m = (limit * den - acc) // num + 1
+        k = acc + np.arange(m, dtype=np.int64) * num
+        pos = (k // den).astype(float) + (k % den) / den
+        if st["rj"] > 0.0:
+            pos += st["jitter_rng"].normal(0.0, st["rj"], m)
+        if st["sj"] != 0.0 and st["sj_freq"] != 0.0:
+            t = (st["n_out"] + np.arange(m)) / st["adc_fs"]
+            pos += st["sj"] * np.sin(2 * np.pi * st["sj_freq"] * t)
+        # linear interpolation between neighbouring input samples (as np.interp)
+        pos = np.clip(pos, 0.0, n_in - 1)
+        i = np.minimum(np.floor(pos).astype(np.intp), max(n_in - 2, 0))
+        if n_in == 1:
+            vdiff = np.full(m, buf[0])
+        else:
+            vdiff = buf[i] + (pos - i) * (buf[i + 1] - buf[i])
+        if st["add_noise"] and self.thermal_noise_stddev > 0.0:
+            vdiff += st["noise_rng"].normal(0.0, self.thermal_noise_stddev, m)
+        codes = self.quantize(vdiff)
+        # drop the input before the next sample position minus the jitter guard
+        acc += m * num
+        drop = min(max(acc // den - st["guard"] - 1, 0), n_in)
+        st["buf"] = buf[drop:]
+        st["buf_start"] += drop
+        st["acc"] = acc - drop * den
+        st["n_out"] += m
+        return codes
+
+    def stream(self, block: Union[Sequence[float], np.ndarray, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """
+        Feed the next input block (any length; Vp/Vn pair, 2xN or single-ended).
+
+        Returns:
+            Codes (code_dtype) of the ADC samples that are now complete (may be empty).
+        """
+        if self._stream is None:
+            raise RuntimeError("Stream not started. Call start_stream() before stream().")
+        vp, vn = self._unpack_input(block)
+        if vp.shape != vn.shape:
+            raise ValueError("Vp and Vn blocks must have the same length")
+        self._stream["buf"] = np.concatenate([self._stream["buf"], vp - vn])
+        return self._stream_step(final=False)
+
+    def flush(self) -> np.ndarray:
+        """Return the codes of the remaining ADC samples at the end of the capture."""
+        if self._stream is None:
+            raise RuntimeError("Stream not started. Call start_stream() before flush().")
+        codes = self._stream_step(final=True)
+        self._stream = None
+        return codes
@@ -1,7 +1,29 @@
 import numpy as np
-from typing import Sequence
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+from .nco import NCO
 
 
+# Structured trace records returned with trace=True
+EPL_TRACE_DTYPE = np.dtype([
+	('early', np.float64), ('mid', np.float64), ('late', np.float64),
+	('early_dec', np.uint8), ('mid_dec', np.uint8), ('late_dec', np.uint8),
+	('phase', np.int8),
+])
+HOGGE_TRACE_DTYPE = np.dtype([('early', np.float64), ('mid', np.float64), ('late', np.float64), ('error', np.float64)])
+MM_TRACE_DTYPE = np.dtype([('sample', np.float64), ('decision', np.float64), ('error', np.float64)])
+
+# Detector output sign for "clock early" (Hogge is positive when sampling late)
+PD_SIGN = {'bbpd': 1, 'hogge': -1, 'mm': 1}
+
+# Phase detector used by CdrEngine for each RxCfg.cdr_type
+CDR_DETECTORS = {
+	'bbpd': 'bbpd', 'bangbang': 'bbpd', 'bang_bang': 'bbpd', 'oversampled': 'bbpd',
+	'pi': 'bbpd', 'pll': 'bbpd', 'phase_interpolator': 'bbpd',
+	'hogge': 'hogge', 'baudrate': 'mm', 'mm': 'mm',
+}
+
 def ideal_sampler(waveform: Sequence[float], sps: int) -> np.ndarray:
 	"""
 	Sample input waveform at symbol rate (ideal CDR).
@@ -13,64 +35,118 @@ def ideal_sampler(waveform: Sequence[float], sps: int) -> np.ndarray:
 	"""
 	return np.array(waveform)[::sps]
 
-def bang_bang_phase_detector(waveform: Sequence[float], sps: int, threshold: float = 0.0) -> np.ndarray:
+def epl_indices(n_samples: int, sps: int, start: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Early/mid/late sample indices of every whole symbol: mid at i*sps + sps//2,
+	early and late half a symbol before and after.
+	Args:
+		n_samples: Waveform length.
+		sps: Samples per symbol.
+		start: First symbol index.
+	Returns:
+		(early, mid, late) index arrays.
+	"""
+	half = sps // 2
+	n_symbols = (n_samples - sps) // sps
+	mid = np.arange(start, max(n_symbols, start)) * sps + half
+	mid = mid[mid + half < n_samples]
+	return mid - half, mid, mid + half
+
+def bbpd_errors(early: np.ndarray, mid: np.ndarray, late: np.ndarray, threshold: float = 0.0) -> np.ndarray:
+	"""
+	Bang-bang decisions from early/mid/late samples (1: early, -1: late, 0: no transition).
+	"""
+	early_dec, mid_dec, late_dec = early > threshold, mid > threshold, late > threshold
+	# Early sample differs: clock is early; else late sample differs: clock is late
+	return np.where(early_dec != mid_dec, 1, np.where(late_dec != mid_dec, -1, 0)).astype(np.int8)
+
+def bang_bang_phase_detector(
+	waveform: Sequence[float],
+	sps: int,
+	threshold: float = 0.0,
+	trace: bool = False,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
 	"""
 	Bang-bang phase detector for NRZ using Early (E), Mid (M), Late (L) samples.
 	Args:
 		waveform: Input waveform samples.
-		rx_adc_sps: Receiver ADC samples per symbol.
+		sps: Receiver samples per symbol.
 		threshold: Slicing threshold for decision.
+		trace: Also return the per-symbol samples and decisions (EPL_TRACE_DTYPE).
 	Returns:
-		Array of phase errors (1: early, -1: late, 0: correct).
-	"""
-	# For backward compatibility, allow sps as rx_adc_sps
-	rx_adc_sps = sps
-	errors = []
-	waveform = np.array(waveform)
-	half_sps = rx_adc_sps // 2
-	n_symbols = (len(waveform) - rx_adc_sps) // rx_adc_sps
-	for i in range(1, n_symbols):
-		# Sample indices
-		mid_idx = i * rx_adc_sps + half_sps
-		early_idx = mid_idx - half_sps
-		late_idx = mid_idx + half_sps
-		if late_idx >= len(waveform):
-			break
-		# Decisions
-		early_val = waveform[early_idx]
-		mid_val = waveform[mid_idx]
-		late_val = waveform[late_idx]
-		early = 1 if early_val > threshold else 0
-		mid = 1 if mid_val > threshold else 0
-		late = 1 if late_val > threshold else 0
-		# Bang-bang logic: compare early and late to mid
-		if early != mid:
-			phase = 1  # Early sample differs: clock is early
-		elif late != mid:
-			phase = -1 # Late sample differs: clock is late
-		else:
-			phase = 0  # No transition
-		errors.append(phase)
-		print(f"E={early_val:.3f} M={mid_val:.3f} L={late_val:.3f} | E_dec={early} M_dec={mid} L_dec={late} | phase={phase}")
-	return np.array(errors)
-
-def hogge_phase_detector(waveform: Sequence[float], sps: int) -> np.ndarray:
-	"""
-	Hogge phase detector for NRZ. Returns phase error at each symbol.
+		Array of phase errors (1: early, -1: late, 0: correct), int8, and the
+		trace if requested.
+	"""
+	waveform = np.asarray(waveform, dtype=float)
+	early_idx, mid_idx, late_idx = epl_indices(len(waveform), sps)
+	early, mid, late = waveform[early_idx], waveform[mid_idx], waveform[late_idx]
+	phase = bbpd_errors(early, mid, late, threshold)
+	if not trace:
+		return phase
+	rec = np.empty(len(phase), dtype=EPL_TRACE_DTYPE)
+	rec['early'], rec['mid'], rec['late'] = early, mid, late
+	rec['early_dec'], rec['mid_dec'], rec['late_dec'] = early > threshold, mid > threshold, late > threshold
+	rec['phase'] = phase
+	return phase, rec
+
+def hogge_phase_detector(
+	waveform: Sequence[float],
+	sps: int,
+	trace: bool = False,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+	"""
+	Hogge phase detector for NRZ. Returns phase error at each symbol
+	(positive when the mid sample is after the eye centre).
 	Args:
 		waveform: Input waveform samples.
 		sps: Samples per symbol.
+		trace: Also return the per-symbol samples (HOGGE_TRACE_DTYPE).
+	Returns:
+		Array of phase errors, and the trace if requested.
+	"""
+	waveform = np.asarray(waveform, dtype=float)
+	mid_idx = np.arange(sps, len(waveform) - sps, sps)
+	early = waveform[mid_idx - sps // 2]
+	mid = waveform[mid_idx]
+	late = waveform[mid_idx + sps // 2]
+	error = (early - late) * mid
+	if not trace:
+		return error
+	rec = np.empty(len(error), dtype=HOGGE_TRACE_DTYPE)
+	rec['early'], rec['mid'], rec['late'], rec['error'] = early, mid, late, error
+	return error, rec
+
+def mm_errors(y: np.ndarray, d: np.ndarray) -> np.ndarray:
+	"""
+	Mueller-Müller errors y[k] * d[k-1] - y[k-1] * d[k] from samples and decided levels.
+	"""
+	return y[1:] * d[:-1] - y[:-1] * d[1:]
+
+def mueller_muller_phase_detector(
+	samples: Sequence[float],
+	levels: Sequence[float] = (-3.0, -1.0, 1.0, 3.0),
+	trace: bool = False,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+	"""
+	Baud-rate Mueller-Müller phase detector (type A) for PAM-N:
+	e[k] = y[k] * d[k-1] - y[k-1] * d[k], with d the sliced levels. Its mean is
+	h(+1) - h(-1), positive when sampling ahead of the pulse peak (early).
+	Args:
+		samples: Symbol-rate samples.
+		levels: Symbol levels at the sampler (default PAM4).
+		trace: Also return samples, decisions and errors (MM_TRACE_DTYPE).
 	Returns:
-		Array of phase errors.
+		Array of phase errors (len(samples) - 1), and the trace if requested.
 	"""
-	errors = []
-	for i in range(sps, len(waveform)-sps, sps):
-		mid = waveform[i]
-		early = waveform[i - sps//2]
-		late = waveform[i + sps//2] if (i + sps//2) < len(waveform) else mid
-		error = (early - late) * mid
-		errors.append(error)
-	return np.array(errors)
+	y = np.asarray(samples, dtype=float)
+	levels = np.sort(np.asarray(levels, dtype=float))
+	d = levels[np.searchsorted((levels[1:] + levels[:-1]) / 2, y)]
+	error = mm_errors(y, d)
+	if not trace:
+		return error
+	rec = np.empty(len(error), dtype=MM_TRACE_DTYPE)
+	rec['sample'], rec['decision'], rec['error'] = y[1:], d[1:], error
+	return error, rec
 
 def simple_loop_filter(errors: Sequence[float], alpha: float = 0.01) -> np.ndarray:
 	"""
@@ -81,11 +157,225 @@ def simple_loop_filter(errors: Sequence[float], alpha: float = 0.01) -> np.ndarr
 	Returns:
 		Filtered phase estimate.
 	"""
-	phase = 0.0
-	out = []
-	for e in errors:
-		phase += alpha * e
-		out.append(phase)
-	return np.array(out)
+	return np.cumsum(alpha * np.asarray(errors, dtype=float))
+
+def pi_loop_filter(
+	errors: Sequence[float],
+	kp: float = 0.01,
+	ki: float = 0.001,
+	phase0: float = 0.0,
+	freq0: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Proportional-integral (second-order) loop filter in cumulative form:
+	freq[k] = freq0 + ki * sum(e[:k+1]), phase[k] = phase0 + sum(freq + kp * e)[:k+1].
+	Args:
+		errors: Sequence of phase errors.
+		kp: Proportional gain.
+		ki: Integral gain.
+		phase0: Initial phase.
+		freq0: Initial frequency offset (phase per update).
+	Returns:
+		(phase, freq) after each update.
+	"""
+	e = np.asarray(errors, dtype=float)
+	freq = freq0 + np.cumsum(ki * e)
+	phase = phase0 + np.cumsum(freq + kp * e)
+	return phase, freq
+
+def interpolate(waveform: np.ndarray, positions: np.ndarray, method: str = 'cubic') -> np.ndarray:
+	"""
+	Fractional-delay interpolation of a waveform at (non-integer) sample positions.
+	Args:
+		waveform: Input waveform samples.
+		positions: Sample positions; clipped to the waveform.
+		method: 'linear' or 'cubic' (4-tap Lagrange, Farrow form).
+	Returns:
+		Interpolated samples.
+	"""
+	w = np.asarray(waveform, dtype=float)
+	t = np.clip(np.asarray(positions, dtype=float), 0, len(w) - 1)
+	i = np.minimum(np.floor(t).astype(np.intp), len(w) - 2)
+	mu = t - i
+	if method == 'linear':
+		return w[i] + mu * (w[i + 1] - w[i])
+	if method != 'cubic':
+		raise ValueError("method must be 'linear' or 'cubic'")
+	xm1 = w[np.maximum(i - 1, 0)]
+	x0, x1 = w[i], w[i + 1]
+	x2 = w[np.minimum(i + 2, len(w) - 1)]
+	# Lagrange cubic through (-1, 0, 1, 2) as a polynomial in mu
+	c3 = (x2 - xm1) / 6 + (x0 - x1) / 2
+	c2 = (xm1 + x1) / 2 - x0
+	c1 = x1 - x0 / 2 - xm1 / 3 - x2 / 6
+	return ((c3 * mu + c2) * mu + c1) * mu + x0
+
+@dataclass
+class CdrResult:
+	"""
+	Output of CdrEngine.run().
+	samples: Recovered symbol-rate samples.
+	positions: Fractional sample position of every recovered sample.
+	phase: Sampling phase at the start of each block (UI, unwrapped, relative
+		to the nominal grid start + k * sps).
+	freq: Recovered samples-per-symbol offset per block, relative to the
+		nominal sps (1e-6 = 1 ppm).
+	errors: Mean phase detector output per block (Hogge and Mueller-Müller
+		normalized to unit signal power).
+	block_symbols: Symbols per block.
+	"""
+	samples: np.ndarray
+	positions: np.ndarray
+	phase: np.ndarray
+	freq: np.ndarray
+	errors: np.ndarray
+	block_symbols: int
+
+	def lock_time(self, tol: float = 0.05) -> Optional[int]:
+		"""
+		First symbol from which the phase stays within tol UI of the straight
+		line fitted to the last quarter of the trajectory (a locked loop tracks
+		a constant frequency offset with a phase ramp), or None if the loop is
+		still outside tol at the end or the run is shorter than two blocks.
+		"""
+		if len(self.phase) < 2:
+			return None
+		blocks = np.arange(len(self.phase))
+		tail = blocks[-max(2, len(blocks) // 4):]
+		fit = np.polyval(np.polyfit(tail, self.phase[tail], 1), blocks)
+		outside = np.flatnonzero(np.abs(self.phase - fit) > tol)
+		if len(outside) == 0:
+			return 0
+		if outside[-1] == len(self.phase) - 1:
+			return None
+		return int(outside[-1] + 1) * self.block_symbols
+
+class CdrEngine:
+	"""
+	Closed-loop CDR: phase detector → PI loop filter → NCO → fractional-delay
+	interpolator. The waveform is processed in blocks of block_symbols: the
+	NCO positions, interpolation and phase detection of a block are
+	vectorized, and the loop is closed once per block with the mean detector
+	output, delayed by latency blocks as in a pipelined DSP CDR. The loop
+	delay (latency * block_symbols) must stay well below the loop time
+	constant (about 1 / kp symbols) or the loop oscillates.
+	"""
+	def __init__(
+		self,
+		sps: float,
+		detector: str = 'bbpd',
+		kp: float = 3e-4,
+		ki: float = 1.5e-6,
+		block_symbols: int = 64,
+		latency: int = 1,
+		interp: str = 'cubic',
+		threshold: Optional[float] = None,
+		levels: Optional[Sequence[float]] = None,
+		n_levels: int = 4,
+	) -> None:
+		"""
+		Args:
+			sps: Nominal samples per symbol.
+			detector: 'bbpd' (bang-bang), 'hogge' or 'mm' (baud-rate Mueller-Müller).
+			kp: Proportional gain (UI per unit detector output, per symbol).
+			ki: Integral gain (UI/UI per unit detector output, per symbol);
+				gains apply to the block sum, so the loop bandwidth does not
+				depend on block_symbols.
+			block_symbols: Symbols per loop update.
+			latency: Loop update delay in blocks.
+			interp: Interpolator, 'linear' or 'cubic'.
+			threshold: Slicer midpoint (default: waveform mean).
+			levels: Symbol levels relative to the midpoint for 'mm' (default:
+				n_levels equally spaced levels estimated from the waveform).
+			n_levels: Number of levels for the 'mm' estimate.
+		"""
+		if detector not in ('bbpd', 'hogge', 'mm'):
+			raise ValueError("detector must be 'bbpd', 'hogge' or 'mm'")
+		self.sps = float(sps)
+		self.detector = detector
+		self.kp = kp
+		self.ki = ki
+		self.block_symbols = int(block_symbols)
+		self.latency = int(latency)
+		self.interp = interp
+		self.threshold = threshold
+		self.levels = levels
+		self.n_levels = int(n_levels)
 
+	def _errors(self, w: np.ndarray, pos: np.ndarray, prev: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray, Tuple[float, float]]:
+		mid = interpolate(w, pos, self.interp)
+		if self.detector == 'mm':
+			y = np.concatenate([[prev[0]], mid])
+			d = self._levels[np.searchsorted(self._thresholds, y)]
+			d[0] = prev[1]
+			return mid, mm_errors(y, d), (y[-1], d[-1])
+		half = self.sps / 2
+		early = interpolate(w, pos - half, self.interp)
+		late = interpolate(w, pos + half, self.interp)
+		if self.detector == 'bbpd':
+			return mid, bbpd_errors(early, mid, late), prev
+		return mid, (early - late) * mid, prev
 
+	def run(self, waveform: Sequence[float], init_phase: float = 0.0, init_freq_offset: float = 0.0) -> CdrResult:
+		"""
+		Recover the clock and sample the waveform.
+		Args:
+			waveform: Input waveform samples.
+			init_phase: Initial sampling phase (UI, from the first sample).
+			init_freq_offset: Initial frequency offset of the recovered clock (fraction).
+		Returns:
+			CdrResult
+		"""
+		w = np.asarray(waveform, dtype=float)
+		center = self.threshold if self.threshold is not None else (float(np.mean(w)) if len(w) else 0.0)
+		w = w - center
+		if self.detector == 'mm':
+			if self.levels is not None:
+				self._levels = np.sort(np.asarray(self.levels, dtype=float))
+			else:
+				norm = np.linspace(-1.0, 1.0, self.n_levels)
+				self._levels = norm * np.mean(np.abs(w)) / np.mean(np.abs(norm)) if len(w) else norm * np.nan
+			if not np.all(np.isfinite(self._levels)):
+				raise ValueError("cannot estimate the 'mm' detector levels; pass levels explicitly")
+			self._thresholds = (self._levels[1:] + self._levels[:-1]) / 2
+		# normalize linear detectors to unit signal power so the gains carry over;
+		# a flat (idle) input has no power and no detector output, so skip it
+		scale = {'bbpd': 1.0, 'hogge': float(np.mean(w ** 2)) if len(w) else 0.0, 'mm': float(np.mean(self._levels ** 2)) if self.detector == 'mm' else 1.0}[self.detector]
+		scale = max(scale, np.finfo(float).tiny)
+		nco = NCO(self.sps, init_phase=init_phase * self.sps, init_freq=self.sps * (1 + init_freq_offset))
+		last = len(w) - 1 - self.sps / 2 - 2
+		n_max = int(max(0, last - nco.position) // (self.sps * 0.9)) + self.block_symbols
+		samples = np.empty(n_max)
+		positions = np.empty(n_max)
+		phase, freq, errors = [], [], []
+		pending = deque()
+		prev = (0.0, 0.0)
+		n, k = 0, 0
+		while True:
+			pos = nco.advance(self.block_symbols)
+			pos = pos[pos <= last]
+			if len(pos) == 0 or n + len(pos) > n_max:
+				break
+			phase.append((pos[0] - k * self.sps) / self.sps)
+			freq.append(nco.freq / self.sps - 1)
+			mid, err, prev = self._errors(w, pos, prev)
+			samples[n:n + len(pos)] = mid
+			positions[n:n + len(pos)] = pos
+			n += len(pos)
+			k += len(pos)
+			errors.append(float(np.mean(err)) / scale if len(err) else 0.0)
+			pending.append(float(np.sum(err)) / scale)
+			if len(pending) > self.latency:
+				# positive (signed) detector output: clock early, sample later
+				e = pending.popleft() * PD_SIGN[self.detector]
+				nco.adjust(self.kp * e * self.sps, self.ki * e * self.sps)
+			if len(pos) < self.block_symbols:
+				break
+		return CdrResult(
+			samples=samples[:n] + center,
+			positions=positions[:n],
+			phase=np.array(phase),
+			freq=np.array(freq),
+			errors=np.array(errors),
+			block_symbols=self.block_symbols,
+		)
@@ -1,6 +1,7 @@
 
 import numpy as np
 from typing import Sequence
+from core.utils import convolve
 
 def ctle_fir(signal: Sequence[float], taps: Sequence[float]) -> np.ndarray:
 	"""
@@ -11,4 +12,4 @@ def ctle_fir(signal: Sequence[float], taps: Sequence[float]) -> np.ndarray:
 	Returns:
 		Equalized signal as numpy array.
 	"""
-	return np.convolve(signal, taps, mode='same')
+	return convolve(signal, taps, mode='same')
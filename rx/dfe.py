@@ -1,18 +1,183 @@
 
+import bisect
 import numpy as np
-from typing import Sequence
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+# Largest feedback table (M^N entries) the engine will build
+MAX_LUT_SIZE = 1 << 16
+
+# Speculative mode: symbols per chunk and re-slicing passes before the
+# remainder of a chunk falls back to the per-symbol loop
+SPECULATIVE_CHUNK = 1 << 16
+SPECULATIVE_PASSES = 64
 
 def apply_dfe(symbols: Sequence[float], taps: Sequence[float]) -> np.ndarray:
 	"""
 	Apply symbol-rate DFE to input symbols.
+	Feeds back the equalized values (no slicer in the loop); see DfeEngine
+	for a decision-directed DFE.
 	Args:
 		symbols: Input symbol sequence.
 		taps: DFE tap weights (feedback taps).
 	Returns:
 		Equalized symbols as numpy array.
 	"""
-	out = np.zeros_like(symbols, dtype=float)
-	for i in range(len(symbols)):
-		feedback = sum(taps[j] * out[i-j-1] for j in range(min(i, len(taps))))
-		out[i] = symbols[i] - feedback
-	return out
+	from scipy.signal import lfilter
+	# out[i] = symbols[i] - sum_j taps[j] * out[i-j-1] is an all-pole IIR
+	return lfilter([1.0], np.concatenate([[1.0], np.asarray(taps, dtype=float)]), np.asarray(symbols, dtype=float))
+
+def estimate_levels(samples: Sequence[float], n_levels: int, center: float = 0.0) -> np.ndarray:
+	"""
+	Equally spaced symbol levels around center, scaled to the mean sample
+	magnitude (ISI and noise average out for random data).
+	Args:
+		samples: Received symbol-rate samples.
+		n_levels: Number of levels (2 for NRZ, 4 for PAM4).
+		center: Level midpoint (e.g. the common mode).
+	Returns:
+		Levels, ascending.
+	"""
+	norm = np.linspace(-1.0, 1.0, n_levels)
+	amplitude = np.mean(np.abs(np.asarray(samples, dtype=float) - center)) / np.mean(np.abs(norm))
+	return center + amplitude * norm
+
+class DfeEngine:
+	"""
+	Decision-directed DFE with the slicer inside the feedback loop.
+	The feedback for every possible history of the last N decisions is
+	precomputed into a table of M^N values (M levels, N taps), so the loop
+	costs one table lookup per symbol, and decision errors propagate as in
+	hardware. The decision history is carried between process() calls.
+	mode='lut' runs the per-symbol loop. mode='speculative' guesses all
+	decisions of a chunk, looks up the feedback of every symbol from the
+	guessed history in one vectorized step and re-slices the symbols whose
+	history changed until no decision changes; a fixed point satisfies the
+	loop equation at every symbol and so equals the sequential result. Chunks that have not settled after
+	SPECULATIVE_PASSES continue with the per-symbol loop from the first
+	unsettled symbol, so both modes give identical decisions.
+	"""
+	def __init__(
+		self,
+		taps: Sequence[float],
+		levels: Sequence[float] = (-1.0, 1.0),
+		thresholds: Optional[Sequence[float]] = None,
+		mode: str = 'speculative',
+	) -> None:
+		"""
+		Args:
+			taps: Feedback taps; tap j multiplies the level decided j+1 symbols ago.
+			levels: Symbol levels at the slicer input (ascending).
+			thresholds: Decision thresholds (default: midpoints of levels).
+			mode: 'lut' or 'speculative'.
+		"""
+		if mode not in ('lut', 'speculative'):
+			raise ValueError("mode must be 'lut' or 'speculative'")
+		self.taps = np.asarray(taps, dtype=float)
+		self.levels = np.sort(np.asarray(levels, dtype=float))
+		self.thresholds = (np.asarray(thresholds, dtype=float) if thresholds is not None
+			else (self.levels[1:] + self.levels[:-1]) / 2)
+		if len(self.thresholds) != len(self.levels) - 1:
+			raise ValueError("need len(levels) - 1 thresholds")
+		self.mode = mode
+		m, n = len(self.levels), len(self.taps)
+		self.n_states = m ** n
+		if self.n_states > MAX_LUT_SIZE:
+			raise ValueError(f"{m}^{n} feedback entries exceed MAX_LUT_SIZE")
+		# state s encodes the last N decisions as base-M digits, most recent first
+		digits = (np.arange(self.n_states)[:, None] // m ** np.arange(n)[None, :]) % m
+		self.lut = self.levels[digits] @ self.taps if n else np.zeros(1)
+		self.shift = (np.arange(self.n_states) * m) % self.n_states  # next state = shift[s] + decision
+		self.reset()
+
+	def reset(self, history: Optional[Sequence[int]] = None) -> None:
+		"""
+		Reset the decision history.
+		Args:
+			history: Previous decisions as level indices, most recent first
+				(default: all at the level nearest zero).
+		"""
+		m = len(self.levels)
+		if history is None:
+			history = [int(np.argmin(np.abs(self.levels)))] * len(self.taps)
+		self.state = int(sum(int(d) * m ** j for j, d in enumerate(history[:len(self.taps)])))
+
+	def get_state(self) -> Dict[str, Any]:
+		return {'state': self.state}
+
+	def set_state(self, state: Dict[str, Any]) -> None:
+		self.state = int(state['state'])
+
+	def _run_lut(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		lut, shift, th = self.lut.tolist(), self.shift.tolist(), self.thresholds.tolist()
+		states = np.empty(len(x), dtype=np.intp)
+		decisions = np.empty(len(x), dtype=np.uint8)
+		s = self.state
+		for i, v in enumerate(x.tolist()):
+			d = bisect.bisect_left(th, v - lut[s])
+			states[i] = s
+			decisions[i] = d
+			s = shift[s] + d
+		self.state = s
+		return states, decisions
+
+	def _states(self, full: np.ndarray, idx: np.ndarray) -> np.ndarray:
+		"""Feedback table index of symbols idx from decisions full (history first)."""
+		m, n_taps = len(self.levels), len(self.taps)
+		states = np.zeros(len(idx), dtype=np.intp)
+		for j in range(n_taps):
+			states += full[idx + n_taps - j - 1] * m ** j
+		return states
+
+	def _run_speculative(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		m, n_taps, n = len(self.levels), len(self.taps), len(x)
+		history = (self.state // m ** np.arange(n_taps)) % m  # most recent first
+		# first guess: slice without feedback; each pass re-slices the symbols
+		# whose guessed history changed in the previous pass
+		full = np.concatenate([history[::-1], np.searchsorted(self.thresholds, x)])
+		dirty = np.arange(n)
+		for _ in range(SPECULATIVE_PASSES):
+			new = np.searchsorted(self.thresholds, x[dirty] - self.lut[self._states(full, dirty)])
+			changed = dirty[new != full[dirty + n_taps]]
+			full[dirty + n_taps] = new
+			if len(changed) == 0:
+				break
+			mask = np.zeros(n + n_taps + 1, dtype=bool)
+			for j in range(1, n_taps + 1):
+				mask[changed + j] = True
+			dirty = np.flatnonzero(mask[:n])
+			if len(dirty) == 0:
+				break
+		else:
+			# decisions before the first unsettled symbol are final; finish sequentially
+			p = int(dirty[0])
+			states = self._states(full, np.arange(p + 1))
+			self.state = int(states[p])
+			tail_states, tail_decisions = self._run_lut(x[p:])
+			return np.concatenate([states[:p], tail_states]), np.concatenate([full[n_taps:n_taps + p], tail_decisions]).astype(np.uint8)
+		states = self._states(full, np.arange(n))
+		decisions = full[n_taps:]
+		self.state = int(self.shift[states[-1]] + decisions[-1])
+		return states, decisions.astype(np.uint8)
+
+	def process(self, samples: Sequence[float], return_equalized: bool = False) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+		"""
+		Equalize and slice one block of symbol-rate samples.
+		Args:
+			samples: Slicer input samples.
+			return_equalized: Also return the samples after feedback subtraction.
+		Returns:
+			Decisions as level indices (uint8), and the equalized samples if requested.
+		"""
+		x = np.asarray(samples, dtype=float)
+		if len(x) == 0 or len(self.taps) == 0:
+			states = np.zeros(len(x), dtype=np.intp)
+			decisions = np.searchsorted(self.thresholds, x).astype(np.uint8)
+		elif self.mode == 'lut':
+			states, decisions = self._run_lut(x)
+		else:
+			parts = [self._run_speculative(x[i:i + SPECULATIVE_CHUNK]) for i in range(0, len(x), SPECULATIVE_CHUNK)]
+			states = np.concatenate([p[0] for p in parts])
+			decisions = np.concatenate([p[1] for p in parts])
+		if return_equalized:
+			return decisions, x - self.lut[states]
+		return decisions
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class NCO:
     """
     Numerically Controlled Oscillator for CDR clock recovery.
@@ -10,6 +13,7 @@ class NCO:
         self.phase = init_phase  # phase accumulator (in samples)
         self.freq = init_freq    # frequency increment per symbol (samples/symbol)
         self.phase_modulo = phase_modulo if phase_modulo is not None else sps
+        self.position = float(init_phase)  # unwrapped sampling position (in samples)
 
     def update_bang_bang(self, phase_error, nominal_freq=None, kp=0.01):
         """
@@ -23,7 +27,9 @@ class NCO:
         """
         if nominal_freq is None:
             nominal_freq = self.sps
-        self.phase += nominal_freq + kp * phase_error
+        step = nominal_freq + kp * phase_error
+        self.phase += step
+        self.position += step
         # Wrap phase accumulator
         if self.phase >= self.phase_modulo:
             self.phase -= self.phase_modulo
@@ -40,13 +46,43 @@ class NCO:
         """
         # Simple PI controller for demonstration
         self.freq += ki * phase_error
-        self.phase += self.freq + kp * phase_error
+        step = self.freq + kp * phase_error
+        self.phase += step
+        self.position += step
         # Wrap phase accumulator
         if self.phase >= self.phase_modulo:
             self.phase -= self.phase_modulo
         elif self.phase < 0:
             self.phase += self.phase_modulo
 
+    def advance(self, n_symbols):
+        """
+        Advance by n_symbols at the current frequency.
+        Returns:
+            Fractional (unwrapped) sample positions of the n_symbols sampling instants
+        """
+        positions = self.position + np.arange(n_symbols) * self.freq
+        self.position += n_symbols * self.freq
+        self.phase = self.position % self.phase_modulo
+        return positions
+
+    def adjust(self, phase_delta=0.0, freq_delta=0.0):
+        """
+        Apply loop filter corrections: shift the sampling position by phase_delta
+        samples and the frequency by freq_delta samples/symbol.
+        """
+        self.position += phase_delta
+        self.freq += freq_delta
+        self.phase = self.position % self.phase_modulo
+
+    def get_sample_position(self):
+        """
+        Get current fractional sample position (unwrapped).
+        Returns:
+            Float sample position
+        """
+        return self.position
+
     def get_sample_index(self):
         """
         Get current sample index for waveform sampling.
@@ -58,3 +94,4 @@ class NCO:
     def reset(self, phase=0.0, freq=1.0):
         self.phase = phase
         self.freq = freq
+        self.position = float(phase)
@@ -1,15 +1,16 @@
 import numpy as np
 from typing import Sequence, Optional, Tuple, Any
 from .ctle import ctle_fir
-from .cdr import ideal_sampler
-from .dfe import apply_dfe
+from .cdr import ideal_sampler, CdrEngine, CDR_DETECTORS
+from .dfe import DfeEngine, estimate_levels
 from .slicer import slicer_nrz, slicer_pam4
+from tx.mapping import demap_pam, pam_levels
 
 from config.schema import RxCfg
 
 class Rx:
     """
-    Receiver pipeline: CTLE → CDR → slicer → DFE.
+    Receiver pipeline: CTLE → CDR → DFE (slicer in the loop) → slicer.
     Uses RxCfg dataclass for configuration.
     """
     def __init__(self, cfg: RxCfg) -> None:
@@ -32,9 +33,10 @@ class Rx:
             waveform: Input waveform samples (at sim_sample_rate).
             sim_sample_rate: Simulation sample rate in samples/second (Sa/s).
             symbol_rate: Symbol rate in symbols/second (baud).
-            threshold: Slicer threshold (midpoint voltage, optional).
+            threshold: Slicer threshold (midpoint voltage, default: mean of the samples);
+                also the CDR midpoint unless cdr_params sets its own threshold.
         Returns:
-            Sliced bits (NRZ) or tuples (PAM4).
+            Sliced bits (uint8; two Gray-coded bits per symbol for PAM4).
         """
         # compute samples-per-symbol from provided rates
         if sim_sample_rate <= 0 or symbol_rate <= 0:
@@ -52,19 +54,40 @@ class Rx:
         ctle_taps = self.cfg.ctle_params.get('taps', [1.0]) if self.cfg.ctle_params else [1.0]
         self.eq_waveform = ctle_fir(waveform, ctle_taps)
 
-        # 2. CDR (sample at symbol rate using computed sps)
-        self.symbols = ideal_sampler(self.eq_waveform, sps)
+        # 2. CDR: ideal symbol-rate sampling, or the closed-loop engine (result in self.cdr)
+        cdr_type = (self.cfg.cdr_type or 'ideal').lower()
+        if cdr_type == 'ideal':
+            self.symbols = ideal_sampler(self.eq_waveform, sps)
+        else:
+            if cdr_type not in CDR_DETECTORS:
+                raise ValueError(f"Unknown cdr_type '{self.cfg.cdr_type}'")
+            params = dict(self.cfg.cdr_params or {})
+            params.setdefault('detector', CDR_DETECTORS[cdr_type])
+            params.setdefault('n_levels', 4 if self.cfg.slicer_type.lower() == 'pam4' else 2)
+            # a threshold in cdr_params overrides the run() argument for the CDR only
+            params.setdefault('threshold', threshold)
+            self.cdr = CdrEngine(sps_float, **params).run(self.eq_waveform)
+            self.symbols = self.cdr.samples
 
-        # 3. DFE equalization (optional)
+        # 3. DFE equalization (optional), decision-directed around the slicer midpoint;
+        #    its in-loop decisions are the output bits
+        n_levels = 4 if self.cfg.slicer_type.lower() == 'pam4' else 2
         if self.cfg.dfe_taps:
-            self.dfe_symbols = apply_dfe(self.symbols, self.cfg.dfe_taps)
-        else:
-            self.dfe_symbols = self.symbols
+            center = float(threshold) if threshold is not None else float(np.mean(self.symbols))
+            x = np.asarray(self.symbols, dtype=float) - center
+            dfe = DfeEngine(self.cfg.dfe_taps, levels=estimate_levels(x, n_levels))
+            self.dfe_decisions, equalized = dfe.process(x, return_equalized=True)
+            self.dfe_symbols = equalized + center
+            self.bits = demap_pam(pam_levels(n_levels)[self.dfe_decisions], n_levels, 'gray')
+            return self.bits
+        self.dfe_symbols = self.symbols
 
-        # 4. Slicer (NRZ or PAM4)
-        if self.cfg.slicer_type.lower() == 'pam4':
-            self.bits = slicer_pam4(self.dfe_symbols, threshold=threshold)
+        # 4. Slicer (NRZ or PAM4); PAM4 thresholds from the level estimate around the midpoint
+        center = float(threshold) if threshold is not None else float(np.mean(self.dfe_symbols))
+        if n_levels == 4:
+            levels = estimate_levels(self.dfe_symbols, 4, center)
+            self.bits = slicer_pam4(self.dfe_symbols, thresholds=(levels[1:] + levels[:-1]) / 2)
         else:
-            self.bits = slicer_nrz(self.dfe_symbols, threshold=threshold)
+            self.bits = slicer_nrz(self.dfe_symbols, threshold=center)
         return self.bits
 
@@ -1,30 +1,116 @@
 
 import numpy as np
-from typing import Sequence, Union
+from typing import Optional, Sequence, Union
+from tx.mapping import demap_pam, pam_levels
 
-def slicer_nrz(symbols: Sequence[float], threshold: float = 0.0) -> np.ndarray:
+def slice_levels(symbols: Sequence[float], thresholds: Union[float, Sequence[float], np.ndarray], block_size: Optional[int] = None) -> np.ndarray:
+	"""
+	Level index of every symbol: the number of thresholds it exceeds.
+	Args:
+		symbols: Input symbol values.
+		thresholds: Ascending thresholds, shape (n_thresholds,), or one row per
+			block of block_size symbols, shape (n_blocks, n_thresholds).
+		block_size: Symbols per threshold row (per-block thresholds only).
+	Returns:
+		Level indices (uint8).
+	"""
+	x = np.asarray(symbols, dtype=float)
+	th = np.asarray(thresholds, dtype=float)
+	if th.ndim == 2:
+		if block_size is None:
+			raise ValueError("block_size is required with per-block thresholds")
+		if th.shape[0] * block_size < len(x):
+			raise ValueError("not enough threshold rows for the number of symbols")
+		th = np.repeat(th, block_size, axis=0)[:len(x)].T
+	else:
+		th = np.atleast_1d(th)[:, None]
+	idx = np.zeros(len(x), dtype=np.uint8)
+	for t in th:
+		idx += x > t
+	return idx
+
+def adaptive_thresholds(symbols: Sequence[float], n_levels: int, block_size: int) -> np.ndarray:
+	"""
+	Per-block decision thresholds for equally spaced levels: the midpoint is
+	the block mean and the level spacing follows the mean distance from it.
+	Args:
+		symbols: Input symbol values.
+		n_levels: Number of levels.
+		block_size: Symbols per block.
+	Returns:
+		Thresholds, shape (n_blocks, n_levels - 1).
+	"""
+	x = np.asarray(symbols, dtype=float)
+	n_blocks = -(-len(x) // block_size)
+	padded = np.full(n_blocks * block_size, np.nan)
+	padded[:len(x)] = x
+	blocks = padded.reshape(n_blocks, block_size)
+	center = np.nanmean(blocks, axis=1, keepdims=True)
+	norm = np.linspace(-1.0, 1.0, n_levels)
+	amplitude = np.nanmean(np.abs(blocks - center), axis=1, keepdims=True) / np.mean(np.abs(norm))
+	return center + amplitude * (norm[1:] + norm[:-1])[None, :] / 2
+
+def slicer_nrz(
+	symbols: Sequence[float],
+	threshold: Union[float, Sequence[float]] = 0.0,
+	block_size: Optional[int] = None,
+	packed: bool = False,
+) -> np.ndarray:
 	"""
 	Slice NRZ symbols to bits using threshold.
 	Args:
 		symbols: Input symbol values.
-		threshold: Decision threshold (default 0).
+		threshold: Decision threshold (default 0), or one per block of block_size symbols.
+		block_size: Symbols per threshold (per-block thresholds only).
+		packed: Return np.packbits output (for metrics.ber.packed_errors).
 	Returns:
-		Array of bits (0/1).
+		Array of bits (uint8 0/1), or packed bytes.
 	"""
-	return np.array([1 if s > threshold else 0 for s in symbols])
+	th = np.asarray(threshold, dtype=float)
+	bits = slice_levels(symbols, th[:, None] if th.ndim == 1 else th, block_size)
+	return np.packbits(bits) if packed else bits
 
-def slicer_pam4(symbols: Sequence[float], thresholds: Sequence[float] = (-2, 0, 2)) -> np.ndarray:
+def slicer_pam(
+	symbols: Sequence[float],
+	n_levels: int,
+	thresholds: Union[Sequence[float], np.ndarray],
+	block_size: Optional[int] = None,
+	coding: str = 'gray',
+	packed: bool = False,
+) -> np.ndarray:
 	"""
-	Slice PAM4 symbols to 2 bits using thresholds.
+	Slice PAM-N symbols and decode the level indices to bits (inverse of tx.mapping.map_pam).
 	Args:
 		symbols: Input symbol values.
-		thresholds: Tuple of 3 thresholds for PAM4 (-2, 0, 2 by default).
+		n_levels: PAM order.
+		thresholds: n_levels - 1 ascending thresholds, or one row per block.
+		block_size: Symbols per threshold row (per-block thresholds only).
+		coding: 'gray' or 'binary'.
+		packed: Return np.packbits output.
 	Returns:
-		Array of 2-bit tuples.
-	"""
-	def pam4_decision(s):
-		if s < thresholds[0]: return (0,0)
-		elif s < thresholds[1]: return (0,1)
-		elif s < thresholds[2]: return (1,1)
-		else: return (1,0)
-	return np.array([pam4_decision(s) for s in symbols])
+		Array of bits (uint8, MSB first per symbol group), or packed bytes.
+	"""
+	th = np.asarray(thresholds, dtype=float)
+	if th.shape[-1] != n_levels - 1:
+		raise ValueError(f"PAM{n_levels} needs {n_levels - 1} thresholds")
+	idx = slice_levels(symbols, th, block_size)
+	bits = demap_pam(pam_levels(n_levels)[idx], n_levels, coding)
+	return np.packbits(bits) if packed else bits
+
+def slicer_pam4(
+	symbols: Sequence[float],
+	thresholds: Union[Sequence[float], np.ndarray] = (-2, 0, 2),
+	block_size: Optional[int] = None,
+	packed: bool = False,
+) -> np.ndarray:
+	"""
+	Slice PAM4 symbols to Gray-coded bits using thresholds.
+	Args:
+		symbols: Input symbol values.
+		thresholds: 3 thresholds for PAM4 (-2, 0, 2 by default), or one row per block.
+		block_size: Symbols per threshold row (per-block thresholds only).
+		packed: Return np.packbits output.
+	Returns:
+		Array of bits (uint8), two per symbol (MSB first), or packed bytes.
+	"""
+	return slicer_pam(symbols, 4, thresholds, block_size, 'gray', packed)
@@ -1,5 +1,41 @@
 import numpy as np
-from typing import Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
+
+
+def block_vpp(waveform: np.ndarray, block_size: int, mode: str = "p2p") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    AGC level detector for every block of block_size samples (the last block
+    may be shorter), vectorized over the full blocks with a reshape.
+
+    mode:
+      - 'p2p': peak-to-peak of the block
+      - 'rms': 2*sqrt(2)*RMS about the block mean (Vpp of a sinusoid)
+
+    Returns:
+        lengths: samples per block.
+        vpp: detected peak-to-peak voltage per block.
+    """
+    if mode not in ("p2p", "rms"):
+        raise ValueError("mode must be 'p2p' or 'rms'")
+    wf = np.asarray(waveform, dtype=float)
+    block_size = int(block_size)
+    n_full = len(wf) // block_size
+    parts = [wf[:n_full * block_size].reshape(n_full, block_size)]
+    if len(wf) > n_full * block_size:
+        parts.append(wf[n_full * block_size:][None, :])
+    lengths, vpp = [], []
+    for blocks in parts:
+        if blocks.shape[0] == 0:
+            continue
+        if mode == "p2p":
+            vpp.append(np.max(blocks, axis=1) - np.min(blocks, axis=1))
+        else:
+            vrms = np.sqrt(np.mean((blocks - np.mean(blocks, axis=1, keepdims=True)) ** 2, axis=1))
+            vpp.append(2.0 * np.sqrt(2.0) * vrms)
+        lengths.append(np.full(blocks.shape[0], blocks.shape[1]))
+    if not vpp:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(lengths), np.concatenate(vpp)
 
 
 class VGA:
@@ -9,6 +45,8 @@ class VGA:
     - Gain is specified in dB (20*log10 amplitude gain).
     - AGC computes gain to map waveform peak-to-peak to target ADC full-scale (Vpp).
     - Optionally adds white gaussian noise (thermal) after gain.
+    - process() runs the AGC on a whole waveform; start_stream()/stream()/flush()
+      run it on consecutive blocks of any size with the same result.
     """
 
     def __init__(
@@ -22,6 +60,7 @@ class VGA:
         self.max_gain_db = float(max_gain_db)
         self.gain_db = float(default_gain_db)
         self.noise_std = float(noise_std)
+        self._stream: Optional[Dict[str, Any]] = None
 
     @staticmethod
     def _db_to_lin(gain_db: float) -> float:
@@ -30,6 +69,15 @@ class VGA:
     def set_gain_db(self, gain_db: float) -> None:
         self.gain_db = float(np.clip(gain_db, self.min_gain_db, self.max_gain_db))
 
+    def _desired_gain_db(self, vpp: np.ndarray, target_vpp: float, margin_db: float) -> np.ndarray:
+        """Gain (dB) mapping each detected vpp to target_vpp minus margin_db, clipped."""
+        vpp = np.asarray(vpp, dtype=float)
+        target = target_vpp * (10 ** (-margin_db / 20.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain_db = 20.0 * np.log10(target / vpp)
+        gain_db = np.where(vpp > 0, gain_db, self.min_gain_db)
+        return np.clip(gain_db, self.min_gain_db, self.max_gain_db)
+
     def compute_agc_gain_db(
         self,
         waveform: np.ndarray,
@@ -45,24 +93,37 @@ class VGA:
           - 'rms' : use RMS and assume sinusoidal relation (not recommended for PAM)
         margin_db: headroom subtracted from target (positive -> leave headroom)
         """
-        if mode not in ("p2p", "rms"):
-            raise ValueError("mode must be 'p2p' or 'rms'")
+        wf = np.asarray(waveform, dtype=float)
+        _, vpp = block_vpp(wf, max(len(wf), 1), mode)
+        return float(self._desired_gain_db(vpp, target_vpp, margin_db)[0])
 
-        if mode == "p2p":
-            cur_vpp = np.max(waveform) - np.min(waveform)
-            if cur_vpp <= 0:
-                return self.min_gain_db
-            desired_lin = (target_vpp * (10 ** (-margin_db / 20.0))) / cur_vpp
-        else:
-            vrms = np.sqrt(np.mean((waveform - np.mean(waveform)) ** 2))
-            if vrms <= 0:
-                return self.min_gain_db
-            # for sinusoid Vpp = 2*sqrt(2)*Vrms
-            desired_lin = (target_vpp * (10 ** (-margin_db / 20.0))) / (2.0 * np.sqrt(2.0) * vrms)
+    def _smooth(self, desired_db: np.ndarray, lengths: np.ndarray, fs: float, attack_ms: float, release_ms: float) -> np.ndarray:
+        """
+        Attack/release recursion over the block targets, starting from and
+        updating self.gain_db. The smoothing coefficients depend only on the
+        block length, so they are computed once per distinct length.
+        """
+        tau_a = max(1e-6, attack_ms / 1000.0)
+        tau_r = max(1e-6, release_ms / 1000.0)
+        block_time = np.asarray(lengths, dtype=float) / float(fs)
+        alpha_a = (1.0 - np.exp(-block_time / tau_a)).tolist()
+        alpha_r = (1.0 - np.exp(-block_time / tau_r)).tolist()
+        lo, hi = self.min_gain_db, self.max_gain_db
+        gains_db = np.empty(len(desired_db), dtype=float)
+        g = self.gain_db
+        for i, d in enumerate(np.asarray(desired_db, dtype=float).tolist()):
+            # attack when the gain rises, release when it falls
+            alpha = alpha_a[i] if d > g else alpha_r[i]
+            g = min(max((1.0 - alpha) * g + alpha * d, lo), hi)
+            gains_db[i] = g
+        self.gain_db = float(g)
+        return gains_db
 
-        gain_db = 20.0 * np.log10(desired_lin)
-        gain_db_clipped = float(np.clip(gain_db, self.min_gain_db, self.max_gain_db))
-        return gain_db_clipped
+    def _apply(self, wf: np.ndarray, gains_db_per_sample: np.ndarray) -> np.ndarray:
+        scaled_waveform = wf * 10.0 ** (gains_db_per_sample / 20.0)
+        if self.noise_std > 0.0:
+            scaled_waveform = scaled_waveform + np.random.normal(0.0, self.noise_std, size=scaled_waveform.shape)
+        return scaled_waveform
 
     def process(
         self,
@@ -100,29 +161,11 @@ class VGA:
         if n == 0:
             return wf, np.array([], dtype=float)
 
-        n_blocks = int(np.ceil(n / block_size))
-        gains_db = np.empty(n_blocks, dtype=float)
-
-        for i in range(n_blocks):
-            start = i * block_size
-            end = min(start + block_size, n)
-            blk = wf[start:end]
-
-            # desired instantaneous gain for this block (dB)
-            desired_db = self.compute_agc_gain_db(blk, target_vpp, margin_db=margin_db, mode=mode)
-
-            # block duration and smoothing coefficients
-            block_time = len(blk) / float(fs)
-            tau_a = max(1e-6, attack_ms / 1000.0)
-            tau_r = max(1e-6, release_ms / 1000.0)
-            alpha_a = 1.0 - np.exp(-block_time / tau_a)
-            alpha_r = 1.0 - np.exp(-block_time / tau_r)
-
-            prev = self.gain_db if i == 0 else gains_db[i - 1]
-            alpha = alpha_a if desired_db > prev else alpha_r
-
-            gains_db[i] = float((1.0 - alpha) * prev + alpha * desired_db)
-            gains_db[i] = float(np.clip(gains_db[i], self.min_gain_db, self.max_gain_db))
+        # detector and target gain of every block in one pass, then the recursion
+        lengths, vpp = block_vpp(wf, block_size, mode)
+        desired_db = self._desired_gain_db(vpp, target_vpp, margin_db)
+        gains_db = self._smooth(desired_db, lengths, fs, attack_ms, release_ms)
+        n_blocks = len(gains_db)
 
         # expand block gains to per-sample gains
         if interp and n_blocks > 1:
@@ -132,13 +175,108 @@ class VGA:
         else:
             gains_db_per_sample = np.repeat(gains_db, block_size)[:n]
 
-        # apply per-sample gain and optional noise
-        lin_gain = 10.0 ** (gains_db_per_sample / 20.0)
-        scaled_waveform = wf * lin_gain
-        if self.noise_std > 0.0:
-            scaled_waveform = scaled_waveform + np.random.normal(0.0, self.noise_std, size=scaled_waveform.shape)
+        return self._apply(wf, gains_db_per_sample), gains_db_per_sample
 
-        # update instance gain to last applied block for continuity
-        self.gain_db = float(gains_db[-1])
+    def start_stream(
+        self,
+        fs: float,
+        block_size: int,
+        target_vpp: float,
+        attack_ms: float = 0.5,
+        release_ms: float = 5.0,
+        margin_db: float = 1.0,
+        mode: str = "p2p",
+        interp: bool = True,
+    ) -> None:
+        """
+        Start a blockwise AGC run (arguments as in process()). The gain state,
+        the partial AGC block and the samples still waiting for the next block
+        gain are carried between stream() calls, so the concatenated outputs
+        of stream() and flush() equal process() on the whole waveform. Output
+        lags the input by up to one AGC block (1.5 blocks with interp).
+        """
+        if mode not in ("p2p", "rms"):
+            raise ValueError("mode must be 'p2p' or 'rms'")
+        self._stream = {
+            "fs": float(fs),
+            "block_size": int(block_size),
+            "target_vpp": float(target_vpp),
+            "attack_ms": float(attack_ms),
+            "release_ms": float(release_ms),
+            "margin_db": float(margin_db),
+            "mode": mode,
+            "interp": bool(interp),
+            "buf": np.zeros(0),    # samples not yet emitted
+            "buf_start": 0,        # global index of buf[0]
+            "n_blocks": 0,         # AGC blocks detected so far
+            "last": None,          # (center, gain_db) of the last detected block
+            "pending": [],         # (centers, gains_db) not yet fully emitted
+        }
+
+    def _stream_step(self, final: bool) -> Tuple[np.ndarray, np.ndarray]:
+        st = self._stream
+        size = st["block_size"]
+        received = st["buf_start"] + len(st["buf"])
+        # detect every AGC block that is complete (and the ragged tail at the end)
+        det_start = st["n_blocks"] * size
+        det_stop = received if final else (received // size) * size
+        if det_stop > det_start:
+            seg = st["buf"][det_start - st["buf_start"]:det_stop - st["buf_start"]]
+            lengths, vpp = block_vpp(seg, size, st["mode"])
+            gains_db = self._smooth(
+                self._desired_gain_db(vpp, st["target_vpp"], st["margin_db"]),
+                lengths, st["fs"], st["attack_ms"], st["release_ms"],
+            )
+            centers = (st["n_blocks"] + np.arange(len(gains_db))) * size + 0.5 * size
+            st["n_blocks"] += len(gains_db)
+            if st["last"] is not None:
+                centers = np.concatenate([[st["last"][0]], centers])
+                gains_db = np.concatenate([[st["last"][1]], gains_db])
+            st["last"] = (float(centers[-1]), float(gains_db[-1]))
+            st["pending"] = (centers, gains_db)
+        if st["last"] is None:
+            return np.zeros(0), np.zeros(0)
+        # emit the samples whose gain is known
+        if final:
+            stop = received
+        elif st["interp"]:
+            stop = min(int(np.floor(st["last"][0])) + 1, received)
+        else:
+            stop = st["n_blocks"] * size
+        n_out = stop - st["buf_start"]
+        if n_out <= 0:
+            return np.zeros(0), np.zeros(0)
+        idx = np.arange(st["buf_start"], stop)
+        centers, gains_db = st["pending"]
+        if st["interp"]:
+            gains_db_per_sample = np.interp(idx, centers, gains_db)
+        else:
+            # held gain of the block each sample belongs to
+            first_block = int(round(centers[0] / size - 0.5))
+            gains_db_per_sample = gains_db[idx // size - first_block]
+        out = self._apply(st["buf"][:n_out], gains_db_per_sample)
+        st["buf"] = st["buf"][n_out:]
+        st["buf_start"] = stop
+        return out, gains_db_per_sample
+
+    def stream(self, block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Feed the next input block (any length).
+
+        Returns:
+            scaled_waveform: output samples that are now complete (may be empty).
+            gains_db_per_sample: their applied gain in dB.
+        """
+        if self._stream is None:
+            raise RuntimeError("Stream not started. Call start_stream() before stream().")
+        st = self._stream
+        st["buf"] = np.concatenate([st["buf"], np.asarray(block, dtype=float)])
+        return self._stream_step(final=False)
 
-        return scaled_waveform, gains_db_per_sample
\ No newline at end of file
+    def flush(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the remaining output at the end of the stream (the last block may be partial)."""
+        if self._stream is None:
+            raise RuntimeError("Stream not started. Call start_stream() before flush().")
+        out = self._stream_step(final=True)
+        self._stream = None
+        return out
@@ -0,0 +1,64 @@
+
+import pickle
+import numpy as np
+from bit_utils.core import prbs, prbs_bits, prbs_state_at, gold_code, random_bits, from_file
+from bit_utils.source import PrbsSource, RandomSource, BitSource
+from bit_utils.pattern import PatternFile, convert_text_pattern
+
+def _reference_prbs(order, n_bits, seed, taps):
+	reg = [int(x) for x in bin(seed)[2:].zfill(order)]
+	seq = []
+	for _ in range(n_bits):
+		seq.append(reg[-1])
+		feedback = 0
+		for t in taps:
+			feedback ^= reg[-t]
+		reg = [feedback] + reg[:-1]
+	return np.array(seq)
+
+def test_prbs_matches_reference_lfsr():
+	for order, taps in [(7, [7, 6]), (9, [9, 5]), (15, [15, 14]), (23, [23, 18]), (31, [31, 28])]:
+		seed = (1 << order) - 3
+		ref = _reference_prbs(order, 3000, seed, taps)
+		assert np.array_equal(prbs(order, 3000, seed=seed), ref)
+		assert np.array_equal(prbs_bits(order, 3000, seed=seed), ref)
+
+def test_prbs_bits_packed():
+	bits = prbs_bits(23, 1001, seed=0x7FFFFFFFF)
+	assert bits.dtype == np.uint8
+	packed = prbs_bits(23, 1001, seed=0x7FFFFFFFF, packed=True)
+	assert np.array_equal(packed, np.packbits(bits))
+
+def test_prbs_jump_ahead_matches_full_sequence():
+	full = prbs(31, 4096, seed=0x1234567)
+	assert np.array_equal(prbs(31, 1000, seed=0x1234567, start=3000), full[3000:4000])
+	state = prbs_state_at(31, 0x1234567, 2048)
+	assert np.array_equal(prbs(31, 256, seed=state), full[2048:2304])
+	gold = gold_code(9, 2000, seed1=3, seed2=5)
+	assert np.array_equal(gold_code(9, 500, seed1=3, seed2=5, start=1500), gold[1500:])
+
+def test_bit_sources_stream_and_resume():
+	src = PrbsSource(23, seed=0x7FFFFFFFF)
+	assert isinstance(src, BitSource)
+	first = src.next_block(1000)
+	state = pickle.loads(pickle.dumps(src.get_state()))
+	rest = src.next_block(500)
+	assert np.array_equal(np.concatenate([first, rest]), prbs(23, 1500, seed=0x7FFFFFFFF))
+	resumed = PrbsSource(23, seed=1)
+	resumed.set_state(state)
+	assert np.array_equal(resumed.next_block(500), rest)
+	rnd = RandomSource(seed=3)
+	blocks = np.concatenate([rnd.next_block(n) for n in (10, 300, 90)])
+	assert np.array_equal(blocks, random_bits(400, seed=3))
+
+def test_packed_pattern_roundtrip(tmp_path):
+	bits = prbs(15, 1003, seed=77)
+	txt = tmp_path / 'pattern.txt'
+	txt.write_text('\n'.join(''.join(str(b) for b in bits[i:i + 64]) for i in range(0, len(bits), 64)))
+	binary = tmp_path / 'pattern.bin'
+	assert convert_text_pattern(str(txt), str(binary), block_bits=100) == len(bits)
+	pattern = PatternFile(str(binary))
+	assert len(pattern) == len(bits)
+	assert np.array_equal(pattern.bits(13, 999), bits[13:999])
+	assert np.array_equal(pattern.packed(), np.packbits(bits))
+	assert np.array_equal(from_file(str(binary)), bits)
@@ -1,6 +1,6 @@
 
 import numpy as np
-from channel.simple import simple_channel, copper_channel
+from channel.simple import simple_channel, copper_channel, CopperChannel
 from config.schema import ChannelCfg
 
 def test_simple_channel_pass():
@@ -16,3 +16,136 @@ def test_copper_channel_pass():
 	out = copper_channel(waveform, cfg)
 	assert isinstance(out, np.ndarray)
 	assert out.shape == waveform.shape
+
+def test_copper_channel_blocks_match_one_shot():
+	cfg = ChannelCfg(type='copper', fixed_loss_db=3.0, delay=5, alpha_db_per_in_ghz=0.1, length_in=3.0)
+	waveform = np.random.RandomState(0).randn(5000)
+	ref = waveform * 10 ** (-3.0 / 20)
+	nc = CopperChannel(cfg).norm_cutoff
+	for i in range(1, len(ref)):
+		ref[i] = nc * ref[i] + (nc - 1) * ref[i-1]
+	ref = np.concatenate([np.zeros(5), ref[:-5]])
+	assert np.allclose(copper_channel(waveform, cfg), ref)
+	channel = CopperChannel(cfg)
+	blocks = [channel.process(waveform[i:i + 333]) for i in range(0, len(waveform), 333)]
+	assert np.array_equal(np.concatenate(blocks), copper_channel(waveform, cfg))
+
+def test_copper_fd_impulse_response_matches_loss_and_is_cached():
+	from channel.copper import copper_impulse_response, copper_loss_db, copper_fd_channel
+	cfg = ChannelCfg(type='copper_fd', fixed_loss_db=0.0, alpha_db_per_in_ghz=0.1, length_in=5.0, profile='SFP+')
+	fs = 400e9
+	h = copper_impulse_response(cfg, fs, n_taps=2048)
+	assert copper_impulse_response(cfg, fs, n_taps=2048) is h
+	f = np.fft.rfftfreq(8192, 1 / fs)
+	loss = -20 * np.log10(np.abs(np.fft.rfft(h, 8192)))
+	band = (f > 1e9) & (f < 60e9)
+	assert np.allclose(loss[band], copper_loss_db(f[band], cfg), atol=0.01)
+	thicker = ChannelCfg(type='copper_fd', fixed_loss_db=0.0, alpha_db_per_in_ghz=0.1, length_in=5.0, gauge=24)
+	assert copper_loss_db(np.array([10e9]), thicker)[0] < copper_loss_db(np.array([10e9]), cfg)[0]
+	out = copper_fd_channel(np.ones(4096), cfg, fs, n_taps=2048)
+	assert out.shape == (4096,)
+	assert abs(out[-1] - np.sum(h)) < 1e-9
+
+def _write_s4p(path, freqs, sdd):
+	with open(path, 'w') as f:
+		f.write('! differential thru\n# GHZ S RI R 50\n')
+		for fi, h in zip(freqs, sdd):
+			s = np.zeros((4, 4), dtype=complex)
+			s[2, 0] = s[0, 2] = s[3, 1] = s[1, 3] = h
+			vals = [fi / 1e9] + [x for v in s.reshape(-1) for x in (v.real, v.imag)]
+			f.write(' '.join(f'{x:.12g}' for x in vals[:9]) + '\n')
+			for i in range(9, len(vals), 8):
+				f.write(' '.join(f'{x:.12g}' for x in vals[i:i + 8]) + '\n')
+
+def test_sparam_channel_from_s4p(tmp_path):
+	from channel.sparam import read_touchstone, sdd21, sparam_impulse_response, SparamChannel, sparam_channel
+	freqs = np.linspace(10e6, 40e9, 4000)
+	loss_db = 0.5 * np.sqrt(freqs / 1e9) + 0.1 * freqs / 1e9
+	sdd = 10 ** (-loss_db / 20) * np.exp(-2j * np.pi * freqs * 1e-9)
+	path = str(tmp_path / 'thru.s4p')
+	_write_s4p(path, freqs, sdd)
+	f, s, z0 = read_touchstone(path)
+	assert s.shape == (4000, 4, 4) and z0 == 50.0
+	assert np.allclose(sdd21(s), sdd)
+	fs = 200e9
+	cache = str(tmp_path / 'cache')
+	h = sparam_impulse_response(path, fs, cache_dir=cache)
+	assert np.array_equal(sparam_impulse_response(path, fs, cache_dir=cache), h)
+	assert abs(np.argmax(np.abs(h)) / fs - 1e-9) < 2 / fs
+	grid = np.fft.rfftfreq(4 * len(h), 1 / fs)
+	k = np.argmin(np.abs(grid - 10e9))
+	assert abs(-20 * np.log10(np.abs(np.fft.rfft(h, 4 * len(h))[k])) - (0.5 * np.sqrt(10) + 1)) < 0.02
+	cfg = ChannelCfg(type='sparam', fixed_loss_db=0.0, sparam_file=path)
+	x = np.repeat(np.random.RandomState(0).choice([-1.0, 1.0], 2000), 8)
+	channel = SparamChannel(cfg, fs, cache_dir=cache)
+	blocks = np.concatenate([channel.process(x[i:i + 999]) for i in range(0, len(x), 999)])
+	assert np.allclose(blocks, sparam_channel(x, cfg, fs, cache_dir=cache))
+	assert np.allclose(blocks, np.convolve(x, h)[:len(x)])
+
+def test_overlap_save_matches_convolve():
+	from core.utils import OverlapSaveConvolver
+	rng = np.random.RandomState(1)
+	h = rng.randn(300)
+	x = rng.randn(10000)
+	conv = OverlapSaveConvolver(h)
+	out = [conv.process(x[i:i + 777]) for i in range(0, len(x), 777)] + [conv.flush()]
+	assert np.allclose(np.concatenate(out), np.convolve(x, h))
+
+def test_convolve_backend_matches_numpy():
+	from core.utils import convolve, FirFilter
+	rng = np.random.RandomState(2)
+	x = rng.randn(20000)
+	for n_taps in (5, 600):
+		h = rng.randn(n_taps)
+		for mode in ('full', 'same', 'valid'):
+			ref = np.convolve(x, h, mode=mode)
+			for method in ('auto', 'direct', 'fft', 'oa'):
+				assert np.allclose(convolve(x, h, mode=mode, method=method), ref)
+		for mode in ('full', 'same'):
+			fir = FirFilter(h, mode=mode)
+			out = [fir.process(x[i:i + 999]) for i in range(0, len(x), 999)] + [fir.flush()]
+			assert np.allclose(np.concatenate(out), np.convolve(x, h, mode=mode))
+	assert convolve(x.astype(np.float32), np.ones(300, dtype=np.float32), mode='same').dtype == np.float32
+	bits = rng.randint(0, 2, 3000)
+	from bit_utils.core import correlate
+	assert np.array_equal(correlate(bits, bits[:500]), np.correlate(bits, bits[:500], mode='full'))
+
+def test_crosstalk_lanes_and_statistical_eye():
+	from config.schema import AggressorCfg
+	from channel.xtalk import convolve_lanes, coupling_impulse_response, crosstalk_waveform, xtalk_cursors, xtalk_pdf
+	from metrics.stateye import stat_eye, pulse_response, eye_opening
+	rng = np.random.RandomState(0)
+	x = rng.randn(3, 1000)
+	h = [rng.randn(50), rng.randn(30), rng.randn(70)]
+	y = convolve_lanes(x, h)
+	for i in range(3):
+		assert np.allclose(y[i], np.convolve(x[i], h[i])[:1000])
+	assert np.allclose(crosstalk_waveform(x, h), (y - convolve_lanes(x.mean(axis=1, keepdims=True) * np.ones(1000), h)).sum(axis=0))
+	fs = 8 * 25e9
+	aggs = [AggressorCfg(kind='next', coupling_db=-30), AggressorCfg(kind='fext', coupling_db=-30)]
+	hs = [coupling_impulse_response(a, fs) for a in aggs]
+	# NEXT/FEXT slopes: 15 and 20 dB per decade below f_sat
+	f = np.fft.rfftfreq(4096, 1 / fs)
+	for hc, slope in zip(hs, (15, 20)):
+		mag = 20 * np.log10(np.abs(np.fft.rfft(hc, 4096)))
+		k1, k2 = np.argmin(np.abs(f - 1e9)), np.argmin(np.abs(f - 10e9))
+		assert abs(mag[k2] - mag[k1] - slope * np.log10(f[k2] / f[k1])) < 0.5
+	c = xtalk_cursors(hs, 8)
+	v, m = xtalk_pdf(c)
+	assert c.shape[0] == 2 and abs(m.sum() - 1) < 1e-9 and abs(np.sum(v * m)) < 1e-3
+	p = pulse_response(8, channel=np.exp(-np.arange(64) / 8.0) / 8.0)
+	clean = eye_opening(stat_eye(p, 8, noise_sigma=0.01), 1e-9)
+	noisy = eye_opening(stat_eye(p, 8, noise_sigma=0.01, xtalk=c), 1e-9)
+	assert noisy[0] < clean[0] - 0.05
+
+def test_link_with_aggressors():
+	from types import SimpleNamespace as NS
+	from config.schema import AggressorCfg, RxCfg
+	from link.link import Link
+	tx_cfg = NS(tx=NS(data_rate_gbps=25.0, modulation='NRZ', ffe_taps=[1.0], dac=NS(sps=4, resolution_bits=8, v_cm=0.0, v_swing=0.8)))
+	ch = ChannelCfg(type='simple', fixed_loss_db=0.0, aggressors=[AggressorCfg(coupling_db=-30, seed=s) for s in (1, 2, 3)])
+	link = Link(tx_cfg, ch, RxCfg())
+	bits = link.run()
+	assert len(bits) == 10000 and len(link.xtalk) == len(link.rx.eq_waveform)
+	assert 0 < np.std(link.xtalk) < 0.1
+	assert np.mean(bits == link.tx.bits) > 0.99
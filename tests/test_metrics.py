@@ -1,6 +1,7 @@
+import pytest
 
 import numpy as np
-from metrics.ber import empirical_ber, q_factor_ber
+from metrics.ber import empirical_ber, q_factor_ber, BerCounter, packed_errors, PrbsChecker
 from metrics.eye import fold_to_eye, eye_height_width, pam4_eye_heights
 from metrics.eq import mmse_taps, evm, snr
 
@@ -10,6 +11,41 @@ def test_empirical_ber():
 	ber = empirical_ber(rx_bits, tx_bits)
 	assert 0 <= ber <= 1
 
+def test_ber_counter_aligns_and_counts():
+	from bit_utils.core import prbs_bits
+	tx_bits = prbs_bits(23, 50000, seed=12345)
+	rx_bits = np.concatenate([np.zeros(9, dtype=np.uint8), tx_bits])[:len(tx_bits)]
+	rx_bits[[100, 2000, 30000]] ^= 1
+	counter = BerCounter(align_bits=2048)
+	for start in range(0, len(tx_bits), 4999):
+		counter.update(rx_bits[start:start + 4999], tx_bits[start:start + 4999])
+	assert counter.lag == 9
+	assert counter.errors == 3
+	assert counter.bits == len(tx_bits) - 9
+	assert packed_errors(np.packbits(tx_bits[:13]), np.packbits(1 - tx_bits[:13]), 13) == 13
+
+def test_prbs_checker_locks_and_relocks():
+	from bit_utils.core import prbs_bits
+	rx_bits = prbs_bits(31, 120000, seed=0x7FFFFFFF)[77:].copy()
+	rx_bits[[5000, 20000, 40000]] ^= 1
+	rx_bits[60000:61000] = np.random.RandomState(0).randint(0, 2, 1000)
+	checker = PrbsChecker(31)
+	for start in range(0, len(rx_bits), 8192):
+		checker.process(rx_bits[start:start + 8192])
+	assert checker.locked
+	# burst bits that fall in the window before the failing one are counted
+	assert 3 <= checker.errors < 3 + 0.2 * checker.window
+	assert len(checker.lock_events) == 2
+	assert len(checker.loss_events) == 1
+	assert 59000 <= checker.loss_events[0] <= 60000
+
+def test_prbs_checker_rejects_stuck_input():
+	for value in (0, 1):
+		checker = PrbsChecker(31)
+		checker.process(np.full(100000, value, dtype=np.uint8))
+		assert not checker.locked
+		assert not checker.lock_events
+
 def test_q_factor_ber():
 	ber = q_factor_ber(6.0)
 	assert 0 <= ber <= 1
@@ -41,3 +77,61 @@ def test_evm_snr():
 	tx = np.ones(10)
 	assert evm(rx, tx) == 0
 	assert snr(rx, tx) > 0
+
+def test_stat_eye_matches_gaussian_isi_ber():
+	from scipy.stats import norm
+	from metrics.stateye import pulse_response, stat_eye, eye_opening, bathtub, to_results
+	sps = 16
+	echo = np.zeros(3 * sps)
+	echo[0], echo[sps], echo[2 * sps] = 1.0, 0.3, -0.1
+	result = stat_eye(pulse_response(sps, channel=echo), sps, noise_sigma=0.15)
+	isi = np.array([a * 0.3 - b * 0.1 for a in (-1, 1) for b in (-1, 1)])
+	exact = np.mean(norm.cdf(-(1 + isi) / 0.15))
+	voltages, ber = bathtub(result, axis='voltage')
+	assert abs(ber[np.argmin(np.abs(voltages))] / exact - 1) < 0.05
+	# worst-case ISI leaves 4 sigma: closed at 1e-12, open at 1e-4
+	assert eye_opening(result, 1e-12) == (0.0, 0.0)
+	height, width = eye_opening(result, 1e-4)
+	assert 0 < height < 2 and 0 < width <= 1
+	jittered = stat_eye(pulse_response(sps, channel=np.ones(8) / 8), sps, noise_sigma=0.02, rj=0.02, dj=0.1)
+	clean = stat_eye(pulse_response(sps, channel=np.ones(8) / 8), sps, noise_sigma=0.02)
+	assert eye_opening(jittered)[1] < eye_opening(clean)[1]
+	assert to_results(clean).eye_height == eye_opening(clean)[0]
+
+def test_com_ideal_channel_and_equalizer_search():
+	from scipy.stats import norm
+	from metrics.com import com
+	sps, rate = 16, 25e9
+	r = com(np.array([1.0]), sps, rate, ctle_gdc_db=None, ffe_pre=[0], ffe_post=[0], n_dfe=0, noise_sigma=0.05)
+	assert abs(r.com_db - 20 * np.log10(1 / (0.05 * norm.isf(1e-4)))) < 0.1
+	h = 0.15 * np.exp(-np.arange(20 * sps) / (1.5 * sps))
+	fixed = com(h, sps, rate, ctle_gdc_db=None, ffe_pre=[0], ffe_post=[0], n_dfe=0, noise_sigma=1e-3)
+	best = com(h, sps, rate, n_dfe=2, noise_sigma=1e-3)
+	assert best.com_db > fixed.com_db + 3
+	# same DC-gain normalization as the Tx, so the taps apply unchanged
+	from tx.ffe import normalize_taps
+	assert abs(sum(best.ffe_taps) - 1) < 1e-9
+	assert np.allclose(normalize_taps(best.ffe_taps), best.ffe_taps)
+	assert len(best.dfe_taps) == 2 and -0.5 <= best.sampling_phase < 0.5
+
+def test_jtol_sweep_bisects_and_matches_pool():
+	from types import SimpleNamespace as NS
+	from config.schema import ChannelCfg, RxCfg
+	from link.link import Link
+	from metrics.jtol import jtol_sweep, jtol_mask, jtol_min_symbols
+	tx_cfg = NS(tx=NS(data_rate_gbps=10.0, modulation='NRZ', ffe_taps=[1.0], dac=NS(sps=4, resolution_bits=8, v_cm=0.0, v_swing=1.0)))
+	link = Link(tx_cfg, ChannelCfg(type='simple', fixed_loss_db=0.0, isi_taps=[0.8, 0.2]), RxCfg(cdr_type='bbpd'))
+	kwargs = dict(n_symbols=8192, settle_symbols=2048, rel_tol=0.2, seed=1)
+	serial = jtol_sweep(link, [1e6, 1e8], workers=1, **kwargs)
+	# bang-bang loop is slew limited: tracks large low-frequency SJ, not high-frequency SJ
+	assert serial.amplitudes[0] > 2 * serial.amplitudes[1] > 0.2
+	assert np.all(serial.trials > 2) and np.all(serial.seconds > 0)
+	assert np.all(serial.ber <= 1e-4)
+	pooled = jtol_sweep(link, [1e6, 1e8], workers=2, **kwargs)
+	assert np.array_equal(pooled.amplitudes, serial.amplitudes)
+	# 6144 compared symbols at 10 GBd reach the SJ peak only above ~407 kHz
+	with pytest.raises(ValueError):
+		jtol_sweep(link, [1e5, 1e8], workers=1, **kwargs)
+	assert jtol_min_symbols(1e5, 10e9, 2048) == 2048 + 25000
+	mask = jtol_mask([1e5, 4e6, 1e8], 10.3125e9)
+	assert np.allclose(mask, [0.05 * 40, 0.05, 0.05], rtol=1e-3)
@@ -1,4 +1,5 @@
 
+import pytest
 import numpy as np
 from rx.rx import Rx
 from config.schema import RxCfg
@@ -9,3 +10,219 @@ def test_rx_output_shape():
 	dummy_waveform = np.ones(160)
 	bits = rx.run(dummy_waveform)
 	assert isinstance(bits, np.ndarray)
+
+def _dfe_reference(x, taps, levels):
+	thresholds = (levels[1:] + levels[:-1]) / 2
+	history = [levels[np.argmin(np.abs(levels))]] * len(taps)
+	out = []
+	for v in x:
+		d = int(np.searchsorted(thresholds, v - np.dot(taps, history)))
+		out.append(d)
+		history = [levels[d]] + history[:-1]
+	return np.array(out)
+
+def test_dfe_engine_matches_decision_feedback_loop():
+	from scipy.signal import lfilter
+	from rx.dfe import DfeEngine
+	rng = np.random.RandomState(0)
+	for levels, taps, noise in (([-1.0, 1.0], [0.4, -0.1, 0.05], 0.8), ([-3.0, -1.0, 1.0, 3.0], [0.5, 0.2, -0.1], 0.3)):
+		levels = np.array(levels)
+		a = rng.randint(0, len(levels), 5000)
+		x = lfilter([1.0] + taps, [1.0], levels[a]) + noise * rng.randn(len(a))
+		ref = _dfe_reference(x, taps, levels)
+		for mode in ('lut', 'speculative'):
+			dfe = DfeEngine(taps, levels, mode=mode)
+			parts = [dfe.process(x[i:i + 777], return_equalized=True) for i in range(0, len(x), 777)]
+			decisions = np.concatenate([p[0] for p in parts])
+			assert decisions.dtype == np.uint8
+			assert np.array_equal(decisions, ref)
+			equalized = np.concatenate([p[1] for p in parts])
+			assert np.array_equal(np.searchsorted(dfe.thresholds, equalized), ref)
+
+def test_rx_dfe_cancels_post_cursor_isi():
+	rng = np.random.RandomState(1)
+	bits = rng.randint(0, 2, 4000)
+	symbols = np.convolve(2.0 * bits - 1, [1.0, 0.6])[:len(bits)]
+	rx = Rx(RxCfg(dfe_taps=[0.6], slicer_type='NRZ'))
+	out = rx.run(np.repeat(symbols, 4), 4e9, 1e9, threshold=0.0)
+	assert np.array_equal(out, bits)
+	assert np.array_equal(rx.dfe_decisions, bits)
+
+def test_rx_pam4_dfe_decodes_loop_decisions():
+	from tx.mapping import map_pam4
+	rng = np.random.RandomState(3)
+	bits = rng.randint(0, 2, 8000).astype(np.uint8)
+	symbols = np.convolve(map_pam4(bits), [1.0, 0.5])[:len(bits) // 2]
+	rx = Rx(RxCfg(dfe_taps=[0.5], slicer_type='PAM4'))
+	out = rx.run(np.repeat(symbols, 4), 4e9, 1e9, threshold=0.0)
+	assert out.dtype == np.uint8 and np.array_equal(out, bits)
+	assert np.array_equal(rx.dfe_decisions, np.searchsorted([-2, 0, 2], map_pam4(bits)))
+
+def test_vectorized_slicers_gray_and_block_thresholds():
+	from rx.slicer import slicer_nrz, slicer_pam4, slicer_pam, adaptive_thresholds
+	from tx.mapping import map_pam4, map_pam
+	rng = np.random.RandomState(2)
+	bits = rng.randint(0, 2, 2000).astype(np.uint8)
+	symbols = map_pam4(bits) + 0.3 * rng.randn(1000)
+	out = slicer_pam4(symbols)
+	assert out.dtype == np.uint8 and np.array_equal(out, bits)
+	assert np.array_equal(slicer_pam4(symbols, packed=True), np.packbits(bits))
+	bits8 = rng.randint(0, 2, 3 * 500)
+	assert np.array_equal(slicer_pam(map_pam(bits8, 8), 8, [-6, -4, -2, 0, 2, 4, 6]), bits8)
+	# drifting offset and gain, tracked by per-block thresholds
+	drift = np.repeat(np.linspace(0.0, 2.0, 10), 100)
+	rx_symbols = (1 + drift / 4) * map_pam4(bits) + drift
+	th = adaptive_thresholds(rx_symbols, 4, 100)
+	assert th.shape == (10, 3)
+	assert np.array_equal(slicer_pam4(rx_symbols, th, block_size=100), bits)
+	assert not np.array_equal(slicer_pam4(rx_symbols), bits)
+	nrz_bits = slicer_nrz(2.0 * bits[:1000] - 1 + drift, threshold=th[:, 1], block_size=100)
+	assert np.array_equal(nrz_bits, bits[:1000])
+
+def test_rx_pam4_bits():
+	rng = np.random.RandomState(3)
+	from tx.mapping import map_pam4
+	bits = rng.randint(0, 2, 4000).astype(np.uint8)
+	waveform = 0.5 + 0.1 * np.repeat(map_pam4(bits), 4)
+	rx = Rx(RxCfg(slicer_type='PAM4'))
+	assert np.array_equal(rx.run(waveform, 4e9, 1e9, threshold=0.5), bits)
+
+def test_phase_detectors_vectorized():
+	from rx.cdr import bang_bang_phase_detector, hogge_phase_detector, mueller_muller_phase_detector, simple_loop_filter, pi_loop_filter
+	rng = np.random.RandomState(4)
+	sps = 4
+	w = np.repeat(rng.choice([-1.0, 1.0], 300), sps) + 0.3 * rng.randn(300 * sps)
+	phase, rec = bang_bang_phase_detector(w, sps, trace=True)
+	expected = []
+	for i in range(1, (len(w) - sps) // sps):
+		m = i * sps + sps // 2
+		e, c, l = (w[m - sps // 2] > 0), (w[m] > 0), (w[m + sps // 2] > 0)
+		expected.append(1 if e != c else (-1 if l != c else 0))
+	assert np.array_equal(phase, expected)
+	assert np.array_equal(rec['phase'], phase) and np.array_equal(rec['mid'], w[np.arange(1, len(phase) + 1) * sps + sps // 2])
+	idx = np.arange(sps, len(w) - sps, sps)
+	assert np.allclose(hogge_phase_detector(w, sps), (w[idx - 2] - w[idx + 2]) * w[idx])
+	# MM error sign follows the sampling offset of a symmetric pulse
+	a = rng.choice([-3.0, -1.0, 1.0, 3.0], 20000)
+	means = []
+	for tau in (-0.2, 0.2):
+		t = np.arange(-3, 4) + tau
+		y = np.convolve(a, np.exp(-t ** 2 / 0.8))[3:3 + len(a)]
+		means.append(mueller_muller_phase_detector(y).mean())
+	assert means[0] > 0.02 and means[1] < -0.02
+	e = rng.randn(100)
+	assert np.allclose(simple_loop_filter(e, 0.1), 0.1 * np.cumsum(e))
+	phase, freq = pi_loop_filter(e, kp=0.1, ki=0.01)
+	p, f = 0.0, 0.0
+	for k in range(len(e)):
+		f += 0.01 * e[k]
+		p += f + 0.1 * e[k]
+	assert np.isclose(phase[-1], p) and np.isclose(freq[-1], f)
+
+def _drifting_waveform(symbols, sps, ppm):
+	from rx.cdr import interpolate
+	# 4x oversampled smooth NRZ/PAM waveform resampled with a clock offset
+	up = np.repeat(symbols, 4 * sps).astype(float)
+	t = np.arange(-16 * sps, 16 * sps + 1) / (4 * sps)
+	g = np.exp(-0.5 * (t / 0.35) ** 2)
+	hi = np.convolve(up, g / g.sum(), mode='same')
+	return interpolate(hi, np.arange(0, len(hi) - 8, 4 * (1 + ppm)), 'cubic')
+
+def test_cdr_engine_tracks_frequency_offset():
+	from rx.cdr import CdrEngine
+	from rx.nco import NCO
+	nco = NCO(8, init_phase=1.5, init_freq=8.0)
+	assert np.allclose(nco.advance(3), [1.5, 9.5, 17.5]) and nco.get_sample_position() == 25.5
+	# legacy per-symbol updaters move the unwrapped position with the phase
+	nco.update_bang_bang(1.0, kp=0.5)
+	nco.update_digital_pll(-1.0, kp=0.5, ki=0.25)
+	assert nco.get_sample_position() == 25.5 + 8.5 + 7.25 and nco.phase == nco.get_sample_position() % 8
+	assert CdrEngine(8).run(np.random.RandomState(1).randn(50)).lock_time() is None
+	rng = np.random.RandomState(5)
+	for detector, levels in (('bbpd', [-1.0, 1.0]), ('hogge', [-1.0, 1.0]), ('mm', [-3.0, -1.0, 1.0, 3.0])):
+		a = rng.choice(levels, 40000)
+		w = _drifting_waveform(a, 8, 3e-4)
+		r = CdrEngine(8, detector=detector, n_levels=len(levels)).run(w, init_phase=0.3)
+		assert len(r.phase) == len(r.freq) == len(r.errors)
+		assert abs(r.freq[-1] + 3e-4) < 1e-4
+		assert r.lock_time() is not None and r.lock_time() < 30000
+		lv = np.array(levels)
+		d = lv[np.searchsorted((lv[1:] + lv[:-1]) / 2, r.samples)]
+		lag = len(d) - 6000
+		assert max(np.mean(d[lag:lag + 5000] == a[lag + s:lag + s + 5000]) for s in range(-2, 3)) == 1.0
+
+def test_rx_with_closed_loop_cdr():
+	rng = np.random.RandomState(6)
+	bits = rng.randint(0, 2, 20000).astype(np.uint8)
+	w = _drifting_waveform(2.0 * bits - 1, 8, -2e-4)
+	rx = Rx(RxCfg(cdr_type='bbpd'))
+	out = rx.run(w, 8e9, 1e9, threshold=0.0)
+	assert rx.cdr.lock_time() is not None
+	lag = len(out) - 6000
+	assert max(np.mean(out[lag:lag + 5000] == bits[lag + s:lag + s + 5000]) for s in range(-2, 3)) == 1.0
+	# a threshold in cdr_params is allowed and overrides the run() midpoint for the CDR
+	rx = Rx(RxCfg(cdr_type='bbpd', cdr_params={'threshold': 0.0}))
+	assert np.array_equal(rx.run(w, 8e9, 1e9, threshold=0.0), out)
+
+def test_closed_loop_cdr_idle_input():
+	from rx.cdr import CdrEngine
+	for cdr_type in ('bbpd', 'hogge', 'mm'):
+		rx = Rx(RxCfg(cdr_type=cdr_type))
+		out = rx.run(np.zeros(4000), 8e9, 1e9)
+		assert len(out) > 0 and np.all(np.isfinite(rx.symbols))
+	with pytest.raises(ValueError):
+		CdrEngine(8, detector='mm').run(np.zeros(0))
+
+def test_vga_stream_matches_process():
+	from rx.vga import VGA, block_vpp
+	rng = np.random.default_rng(3)
+	n = 20011
+	w = np.concatenate([np.full(n // 2, 0.1), np.full(n - n // 2, 1.0)]) * rng.standard_normal(n)
+	lengths, vpp = block_vpp(w, 64, 'p2p')
+	assert lengths.sum() == n and lengths[-1] == n % 64
+	assert vpp[3] == np.ptp(w[192:256])
+	for interp in (True, False):
+		ref = VGA()
+		y, g = ref.process(w, 1e9, 64, 0.8, attack_ms=1e-3, release_ms=1e-3, interp=interp)
+		vga = VGA()
+		vga.start_stream(1e9, 64, 0.8, attack_ms=1e-3, release_ms=1e-3, interp=interp)
+		parts, i = [], 0
+		while i < n:
+			k = int(rng.integers(1, 300))
+			parts.append(vga.stream(w[i:i + k]))
+			i += k
+		parts.append(vga.flush())
+		assert np.array_equal(np.concatenate([p[0] for p in parts]), y)
+		assert np.array_equal(np.concatenate([p[1] for p in parts]), g)
+		assert vga.gain_db == ref.gain_db
+	# settles around the gain that maps the block peak-to-peak to the target minus margin
+	desired = [ref.compute_agc_gain_db(w[i:i + 64], 0.8) for i in range(n - 64 * 40, n - 64, 64)]
+	assert abs(ref.gain_db - np.mean(desired)) < 1.5
+
+def test_adc_stream_matches_process_and_is_block_independent():
+	from rx.adc import ADC
+	rng = np.random.default_rng(2)
+	fs, rate = 412.5e9, 25.78125e9
+	x = 0.5 * np.sin(np.arange(50001) * 0.013) + 0.05 * rng.standard_normal(50001)
+	adc = ADC(sps=2, resolution_bits=6, v_swing=1.0, v_cm=0.0)
+	ref, _ = adc.process(x, fs, rate, return_codes=True)
+	adc.start_stream(fs, rate)
+	codes = np.concatenate([adc.stream(x[i:i + 777]) for i in range(0, len(x), 777)] + [adc.flush()])
+	assert ref.dtype == codes.dtype == np.uint8
+	assert np.array_equal(codes, ref)
+	assert np.array_equal(adc.decode(ref), adc.process(x, fs, rate)[0])
+	# jitter, frequency offset and noise: same codes for any blocking, resumable from a checkpoint
+	noisy = ADC(sps=2, resolution_bits=10, v_swing=1.0, v_cm=0.0, thermal_noise_stddev=0.01)
+	def capture(sizes):
+		noisy.start_stream(fs, rate, ppm=200, rj_rms=0.3e-12, sj_amp=2e-12, sj_freq=1e9, seed=7)
+		bounds = np.concatenate([[0], np.cumsum(sizes, dtype=int), [len(x)]])
+		return np.concatenate([noisy.stream(x[a:b]) for a, b in zip(bounds[:-1], bounds[1:])] + [noisy.flush()])
+	whole = capture([])
+	assert whole.dtype == np.uint16
+	assert np.array_equal(capture(rng.integers(1, 2000, 40)), whole)
+	assert abs(len(whole) - (len(x) - 1) / fs * 2 * rate * (1 + 200e-6)) <= 1
+	noisy.start_stream(fs, rate, ppm=200, rj_rms=0.3e-12, sj_amp=2e-12, sj_freq=1e9, seed=7)
+	head = noisy.stream(x[:20000])
+	resumed = ADC(sps=2, resolution_bits=10, v_swing=1.0, v_cm=0.0, thermal_noise_stddev=0.01)
+	resumed.set_state(noisy.get_state())
+	assert np.array_equal(np.concatenate([head, resumed.stream(x[20000:]), resumed.flush()]), whole)
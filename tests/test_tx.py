@@ -2,6 +2,9 @@
 import numpy as np
 from tx.tx import Tx
 from config.schema import TxCfg
+from tx.dac import DAC
+from tx.synth import synthesize_waveform, rate_ratio, pulse_filter, edge_jitter_from_cfg
+from tx.mapping import map_nrz, map_pam4, map_pam, demap_pam, PAM_GROUPING
 
 def test_tx_waveform_shape():
 	cfg = TxCfg(data_rate=1.0, modulation='NRZ', prbs_order=7)
@@ -9,3 +12,82 @@ def test_tx_waveform_shape():
 	waveform, time = tx.run()
 	assert isinstance(waveform, np.ndarray)
 	assert len(waveform) == len(time)
+
+def test_mapping_lut_matches_gray_table():
+	assert map_nrz([0, 1, 1]).tolist() == [-1, 1, 1]
+	symbols = map_pam4([0, 0, 0, 1, 1, 1, 1, 0])
+	assert symbols.dtype == np.int8
+	assert symbols.tolist() == [-3, -1, 1, 3]
+
+def test_pam_n_roundtrip():
+	rng = np.random.RandomState(0)
+	for n_levels in (3, 4, 6, 8):
+		k, _ = PAM_GROUPING[n_levels]
+		bits = rng.randint(0, 2, 60 * k)
+		for coding in ('gray', 'binary'):
+			symbols = map_pam(bits, n_levels, coding)
+			assert np.abs(symbols).max() <= n_levels - 1
+			assert np.array_equal(demap_pam(symbols, n_levels, coding), bits)
+
+def test_polyphase_synthesis_matches_upfirdn():
+	from scipy.signal import upfirdn
+	dac = DAC(sps=4, resolution_bits=8, v_cm=0.0, v_swing=2.0)
+	symbols = np.random.RandomState(1).choice([-1.0, 1.0], 200)
+	waveform, time = synthesize_waveform(symbols, dac, 25e9, 16 * 25e9, method='polyphase')
+	assert np.array_equal(waveform, np.repeat(dac.quantize(symbols), 16))
+	assert len(time) == len(waveform)
+	up, down = rate_ratio(25e9 * 7 / 3, 25e9)
+	h, delay = pulse_filter('rc', up, down)
+	ref = upfirdn(h, np.concatenate([dac.quantize(symbols), np.zeros(20)]), up)
+	n = int(round(len(symbols) * up / down))
+	waveform, time = synthesize_waveform(symbols, dac, 25e9, 25e9 * 7 / 3, method='polyphase', pulse='rc', return_time=False)
+	assert time is None
+	assert np.allclose(waveform, ref[np.arange(n) * down + delay])
+
+def test_edge_synthesis_matches_zoh_and_step_response():
+	dac = DAC(sps=4, resolution_bits=8, v_cm=0.0, v_swing=2.0)
+	symbols = np.random.RandomState(2).choice([-1.0, 1.0], 300)
+	for fs in (16 * 25e9, 25e9 * 7 / 3):
+		edge, _ = synthesize_waveform(symbols, dac, 25e9, fs, method='edge')
+		zoh, _ = synthesize_waveform(symbols, dac, 25e9, fs, method='polyphase')
+		assert np.array_equal(edge, zoh)
+	zoh = np.repeat(dac.quantize(symbols), 16)
+	taps = np.ones(9) / 9
+	step = np.cumsum(taps)
+	edge, _ = synthesize_waveform(symbols, dac, 25e9, 16 * 25e9, method='edge', step_response=step)
+	ref = np.convolve(np.repeat(dac.quantize(symbols), 16), taps)[:len(edge)]
+	assert np.allclose(edge[len(taps):], ref[len(taps):])
+	np.random.seed(3)
+	jitter = edge_jitter_from_cfg({'type': 'gaussian', 'stddev': 0.02, 'dcd': 0.05}, 25e9)
+	jittered, _ = synthesize_waveform(symbols, dac, 25e9, 16 * 25e9, method='edge', edge_jitter=jitter)
+	assert not np.array_equal(jittered, zoh)
+	# edges move by well under half a UI, so mid-symbol samples are unchanged
+	assert np.array_equal(jittered[8::16], zoh[8::16])
+
+def test_stream_matches_one_shot_run():
+	from types import SimpleNamespace
+	dac_cfg = SimpleNamespace(sps=4, resolution_bits=8, v_cm=0.0, v_swing=2.0)
+	cfg = SimpleNamespace(tx=SimpleNamespace(data_rate_gbps=53.125, modulation='pam4', ffe_taps=[-0.1, 0.8, -0.1], dac=dac_cfg))
+	tx = Tx(cfg)
+	tx.generate_bits(4000, mode='prbs', seed=5, prbs_order=9)
+	for pulse in ('zoh', 'rc'):
+		ref, _ = tx.run(100e9, method='polyphase', pulse=pulse)
+		for block_symbols in (1, 333, 1 << 16):
+			blocks = list(tx.stream(block_symbols=block_symbols, sim_sample_rate=100e9, pulse=pulse))
+			assert np.array_equal(np.concatenate(blocks), ref)
+	tx = Tx(cfg)
+	tx.open_source('prbs', seed=5, prbs_order=9)
+	streamed = np.concatenate(list(tx.stream(4000, block_symbols=500, sim_sample_rate=100e9, keep_debug=True)))
+	assert np.array_equal(streamed, tx.waveform)
+	assert len(tx.symbols) == 2000
+
+def test_dac_codes_match_quantize():
+	symbols = np.random.RandomState(4).choice([-3, -1, 1, 3], 1000).astype(np.int8)
+	for resolution_bits, dtype in ((6, np.uint8), (10, np.uint16)):
+		dac = DAC(sps=4, resolution_bits=resolution_bits, v_cm=0.1, v_swing=2.0)
+		for x in (symbols, np.convolve(symbols, [-0.1, 0.8, -0.1], mode='same') * 0.4):
+			codes = dac.encode(x)
+			assert codes.dtype == dtype
+			assert np.array_equal(dac.level_table[codes], dac.quantize(x))
+		codes, levels = dac.process(symbols, return_codes=True)
+		assert np.array_equal(levels[codes], dac.process(symbols))
@@ -1,5 +1,8 @@
 import numpy as np
-from typing import Sequence
+from typing import Sequence, Tuple
+
+# Symbols encoded per step on the float path of DAC.encode (bounds temporaries)
+ENCODE_CHUNK = 1 << 20
 
 
 class DAC:
@@ -25,6 +28,71 @@ class DAC:
         self.quantization_levels = 2**resolution_bits  # Total number of quantization levels
         self.lsb = v_swing / self.quantization_levels  # Voltage step size (LSB)
 
+    @property
+    def code_dtype(self) -> type:
+        """Smallest unsigned integer type holding every DAC code."""
+        if self.resolution_bits <= 8:
+            return np.uint8
+        if self.resolution_bits <= 16:
+            return np.uint16
+        return np.uint32
+
+    @property
+    def level_table(self) -> np.ndarray:
+        """
+        Output voltage of every DAC code; level_table[encode(x)] equals quantize(x).
+        """
+        codes = np.arange(self.quantization_levels, dtype=float)
+        return codes / (self.quantization_levels - 1) * self.v_swing + (self.v_cm - self.v_swing / 2)
+
+    def _codes(self, symbols: np.ndarray) -> np.ndarray:
+        """Float DAC codes, the same arithmetic as quantize()."""
+        normalized_symbols = (symbols - (self.v_cm - self.v_swing / 2)) / self.v_swing
+        return np.clip(
+            np.round(normalized_symbols * (self.quantization_levels - 1)),
+            0,
+            self.quantization_levels - 1,
+        )
+
+    def encode(self, symbols: Sequence[float]) -> np.ndarray:
+        """
+        Quantize symbols to compact integer DAC codes.
+
+        Integer symbols (mapper output) are quantized once per distinct level
+        through an offset lookup table; float symbols (e.g. after FFE) are
+        encoded chunk-wise straight into the code dtype.
+
+        Args:
+            symbols: Input symbols (e.g., NRZ or PAM4 levels).
+
+        Returns:
+            Codes as uint8 (<= 8 bit DAC) or uint16 array; expand with decode().
+        """
+        x = np.asarray(symbols)
+        if x.size == 0:
+            return np.zeros(x.shape, dtype=self.code_dtype)
+        if np.issubdtype(x.dtype, np.integer) or x.dtype == np.bool_:
+            lo, hi = int(x.min()), int(x.max())
+            lut = self._codes(np.arange(lo, hi + 1)).astype(self.code_dtype)
+            return lut[x.astype(np.intp) - lo]
+        codes = np.empty(x.shape, dtype=self.code_dtype)
+        flat_in, flat_out = x.reshape(-1), codes.reshape(-1)
+        for i in range(0, flat_in.size, ENCODE_CHUNK):
+            flat_out[i:i + ENCODE_CHUNK] = self._codes(flat_in[i:i + ENCODE_CHUNK])
+        return codes
+
+    def decode(self, codes: Sequence[int]) -> np.ndarray:
+        """
+        Expand DAC codes to output voltages.
+
+        Args:
+            codes: DAC codes from encode().
+
+        Returns:
+            Quantized voltages (float values).
+        """
+        return self.level_table[np.asarray(codes)]
+
     def quantize(self, symbols: Sequence[float]) -> np.ndarray:
         """
         Quantize the input symbols to the DAC's resolution.
@@ -65,16 +133,21 @@ class DAC:
         """
         return np.repeat(quantized_symbols, self.sps)
 
-    def process(self, symbols: Sequence[float]) -> np.ndarray:
+    def process(self, symbols: Sequence[float], return_codes: bool = False):
         """
         Process the input symbols through the DAC.
 
         Args:
             symbols: Input symbols (e.g., NRZ or PAM4 levels).
+            return_codes: If True, return the upsampled integer codes and the
+                level table instead of float voltages (compact DAC capture).
 
         Returns:
-            Analog waveform (float values).
+            Analog waveform (float values), or (codes, level_table).
         """
+        if return_codes:
+            return self.upsample(self.encode(symbols)), self.level_table
+
         # Quantize the symbols first
         quantized_symbols = self.quantize(symbols)
 
@@ -1,10 +1,11 @@
 # Symbol-rate FFE (pre-emphasis), tap normalization
 
 import numpy as np
+from core.utils import convolve
 
 def apply_ffe(symbols, taps):
     """Apply symbol-rate FFE to input symbols."""
-    return np.convolve(symbols, taps, mode='same')
+    return convolve(symbols, taps, mode='same')
 
 def normalize_taps(taps):
     """Normalize FFE taps so their sum is 1."""
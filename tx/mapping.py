@@ -1,14 +1,107 @@
-# NRZ/PAM4 mapping, Gray tables, optional 64b/66b stub
+# NRZ/PAM-N mapping, Gray tables, optional 64b/66b stub
+
+import numpy as np
+from functools import lru_cache
+
+# (bits, symbols) per mapping group for each PAM order; PAM3 packs 3 bits into
+# 2 symbols (3B2T) and PAM6 packs 5 bits into 2 symbols.
+PAM_GROUPING = {2: (1, 1), 3: (3, 2), 4: (2, 1), 6: (5, 2), 8: (3, 1)}
+
+def _grouping(n_levels):
+    if n_levels not in PAM_GROUPING:
+        raise ValueError(f"Unsupported PAM order {n_levels}; supported: {sorted(PAM_GROUPING)}")
+    return PAM_GROUPING[n_levels]
+
+def bits_per_symbol(n_levels):
+    """Average number of bits carried by one PAM-N symbol."""
+    k, m = _grouping(n_levels)
+    return k / m
+
+def pam_levels(n_levels):
+    """Symbol amplitudes for PAM-N: odd integers for even N (-3, -1, 1, 3), even for odd N (-2, 0, 2)."""
+    return (2 * np.arange(n_levels) - (n_levels - 1)).astype(np.int8)
+
+def _gray_inverse(v):
+    b = 0
+    while v:
+        b ^= v
+        v >>= 1
+    return b
+
+@lru_cache(maxsize=None)
+def pam_table(n_levels, coding='gray'):
+    """
+    Bit-group to level-index table for PAM-N.
+    Row v holds the level indices (0..N-1) of the symbols for bit group v (MSB first).
+    'gray' walks a reflected N-ary Gray sequence in binary-Gray order so adjacent
+    levels differ in one bit; 'binary' uses natural order.
+    """
+    if coding not in ('gray', 'binary'):
+        raise ValueError("coding must be 'gray' or 'binary'")
+    k, m = _grouping(n_levels)
+    table = np.empty((2 ** k, m), dtype=np.int8)
+    for v in range(2 ** k):
+        i = _gray_inverse(v) if coding == 'gray' else v
+        digits = []
+        for _ in range(m):
+            digits.append(i % n_levels)
+            i //= n_levels
+        digits = digits[::-1]
+        if coding == 'gray':
+            # reflect a digit whenever the more significant digits sum to odd
+            for j in range(1, m):
+                if sum(digits[:j]) % 2:
+                    digits[j] = n_levels - 1 - digits[j]
+        table[v] = digits
+    return table
+
+@lru_cache(maxsize=None)
+def _inverse_table(n_levels, coding='gray'):
+    table = pam_table(n_levels, coding)
+    k, m = _grouping(n_levels)
+    inv = np.zeros(n_levels ** m, dtype=np.int64)  # unused symbol combinations decode to 0
+    weights = n_levels ** np.arange(m - 1, -1, -1)
+    inv[table.astype(np.int64) @ weights] = np.arange(2 ** k)
+    return inv
+
+def map_pam(bits, n_levels, coding='gray'):
+    """Map bits to PAM-N symbols (int8) with a vectorized lookup table."""
+    k, m = _grouping(n_levels)
+    bits = np.asarray(bits, dtype=np.uint8)
+    if len(bits) % k:
+        raise ValueError(f"PAM{n_levels} needs a multiple of {k} bits, got {len(bits)}")
+    groups = np.zeros(len(bits) // k, dtype=np.uint8)
+    for j in range(k):
+        groups <<= 1
+        groups |= bits[j::k]
+    # fold the level amplitudes into the table so each group is one gather
+    lut = pam_levels(n_levels)[pam_table(n_levels, coding)]
+    if m == 1:
+        return lut[:, 0][groups]
+    return lut[groups].reshape(-1)
+
+def demap_pam(symbols, n_levels, coding='gray'):
+    """Map ideal PAM-N symbol values back to bits (uint8); inverse of map_pam."""
+    k, m = _grouping(n_levels)
+    idx = (np.asarray(symbols, dtype=np.int64) + (n_levels - 1)) // 2
+    if len(idx) % m:
+        raise ValueError(f"PAM{n_levels} needs a multiple of {m} symbols, got {len(idx)}")
+    combined = np.clip(idx, 0, n_levels - 1).reshape(-1, m) @ (n_levels ** np.arange(m - 1, -1, -1))
+    groups = _inverse_table(n_levels, coding)[combined]
+    return ((groups[:, None] >> np.arange(k - 1, -1, -1)) & 1).astype(np.uint8).reshape(-1)
 
 def map_nrz(bits):
     """Map bits to NRZ symbols (-1, +1)."""
-    return [1 if b else -1 for b in bits]
+    return np.array([-1, 1], dtype=np.int8)[np.asarray(bits, dtype=np.uint8)]
 
 def map_pam4(bits):
     """Map bits to PAM4 symbols using Gray code."""
-    gray_map = {(0,0): -3, (0,1): -1, (1,1): 1, (1,0): 3}
-    symbols = []
-    for i in range(0, len(bits), 2):
-        pair = (bits[i], bits[i+1])
-        symbols.append(gray_map[pair])
-    return symbols
+    return map_pam(bits, 4)
+
+def demap_nrz(symbols):
+    """Map NRZ symbols (-1, +1) back to bits."""
+    return (np.asarray(symbols) > 0).astype(np.uint8)
+
+def demap_pam4(symbols):
+    """Map Gray-coded PAM4 symbols back to bits."""
+    return demap_pam(symbols, 4)
@@ -3,8 +3,284 @@ Symbol-to-waveform synthesis at Tx samples per symbol (sps)
 """
 
 import numpy as np
-from typing import Sequence, Callable, Optional, Tuple
+from fractions import Fraction
+from typing import Any, Dict, Sequence, Callable, Optional, Tuple, Union
 from .dac import DAC
+from .jitter import add_rj, add_sj, add_dcd
+
+# Output samples evaluated per vectorized step of the polyphase synthesizer
+POLYPHASE_CHUNK = 1 << 18
+
+# Edges rendered per vectorized step of the edge-domain synthesizer
+EDGE_CHUNK = 1 << 12
+
+# Cached channel step responses, keyed by (channel, cfg repr, sample rate, length)
+_STEP_RESPONSE_CACHE: Dict[Tuple[Any, ...], np.ndarray] = {}
+
+
+def rate_ratio(sim_sample_rate: float, symbol_rate: float, max_denominator: int = 1000) -> Tuple[int, int]:
+    """
+    Express sim_sample_rate / symbol_rate as a rational up/down.
+    Returns:
+        (up, down): samples per symbol is up / down.
+    """
+    ratio = Fraction(float(sim_sample_rate) / float(symbol_rate)).limit_denominator(max_denominator)
+    return ratio.numerator, ratio.denominator
+
+
+def pulse_filter(
+    pulse: Union[str, Sequence[float]],
+    up: int,
+    down: int = 1,
+    rolloff: float = 0.35,
+    span: int = 8,
+) -> Tuple[np.ndarray, int]:
+    """
+    Build the pulse-shaping filter sampled at up * symbol_rate (= down * sim rate).
+
+    Args:
+        pulse: 'zoh' (rectangular, one UI hold), 'rc' (raised cosine), or a
+            measured Tx step response sampled at the simulation rate.
+        up, down: Rate ratio from rate_ratio().
+        rolloff: Raised-cosine roll-off factor (0..1).
+        span: Raised-cosine half-length in UI.
+
+    Returns:
+        (h, delay): filter taps and the delay (in filter-rate samples) of the
+        pulse reference point, so output sample n aligns with symbol n * down / up.
+    """
+    if isinstance(pulse, str):
+        if pulse == 'zoh':
+            return np.ones(up), 0
+        if pulse == 'rc':
+            t = (np.arange(2 * span * up + 1) - span * up) / up  # in UI
+            h = np.sinc(t)
+            denom = 1.0 - (2.0 * rolloff * t) ** 2
+            edge = np.isclose(denom, 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                h = np.where(edge, np.pi / 4 * np.sinc(1.0 / (2.0 * rolloff)) if rolloff > 0 else 0.0,
+                             h * np.cos(np.pi * rolloff * t) / denom)
+            return h, span * up
+        raise ValueError("pulse must be 'zoh', 'rc' or a step response array")
+    step = np.asarray(pulse, dtype=float)
+    if down > 1:
+        # step response is given at the sim rate; resample onto the filter grid
+        step = np.interp(np.arange(len(step) * down) / down, np.arange(len(step)), step)
+    h = step.copy()
+    h[up:] -= step[:-up]
+    return h, 0
+
+
+def polyphase_synthesize(
+    symbols: Sequence[float],
+    h: np.ndarray,
+    up: int,
+    down: int,
+    delay: int,
+    n_start: int,
+    n_stop: int,
+    symbol_offset: int = 0,
+    levels: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Evaluate output samples [n_start, n_stop) of upfirdn(h, symbols, up, down)
+    shifted by delay, using the polyphase decomposition of h.
+    Only the taps of the phase each output sample falls on are applied, and no
+    time axes are built.
+
+    Args:
+        symbols: Symbol values for global symbol indices symbol_offset ...
+            (symbols outside the given range are treated as zero).
+        h, up, down, delay: Filter and rate ratio (see pulse_filter/rate_ratio).
+        n_start, n_stop: Global output sample range.
+        symbol_offset: Global index of symbols[0].
+        levels: Optional level table; if given, symbols are integer codes and
+            are expanded to levels[code] lazily per chunk.
+
+    Returns:
+        Waveform samples as float64 array of length n_stop - n_start.
+    """
+    x = np.asarray(symbols)
+    n_taps = -(-len(h) // up)
+    hpoly = np.zeros(n_taps * up)
+    hpoly[:len(h)] = h
+    hpoly = hpoly.reshape(n_taps, up).T  # hpoly[phase, j] = h[phase + j * up]
+    # Output n = q * up + r always falls on filter phase (r * down + delay) % up and
+    # symbol q * down + (r * down + delay) // up, so the work is a (q, r) grid.
+    r = np.arange(up, dtype=np.int64)
+    base = (r * down + delay) // up
+    coef = hpoly[(r * down + delay) % up]  # coef[r, j]
+    out = np.empty(max(n_stop - n_start, 0))
+    rows = max(POLYPHASE_CHUNK // up, 1)
+    q_first = n_start // up
+    q_last = -(-n_stop // up)
+    for q0 in range(q_first, q_last, rows):
+        q1 = min(q0 + rows, q_last)
+        k_lo = q0 * down + int(base[0]) - (n_taps - 1) - symbol_offset
+        k_hi = (q1 - 1) * down + int(base[-1]) - symbol_offset
+        # zero-padded window of the symbols this chunk touches
+        xw = np.zeros(k_hi - k_lo + 1)
+        a, b = max(k_lo, 0), min(k_hi + 1, len(x))
+        if b > a:
+            xw[a - k_lo:b - k_lo] = levels[x[a:b]] if levels is not None else x[a:b]
+        idx = (np.arange(q0, q1, dtype=np.int64) * down - symbol_offset - k_lo)[:, None] + base[None, :]
+        acc = coef[:, 0] * xw[idx]
+        for j in range(1, n_taps):
+            acc += coef[:, j] * xw[idx - j]
+        acc = acc.reshape(-1)
+        lo = max(n_start - q0 * up, 0)
+        hi = min(n_stop - q0 * up, len(acc))
+        dst = q0 * up + lo - n_start
+        out[dst:dst + hi - lo] = acc[lo:hi]
+    return out
+
+
+def symbols_to_edges(symbols: Sequence[float], symbol_rate: float) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Represent a piecewise-constant symbol stream by its transitions.
+    Returns:
+        (edge_times, steps, initial_level): time (s) and amplitude change of
+        every transition, and the level of the first symbol.
+    """
+    levels = np.asarray(symbols, dtype=float)
+    if len(levels) == 0:
+        return np.zeros(0), np.zeros(0), 0.0
+    d = np.diff(levels)
+    idx = np.flatnonzero(d)
+    return (idx + 1) / float(symbol_rate), d[idx], float(levels[0])
+
+
+def edge_jitter_from_cfg(jitter_cfg: Any, symbol_rate: float) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """
+    Build an edge-time jitter function from a Tx jitter config (dict or namespace).
+    Recognized keys, all amplitudes in UI: 'rj' (RJ sigma), 'sj_amp' with
+    'sj_freq' (Hz), 'dcd'; the preset form {type: gaussian, stddev} maps to RJ.
+    Returns:
+        Callable applying tx.jitter.add_rj/add_sj/add_dcd to edge times, or None.
+    """
+    if jitter_cfg is None:
+        return None
+    get = jitter_cfg.get if isinstance(jitter_cfg, dict) else (lambda k, d=None: getattr(jitter_cfg, k, d))
+    ui = 1.0 / float(symbol_rate)
+    rj = get('rj')
+    if rj is None and str(get('type', '')).lower() == 'gaussian':
+        rj = get('stddev')
+    sj_amp, sj_freq, dcd = get('sj_amp'), get('sj_freq'), get('dcd')
+
+    def apply(edge_times: np.ndarray) -> np.ndarray:
+        t = np.asarray(edge_times, dtype=float)
+        if rj:
+            t = add_rj(t, float(rj) * ui)
+        if sj_amp and sj_freq:
+            t = add_sj(t, float(sj_freq), float(sj_amp) * ui)
+        if dcd:
+            t = add_dcd(t, float(dcd) * ui)
+        return t
+
+    return apply
+
+
+def channel_step_response(
+    channel: Callable[..., np.ndarray],
+    sample_rate: float,
+    n_samples: int,
+    cfg: Any = None,
+) -> np.ndarray:
+    """
+    Step response of a waveform-domain channel function, computed once and cached.
+    Args:
+        channel: Callable taking (waveform) or (waveform, cfg), e.g. copper_channel.
+        sample_rate: Sample rate of the response (Sa/s), part of the cache key.
+        n_samples: Response length in samples.
+        cfg: Optional channel config passed as second argument.
+    Returns:
+        Step response samples (read-only).
+    """
+    key = (channel, repr(cfg), float(sample_rate), int(n_samples))
+    if key not in _STEP_RESPONSE_CACHE:
+        step = np.ones(int(n_samples))
+        g = channel(step) if cfg is None else channel(step, cfg)
+        g = np.array(g, dtype=float)
+        g.setflags(write=False)
+        _STEP_RESPONSE_CACHE[key] = g
+    return _STEP_RESPONSE_CACHE[key]
+
+
+def render_edges(
+    edge_times: Sequence[float],
+    steps: Sequence[float],
+    initial_level: float,
+    sample_rate: float,
+    n_samples: int,
+    step_response: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Render a transition list by superposing shifted step responses.
+    Each edge contributes steps[k] * g(t - edge_times[k]); g is linearly
+    interpolated at the fractional edge position, and beyond its length it is
+    held at its final value, which is accumulated with a single cumsum.
+    Args:
+        edge_times: Transition times (s); may carry jitter.
+        steps: Amplitude change at each transition.
+        initial_level: Level before the first transition.
+        sample_rate: Output sample rate (Sa/s).
+        n_samples: Number of output samples.
+        step_response: Step response g sampled at sample_rate (g[0] at the
+            edge); defaults to an ideal step, which reproduces a ZOH waveform.
+    Returns:
+        Waveform samples.
+    """
+    g = np.asarray(step_response if step_response is not None else [1.0], dtype=float)
+    g_end = g[-1]
+    g_next = np.append(g[1:], g_end)
+    n_win = len(g)
+    pos = np.asarray(edge_times, dtype=float) * float(sample_rate)
+    # snap edges that sit on a sample up to float rounding
+    snapped = np.round(pos)
+    pos = np.where(np.abs(pos - snapped) < 1e-9, snapped, pos)
+    n0 = np.ceil(pos).astype(np.int64)
+    frac = n0 - pos
+    steps = np.asarray(steps, dtype=float)
+    # settled part: every edge adds steps * g_end from n0 + len(g) onwards
+    tail = np.bincount(np.clip(n0 + n_win, 0, n_samples), weights=steps * g_end, minlength=n_samples + 1)
+    out = initial_level * g_end + np.cumsum(tail)[:n_samples]
+    j = np.arange(n_win)
+    for e0 in range(0, len(n0), EDGE_CHUNK):
+        sl = slice(e0, e0 + EDGE_CHUNK)
+        idx = n0[sl, None] + j[None, :]
+        w = steps[sl, None] * ((1.0 - frac[sl, None]) * g[None, :] + frac[sl, None] * g_next[None, :])
+        keep = (idx >= 0) & (idx < n_samples)
+        idx, w = idx[keep], w[keep]
+        if idx.size == 0:
+            continue
+        # accumulate over the span covered by this chunk of edges only
+        lo = int(idx.min())
+        acc = np.bincount(idx - lo, weights=w)
+        out[lo:lo + len(acc)] += acc
+    return out
+
+
+def synthesize_edges(
+    symbols: Sequence[float],
+    dac: DAC,
+    symbol_rate: float,
+    sim_sample_rate: float,
+    step_response: Optional[Sequence[float]] = None,
+    edge_jitter: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Edge-domain synthesis: quantize symbols, extract transitions, jitter the
+    transition times and render them at sim_sample_rate by step-response
+    superposition. Cost scales with the number of transitions times the step
+    response length rather than with the number of samples.
+    """
+    levels = dac.decode(dac.encode(symbols))
+    edge_times, steps, initial = symbols_to_edges(levels, symbol_rate)
+    if edge_jitter is not None:
+        edge_times = edge_jitter(edge_times)
+    up, down = rate_ratio(sim_sample_rate, symbol_rate)
+    n_samples = int(round(len(levels) * up / down))
+    return render_edges(edge_times, steps, initial, sim_sample_rate, n_samples, step_response)
 
 
 def synthesize_waveform(
@@ -12,13 +288,48 @@ def synthesize_waveform(
     dac: DAC,
     symbol_rate: float,
     sim_sample_rate: Optional[float] = None,
-    jitter: Optional[Callable[[np.ndarray], np.ndarray]] = None
-) -> Tuple[np.ndarray, np.ndarray]:
+    jitter: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    method: str = 'interp',
+    pulse: Union[str, Sequence[float]] = 'zoh',
+    rolloff: float = 0.35,
+    span: int = 8,
+    return_time: bool = True,
+    step_response: Optional[Sequence[float]] = None,
+    edge_jitter: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
     """
     Convert symbols to waveform samples using the DAC, apply jitter if specified.
     If sim_sample_rate is provided (Sa/s), the output is resampled to that rate;
     otherwise output remains at the DAC sample rate (dac.sps * symbol_rate).
+
+    method='interp' (default) runs the DAC at its own rate and linearly
+    interpolates to the simulation rate. method='polyphase' quantizes each
+    symbol once and goes straight to the simulation rate with a polyphase
+    pulse-shaping filter (pulse='zoh', 'rc' or a measured step response),
+    supporting rational sim/symbol rate ratios without building time arrays.
+    method='edge' renders jittered transitions (edge_jitter acts on edge
+    times) through step_response, see synthesize_edges().
+    The time axis is only returned if return_time is True.
     """
+    if method == 'edge':
+        sim_fs = float(sim_sample_rate) if sim_sample_rate is not None else dac.sps * symbol_rate
+        waveform_sim = synthesize_edges(symbols, dac, symbol_rate, sim_fs, step_response, edge_jitter)
+        t_sim = np.arange(len(waveform_sim)) / sim_fs if return_time else None
+        return waveform_sim, t_sim
+    if method == 'polyphase':
+        sim_fs = float(sim_sample_rate) if sim_sample_rate is not None else dac.sps * symbol_rate
+        up, down = rate_ratio(sim_fs, symbol_rate)
+        h, delay = pulse_filter(pulse, up, down, rolloff=rolloff, span=span)
+        n_samples_sim = int(round(len(symbols) * up / down))
+        # symbols travel as DAC codes and are expanded per chunk via the level table
+        waveform_sim = polyphase_synthesize(dac.encode(symbols), h, up, down, delay, 0, n_samples_sim, levels=dac.level_table)
+        if jitter is not None:
+            waveform_sim = jitter(waveform_sim)
+        t_sim = np.arange(n_samples_sim) / sim_fs if return_time else None
+        return waveform_sim, t_sim
+    if method != 'interp':
+        raise ValueError("method must be 'interp', 'polyphase' or 'edge'")
+
     # Process symbols through the DAC (produces DAC-rate samples)
     waveform_dac = dac.process(symbols)
     dac_fs = dac.sps * symbol_rate  # samples per second at DAC
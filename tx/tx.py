@@ -1,10 +1,12 @@
 import numpy as np
 from bit_utils.core import prbs, random_bits
-from .mapping import map_nrz, map_pam4
+from bit_utils.source import BitSource, make_bit_source
+from .mapping import map_nrz, map_pam4, map_pam, bits_per_symbol, PAM_GROUPING
 from .ffe import apply_ffe, normalize_taps
-from .synth import synthesize_waveform
-from typing import Tuple
+from .synth import synthesize_waveform, edge_jitter_from_cfg, rate_ratio, pulse_filter, polyphase_synthesize
+from typing import Callable, Iterator, Optional, Tuple
 from .dac import DAC
+from core.utils import FirFilter
 
 from config.schema import TxCfg
 
@@ -20,6 +22,7 @@ class Tx:
         """
         self.cfg = cfg
         self.bits = None
+        self.source = None
 
     def generate_bits(self, n_bits: int, mode: str = 'random', seed: int = None, prbs_order: int = 7) -> None:
         """
@@ -38,9 +41,168 @@ class Tx:
             raise ValueError("mode must be 'random' or 'prbs'")
         self.bits = bits
 
-    def run(self, sim_sample_rate: int = 16e9) -> Tuple[np.ndarray, np.ndarray]:
+    def open_source(self, mode: str = 'random', seed: int = None, prbs_order: int = 7, **kwargs) -> BitSource:
+        """
+        Create a streaming bit source and store it as self.source.
+        The source's get_state()/set_state() can be used to checkpoint a long run.
+        Args:
+            mode: 'random', 'prbs', 'gold', 'alternating', 'repeat' or 'file'
+            seed: Optional seed for reproducibility
+            prbs_order: PRBS order (used if mode is 'prbs' or 'gold')
+            kwargs: Extra arguments for bit_utils.source.make_bit_source
+        Returns:
+            The new BitSource
+        """
+        self.source = make_bit_source(mode, seed=seed, prbs_order=prbs_order, **kwargs)
+        return self.source
+
+    def bit_blocks(self, n_bits: int, block_bits: int = 1 << 16) -> Iterator[np.ndarray]:
+        """
+        Pull n_bits from self.source in fixed-size chunks (constant memory).
+        Args:
+            n_bits: Total number of bits to pull
+            block_bits: Bits per chunk (last chunk may be shorter)
+        Yields:
+            uint8 bit arrays
+        """
+        if self.source is None:
+            raise RuntimeError("Bit source not opened. Call open_source() before bit_blocks().")
+        remaining = int(n_bits)
+        while remaining > 0:
+            blk = self.source.next_block(min(block_bits, remaining))
+            if len(blk) == 0:
+                return
+            remaining -= len(blk)
+            yield blk
+
+    def _modulation(self) -> Tuple[Callable[[np.ndarray], np.ndarray], int, int, float]:
+        """
+        Resolve cfg.tx.modulation.
+        Returns:
+            (mapper, bits_per_group, symbols_per_group, symbol_rate)
+        """
+        data_rate = float(self.cfg.tx.data_rate_gbps) * 1e9  # Gbps -> bps
+        modulation = self.cfg.tx.modulation.lower()
+        if modulation == 'pam4':
+            mapper, n_levels = map_pam4, 4
+        elif modulation.startswith('pam'):
+            n_levels = int(modulation[3:])
+            mapper = lambda bits: map_pam(bits, n_levels)
+        else:
+            mapper, n_levels = map_nrz, 2
+        k, m = PAM_GROUPING[n_levels]
+        return mapper, k, m, data_rate / bits_per_symbol(n_levels)
+
+    def _dac(self) -> DAC:
+        """DAC instance from self.cfg.tx.dac."""
+        dac_cfg = self.cfg.tx.dac
+        return DAC(
+            sps=int(dac_cfg.sps),
+            resolution_bits=int(dac_cfg.resolution_bits),
+            v_cm=float(dac_cfg.v_cm),
+            v_swing=float(dac_cfg.v_swing),
+        )
+
+    def stream(
+        self,
+        n_bits: Optional[int] = None,
+        block_symbols: int = 1 << 16,
+        sim_sample_rate: float = 16e9,
+        pulse='zoh',
+        keep_debug: bool = False,
+    ) -> Iterator[np.ndarray]:
+        """
+        Run the Tx pipeline block by block and yield waveform blocks.
+        The FFE overlap and the polyphase resampler position are carried across
+        blocks, so the concatenated blocks equal run(method='polyphase') exactly,
+        while memory stays bounded by the block size.
+        Args:
+            n_bits: Bits to pull from self.source (see open_source()); if None,
+                self.bits from generate_bits() is streamed.
+            block_symbols: Symbols mapped per block.
+            sim_sample_rate: Output sample rate (Sa/s).
+            pulse: Pulse shape: 'zoh', 'rc' or a step response (see tx.synth).
+            keep_debug: If True, store symbols, symbols_ffe and waveform on self
+                once the stream ends (full-length copies).
+        Yields:
+            Waveform sample blocks.
+        """
+        mapper, k, m, symbol_rate = self._modulation()
+        block_bits = max(int(block_symbols) // m, 1) * k
+        if n_bits is not None:
+            bit_iter = self.bit_blocks(n_bits, block_bits)
+        elif self.bits is not None:
+            bits = self.bits
+            bit_iter = (bits[i:i + block_bits] for i in range(0, len(bits), block_bits))
+        else:
+            raise RuntimeError("No bits to stream. Call generate_bits() or open_source() first.")
+
+        ffe = FirFilter(normalize_taps(self.cfg.tx.ffe_taps), mode='same')
+        dac = self._dac()
+        up, down = rate_ratio(float(sim_sample_rate), symbol_rate)
+        h, delay = pulse_filter(pulse, up, down)
+        reach = -(-len(h) // up) - 1  # earlier symbols an output sample depends on
+
+        levels = dac.level_table
+        buf = np.zeros(0, dtype=dac.code_dtype)  # DAC codes of global symbols buf_start ...
+        buf_start = 0
+        n_symbols = 0
+        n_emitted = 0
+        debug = {'symbols': [], 'symbols_ffe': [], 'waveform': []}
+
+        def emit(n_stop: int) -> np.ndarray:
+            nonlocal buf, buf_start, n_emitted
+            if n_stop <= n_emitted:
+                return np.zeros(0)
+            out = polyphase_synthesize(buf, h, up, down, delay, n_emitted, n_stop, symbol_offset=buf_start, levels=levels)
+            n_emitted = n_stop
+            drop = max((n_emitted * down + delay) // up - reach - buf_start, 0)
+            buf = buf[drop:]
+            buf_start += drop
+            return out
+
+        def step(symbols_ffe: np.ndarray, final: bool) -> np.ndarray:
+            nonlocal buf, n_symbols
+            buf = np.concatenate([buf, dac.encode(symbols_ffe)])
+            n_symbols += len(symbols_ffe)
+            if final:
+                n_stop = int(round(n_symbols * up / down))
+            else:
+                # samples whose latest contributing symbol is already available
+                n_stop = -(-(n_symbols * up - delay) // down)
+            if keep_debug:
+                debug['symbols_ffe'].append(symbols_ffe)
+            return emit(n_stop)
+
+        for blk in bit_iter:
+            symbols = mapper(blk)
+            if keep_debug:
+                debug['symbols'].append(symbols)
+            out = step(ffe.process(symbols), final=False)
+            if keep_debug:
+                debug['waveform'].append(out)
+            if len(out):
+                yield out
+        out = step(ffe.flush(), final=True)
+        if keep_debug:
+            debug['waveform'].append(out)
+            for name, parts in debug.items():
+                setattr(self, name, np.concatenate(parts) if parts else np.zeros(0))
+        if len(out):
+            yield out
+
+    def run(self, sim_sample_rate: int = 16e9, method: str = 'interp', pulse='zoh', step_response=None, keep_debug: bool = True) -> Tuple[np.ndarray, np.ndarray]:
         """
         Run the Tx pipeline and return waveform and time arrays.
+        Args:
+            sim_sample_rate: Output sample rate (Sa/s).
+            method: Synthesis method, 'interp', 'polyphase' or 'edge' (see tx.synth).
+                'edge' applies the jitter from cfg.tx.jitter to the edge times.
+            pulse: Pulse shape for 'polyphase': 'zoh', 'rc' or a step response.
+            step_response: Step response rendered per edge for 'edge'
+                (e.g. tx.synth.channel_step_response of the channel).
+            keep_debug: Store symbols, symbols_ffe, waveform and time on self;
+                see stream() for bounded-memory runs.
         Returns:
             waveform: Synthesized output waveform samples.
             time: Corresponding time array.
@@ -49,26 +211,15 @@ class Tx:
             raise RuntimeError("Bits not generated. Call generate_bits() before run().")
 
         # Symbol mapping
-        data_rate = float(self.cfg.tx.data_rate_gbps) * 1e9  # Gbps -> bps
-        if self.cfg.tx.modulation.lower() == 'pam4':
-            symbols = map_pam4(self.bits)
-            symbol_rate = data_rate / 2.0
-        else:
-            symbols = map_nrz(self.bits)
-            symbol_rate = data_rate
+        mapper, _, _, symbol_rate = self._modulation()
+        symbols = mapper(self.bits)
 
         # FFE (symbol-domain)
         taps = normalize_taps(self.cfg.tx.ffe_taps)
         symbols_ffe = apply_ffe(symbols, taps)
 
         # DAC configuration (from self.cfg.tx.dac in YAML)
-        dac_cfg = self.cfg.tx.dac
-        dac = DAC(
-            sps=int(dac_cfg.sps),
-            resolution_bits=int(dac_cfg.resolution_bits),
-            v_cm=float(dac_cfg.v_cm),
-            v_swing=float(dac_cfg.v_swing),
-        )
+        dac = self._dac()
 
         # Synthesize waveform using DAC instance
         waveform, time = synthesize_waveform(
@@ -76,13 +227,18 @@ class Tx:
             dac,
             symbol_rate,
             sim_sample_rate=sim_sample_rate,
-            jitter=None
+            jitter=None,
+            method=method,
+            pulse=pulse,
+            step_response=step_response,
+            edge_jitter=edge_jitter_from_cfg(getattr(self.cfg.tx, 'jitter', None), symbol_rate) if method == 'edge' else None,
         )
         
         # Store for debugging/inspection
-        self.symbols = symbols
-        self.symbols_ffe = symbols_ffe
-        self.waveform = waveform
-        self.time = time
-        
+        if keep_debug:
+            self.symbols = symbols
+            self.symbols_ffe = symbols_ffe
+            self.waveform = waveform
+            self.time = time
+
         return waveform, time
\ No newline at end of file